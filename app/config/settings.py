@@ -278,6 +278,15 @@ CLOUDFRONT_URL_EXPIRY_SECONDS = int(
     os.environ.get("CLOUDFRONT_URL_EXPIRY_SECONDS", "300")  # 5 mins
 )
 
+# Downloads of protected files are buffered in redis and periodically
+# written to the database in batches
+SERVING_BUFFER_DOWNLOADS = strtobool(
+    os.environ.get("SERVING_BUFFER_DOWNLOADS", "True")
+)
+SERVING_DOWNLOAD_BUFFER_BATCH_SIZE = int(
+    os.environ.get("SERVING_DOWNLOAD_BUFFER_BATCH_SIZE", "1000")
+)
+
 ##############################################################################
 #
 # Caching
@@ -715,6 +724,12 @@ ACTSTREAM_SETTINGS = {
     "USE_JSONFIELD": True,
 }
 
+# The number of notifications created, and instant emails sent, per batch
+# when notifying the followers of an object
+NOTIFICATIONS_FAN_OUT_BATCH_SIZE = int(
+    os.environ.get("NOTIFICATIONS_FAN_OUT_BATCH_SIZE", "1000")
+)
+
 ##############################################################################
 #
 # bleach
@@ -1057,6 +1072,27 @@ COMPONENTS_INPUT_BUCKET_NAME = os.environ.get(
 COMPONENTS_OUTPUT_BUCKET_NAME = os.environ.get(
     "COMPONENTS_OUTPUT_BUCKET_NAME", "grand-challenge-components-outputs"
 )
+COMPONENTS_PROVISIONING_MAX_WORKERS = int(
+    os.environ.get("COMPONENTS_PROVISIONING_MAX_WORKERS", "16")
+)
+# Larger inputs are copied in parts, copies of single objects are limited
+# to 5 GB by S3
+COMPONENTS_PROVISIONING_MULTIPART_THRESHOLD = 256 * MEGABYTE
+COMPONENTS_PROVISIONING_MULTIPART_CHUNKSIZE = 128 * MEGABYTE
+COMPONENTS_OUTPUT_DOWNLOAD_MAX_WORKERS = int(
+    os.environ.get("COMPONENTS_OUTPUT_DOWNLOAD_MAX_WORKERS", "16")
+)
+# Larger outputs are downloaded with concurrent ranged requests
+COMPONENTS_OUTPUT_DOWNLOAD_MULTIPART_THRESHOLD = 64 * MEGABYTE
+COMPONENTS_OUTPUT_DOWNLOAD_MULTIPART_CHUNKSIZE = 32 * MEGABYTE
+# The number of concurrent requests of each multipart transfer, the
+# connection pool of the S3 client is sized to allow this for every worker
+COMPONENTS_TRANSFER_MAX_CONCURRENCY = int(
+    os.environ.get("COMPONENTS_TRANSFER_MAX_CONCURRENCY", "4")
+)
+COMPONENTS_MAXIMUM_OUTPUT_FILES = int(
+    os.environ.get("COMPONENTS_MAXIMUM_OUTPUT_FILES", "10000")
+)
 COMPONENTS_MAXIMUM_IMAGE_SIZE = 10 * GIGABYTE
 COMPONENTS_MINIMUM_JOB_DURATION = 5 * 60  # 5 minutes
 COMPONENTS_MAXIMUM_JOB_DURATION = 12 * 60 * 60  # 12 hours
@@ -1119,6 +1155,9 @@ MESSAGE_TAGS = {messages.ERROR: "danger"}
 
 # The name of the group whose members will be able to create reader studies
 READER_STUDY_CREATORS_GROUP_NAME = "reader_study_creators"
+# How long the display set index maps are kept, they are also invalidated
+# when display sets are added, removed or reordered
+READER_STUDIES_DISPLAY_SET_INDEX_CACHE_TIMEOUT = 24 * 60 * 60
 
 ###############################################################################
 #
@@ -1127,6 +1166,17 @@ READER_STUDY_CREATORS_GROUP_NAME = "reader_study_creators"
 ###############################################################################
 
 CHALLENGES_DEFAULT_ACTIVE_MONTHS = 12
+# How long, in seconds, the challenges looked up by the subdomain middleware
+# are kept in the shared cache, they are also invalidated when changed.
+# The most recently used are kept in each process for the local timeout,
+# so other processes can serve a changed challenge for this long.
+CHALLENGES_SUBDOMAIN_CACHE_TIMEOUT = int(
+    os.environ.get("CHALLENGES_SUBDOMAIN_CACHE_TIMEOUT", "60")
+)
+CHALLENGES_SUBDOMAIN_CACHE_LOCAL_TIMEOUT = int(
+    os.environ.get("CHALLENGES_SUBDOMAIN_CACHE_LOCAL_TIMEOUT", "5")
+)
+CHALLENGES_SUBDOMAIN_CACHE_SIZE = 256
 
 ###############################################################################
 #
@@ -1257,6 +1307,10 @@ CELERY_BEAT_SCHEDULE = {
         "task": "grandchallenge.challenges.tasks.update_compute_costs_and_storage_size",
         "schedule": timedelta(hours=1),
     },
+    "update_storage_size": {
+        "task": "grandchallenge.challenges.tasks.update_storage_size",
+        "schedule": crontab(hour=4, minute=45),
+    },
     "logout_privileged_users": {
         "task": "grandchallenge.browser_sessions.tasks.logout_privileged_users",
         "schedule": timedelta(hours=1),
@@ -1269,6 +1323,14 @@ CELERY_BEAT_SCHEDULE = {
         "task": "grandchallenge.emails.tasks.send_raw_emails",
         "schedule": timedelta(seconds=30),
     },
+    "flush_download_buffer": {
+        "task": "grandchallenge.serving.tasks.flush_download_buffer",
+        "schedule": timedelta(seconds=30),
+    },
+    "reconcile_job_scheduler": {
+        "task": "grandchallenge.algorithms.tasks.reconcile_job_scheduler",
+        "schedule": timedelta(minutes=1),
+    },
     "cancel_external_evaluations_past_timeout": {
         "task": "grandchallenge.evaluation.tasks.cancel_external_evaluations_past_timeout",
         "schedule": timedelta(hours=1),
@@ -1301,6 +1363,15 @@ if strtobool(os.environ.get("PUSH_CLOUDWATCH_METRICS", "False")):
         "task": "grandchallenge.core.tasks.put_cloudwatch_metrics",
         "schedule": timedelta(seconds=30),
     }
+    CELERY_BEAT_SCHEDULE["reconcile_status_counters"] = {
+        "task": "grandchallenge.core.tasks.reconcile_status_counters",
+        "schedule": timedelta(minutes=10),
+    }
+
+# Count the objects per status in redis rather than in the database
+CORE_STATUS_COUNTERS_ENABLED = strtobool(
+    os.environ.get("CORE_STATUS_COUNTERS_ENABLED", "True")
+)
 
 # The name of the group whose members will be able to create algorithms
 ALGORITHMS_CREATORS_GROUP_NAME = "algorithm_creators"
@@ -1311,6 +1382,25 @@ ALGORITHMS_JOB_BATCH_LIMIT = int(
 ALGORITHMS_MAX_ACTIVE_JOBS = int(
     os.environ.get("ALGORITHMS_MAX_ACTIVE_JOBS", "128")
 )
+# Share the active jobs between users, archives and challenges by weight
+ALGORITHMS_JOB_SCHEDULER_ENABLED = strtobool(
+    os.environ.get("ALGORITHMS_JOB_SCHEDULER_ENABLED", "True")
+)
+ALGORITHMS_JOB_SCHEDULER_TENANT_WEIGHTS = {
+    "user": 4,
+    "challenge": 2,
+    "archive": 1,
+}
+# Limits on the active jobs per resource class, e.g. {"A10G": 16}
+ALGORITHMS_MAX_ACTIVE_JOBS_PER_RESOURCE_CLASS = json.loads(
+    os.environ.get("ALGORITHMS_MAX_ACTIVE_JOBS_PER_RESOURCE_CLASS", "{}")
+)
+# Jobs requiring more memory than this are a separate resource class
+ALGORITHMS_JOB_SCHEDULER_HIGH_MEMORY_GB = int(
+    os.environ.get("ALGORITHMS_JOB_SCHEDULER_HIGH_MEMORY_GB", "16")
+)
+# How many of the scheduling decisions to keep for inspection
+ALGORITHMS_JOB_SCHEDULER_DECISIONS_LENGTH = 1000
 # Maximum and minimum values the user can set for algorithm requirements
 ALGORITHMS_MIN_MEMORY_GB = 4
 ALGORITHMS_MAX_MEMORY_GB = 32
@@ -1414,6 +1504,30 @@ CASES_POST_PROCESSORS = os.environ.get(
     "CASES_POST_PROCESSORS", "panimg.post_processors.tiff_to_dzi"
 ).split(",")
 
+# The number of threads used to download uploads and store image files
+CASES_IMPORT_TRANSFER_MAX_WORKERS = int(
+    os.environ.get("CASES_IMPORT_TRANSFER_MAX_WORKERS", "16")
+)
+# The number of processes used to convert the directories of an upload,
+# each process holds the images of one directory in memory
+CASES_IMPORT_CONVERSION_MAX_WORKERS = int(
+    os.environ.get("CASES_IMPORT_CONVERSION_MAX_WORKERS", "4")
+)
+CASES_IMPORT_BULK_CREATE_BATCH_SIZE = 1000
+# The images of an upload session are post processed in batches,
+# the batches are bounded by the number of images and their total size
+# as the files of a batch are all downloaded to the workers scratch disk
+CASES_POST_PROCESSING_BATCH_MAX_IMAGES = int(
+    os.environ.get("CASES_POST_PROCESSING_BATCH_MAX_IMAGES", "32")
+)
+CASES_POST_PROCESSING_BATCH_MAX_BYTES = int(
+    os.environ.get("CASES_POST_PROCESSING_BATCH_MAX_BYTES", str(8 * GIGABYTE))
+)
+# The number of processes used to post process the images of a batch
+CASES_POST_PROCESSING_MAX_WORKERS = int(
+    os.environ.get("CASES_POST_PROCESSING_MAX_WORKERS", "4")
+)
+
 # Maximum file size in bytes to be opened by SimpleITK.ReadImage in Image.sitk_image
 MAX_SITK_FILE_SIZE = 256 * MEGABYTE
 
@@ -1437,6 +1551,10 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = int(
 ALLOWED_JSON_SCHEMA_REF_SRC_REGEXES = (
     "https://vega.github.io/schema/vega-lite/v5.json",
 )
+# The maximum number of compiled JSON schema validators kept per process
+JSON_SCHEMA_VALIDATOR_CACHE_SIZE = int(
+    os.environ.get("JSON_SCHEMA_VALIDATOR_CACHE_SIZE", "1024")
+)
 
 
 ##########################
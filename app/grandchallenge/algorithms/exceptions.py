@@ -1,2 +1,6 @@
 class TooManyJobsScheduled(Exception):
     pass
+
+
+class JobCapacityExhausted(Exception):
+    pass
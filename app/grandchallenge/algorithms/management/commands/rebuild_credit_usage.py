@@ -0,0 +1,36 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+from grandchallenge.algorithms.models import AlgorithmUserCreditUsage, Job
+
+
+class Command(BaseCommand):
+    help = "Rebuild the credit ledger from the non-complimentary jobs"
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        usages = (
+            Job.objects.filter(creator__isnull=False, is_complimentary=False)
+            .annotate(date=TruncDate("created"))
+            .values("creator", "algorithm_image__algorithm", "date")
+            .annotate(total=Sum("credits_consumed"))
+            .order_by()
+        )
+
+        AlgorithmUserCreditUsage.objects.all().delete()
+        usages = AlgorithmUserCreditUsage.objects.bulk_create(
+            [
+                AlgorithmUserCreditUsage(
+                    user_id=usage["creator"],
+                    algorithm_id=usage["algorithm_image__algorithm"],
+                    date=usage["date"],
+                    credits_consumed=usage["total"],
+                )
+                for usage in usages.iterator()
+            ],
+            batch_size=1000,
+        )
+
+        self.stdout.write(f"Credit ledger rebuilt with {len(usages)} entries")
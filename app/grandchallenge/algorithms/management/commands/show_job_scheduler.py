@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand
+
+from grandchallenge.algorithms.scheduler import job_scheduler
+
+
+class Command(BaseCommand):
+    help = "Show the state and recent decisions of the job scheduler"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--decisions",
+            type=int,
+            default=20,
+            help="The number of recent decisions to show",
+        )
+
+    def handle(self, *args, **options):
+        status = job_scheduler.get_status()
+
+        self.stdout.write("Active jobs per tenant:")
+        for tenant, num_jobs in sorted(status["active"].items()):
+            self.stdout.write(f"  {tenant}: {num_jobs}")
+
+        self.stdout.write("Active jobs per resource class:")
+        for resource_class, num_jobs in sorted(status["resources"].items()):
+            self.stdout.write(f"  {resource_class}: {num_jobs}")
+
+        self.stdout.write("Waiting tasks per tenant:")
+        for tenant, num_tasks in status["waiting"].items():
+            self.stdout.write(f"  {tenant}: {num_tasks}")
+
+        self.stdout.write("Recent decisions:")
+        for decision in status["decisions"][: options["decisions"]]:
+            self.stdout.write(
+                f"  {decision['time']} {decision['tenant']} "
+                f"{decision['resource_class']}: admitted "
+                f"{decision['admitted']} of {decision['requested']} "
+                f"({decision['reason']})"
+            )
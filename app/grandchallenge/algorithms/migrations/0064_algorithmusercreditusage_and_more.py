@@ -0,0 +1,56 @@
+# Generated by Django 4.2.17 on 2025-01-27 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        (
+            "algorithms",
+            "0063_alter_optionalhangingprotocolalgorithm_unique_together",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlgorithmUserCreditUsage",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateField(
+                        help_text="The date, in the current time zone, the jobs were created"
+                    ),
+                ),
+                ("credits_consumed", models.IntegerField(default=0)),
+                (
+                    "algorithm",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="algorithms.algorithm",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "date", "algorithm")},
+            },
+        ),
+    ]
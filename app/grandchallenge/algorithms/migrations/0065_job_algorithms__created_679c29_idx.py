@@ -0,0 +1,22 @@
+# Generated by Django 4.2.17 on 2025-01-28 09:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is created concurrently as the jobs table is large
+    atomic = False
+
+    dependencies = [
+        ("algorithms", "0064_algorithmusercreditusage_and_more"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="job",
+            index=models.Index(
+                fields=["created"], name="algorithms__created_679c29_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The index is created concurrently as the jobs table is large
+    atomic = False
+
+    dependencies = [
+        ("algorithms", "0065_job_algorithms__created_679c29_idx"),
+        ("documentation", "0002_trigram_extension"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="job",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("comment"),
+                    name="gin_trgm_ops",
+                ),
+                name="job_comment_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("algorithms", "0066_job_job_comment_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="input_size_bytes",
+            field=models.PositiveBigIntegerField(
+                default=None,
+                editable=False,
+                help_text="The total size of the provisioned inputs in bytes",
+                null=True,
+            ),
+        ),
+    ]
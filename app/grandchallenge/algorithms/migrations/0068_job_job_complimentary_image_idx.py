@@ -0,0 +1,24 @@
+# Generated by Django 4.2.17 on 2025-02-12 10:02
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is created concurrently as the jobs table is large
+    atomic = False
+
+    dependencies = [
+        ("algorithms", "0067_job_input_size_bytes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_complimentary", True)),
+                fields=["algorithm_image"],
+                name="job_complimentary_image_idx",
+            ),
+        ),
+    ]
@@ -1,17 +1,21 @@
 import logging
 from datetime import datetime
+from functools import reduce
+from operator import or_
 
 from actstream.actions import follow, is_following
 from actstream.models import Follow
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Upper
 from django.db.models.signals import post_delete
 from django.db.transaction import on_commit
 from django.dispatch import receiver
@@ -27,8 +31,10 @@ from jinja2 import sandbox
 from jinja2.exceptions import TemplateError
 from stdimage import JPEGField
 
+from grandchallenge.algorithms.scheduler import job_scheduler
 from grandchallenge.algorithms.tasks import update_algorithm_average_duration
 from grandchallenge.anatomy.models import BodyStructure
+from grandchallenge.cases.models import Image
 from grandchallenge.charts.specs import stacked_bar
 from grandchallenge.components.models import (  # noqa: F401
     CIVForObjectMixin,
@@ -42,6 +48,7 @@ from grandchallenge.components.models import (  # noqa: F401
 )
 from grandchallenge.components.schemas import GPUTypeChoices
 from grandchallenge.core.guardian import get_objects_for_group
+from grandchallenge.core.metrics import status_counters
 from grandchallenge.core.models import RequestBase, UUIDModel
 from grandchallenge.core.storage import (
     get_logo_path,
@@ -631,6 +638,44 @@ class AlgorithmUserCredit(UUIDModel):
         super().save(*args, **kwargs)
 
 
+class AlgorithmUserCreditUsage(models.Model):
+    """
+    The credits consumed by the non-complimentary jobs of a user for an
+    algorithm on one day
+
+    This is a ledger of running totals that is kept up to date by
+    Job.save so that the remaining credits of a user can be calculated
+    without aggregating over all of their jobs.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    algorithm = models.ForeignKey(Algorithm, on_delete=models.CASCADE)
+    date = models.DateField(
+        help_text="The date, in the current time zone, the jobs were created"
+    )
+    credits_consumed = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "date", "algorithm")
+
+    def __str__(self):
+        return (
+            f"Credits used by {self.user} for {self.algorithm} on {self.date}"
+        )
+
+    @classmethod
+    def add_credits(cls, *, user_pk, algorithm_pk, date, credits):
+        usage, _ = cls.objects.get_or_create(
+            user_id=user_pk, algorithm_id=algorithm_pk, date=date
+        )
+        # Update in the database to stay correct for concurrent jobs
+        cls.objects.filter(pk=usage.pk).update(
+            credits_consumed=F("credits_consumed") + credits
+        )
+
+
 class AlgorithmImage(UUIDModel, ComponentImage):
     algorithm = models.ForeignKey(
         Algorithm,
@@ -697,12 +742,11 @@ class AlgorithmImage(UUIDModel, ComponentImage):
             algorithm=algorithm,
         )
 
-        spent_credits = Job.objects.filter(
-            creator=user_credit.user,
-            is_complimentary=False,
-            created__date__gte=user_credit.valid_from,
-            created__date__lte=user_credit.valid_until,
-            algorithm_image__algorithm=user_credit.algorithm,
+        spent_credits = AlgorithmUserCreditUsage.objects.filter(
+            user=user_credit.user,
+            date__gte=user_credit.valid_from,
+            date__lte=user_credit.valid_until,
+            algorithm=user_credit.algorithm,
         ).aggregate(
             total=Sum("credits_consumed", default=0),
         )
@@ -724,11 +768,26 @@ class AlgorithmImage(UUIDModel, ComponentImage):
             .values_list("algorithm__pk", flat=True)
         )
 
+        window_start = timezone.now() - relativedelta(months=1)
+        window_start_date = timezone.localdate(window_start)
+
+        # The ledger covers the whole days in the window,
+        # the jobs from the first, partial, day are counted directly
         spent_credits = (
+            AlgorithmUserCreditUsage.objects.filter(
+                user=user, date__gt=window_start_date
+            )
+            .exclude(algorithm__pk__in=user_algorithms_with_active_credits)
+            .aggregate(
+                total=Sum("credits_consumed", default=0),
+            )
+        )
+        spent_credits_first_day = (
             Job.objects.filter(
                 creator=user,
                 is_complimentary=False,
-                created__gte=timezone.now() - relativedelta(months=1),
+                created__gte=window_start,
+                created__date=window_start_date,
             )
             .exclude(
                 algorithm_image__algorithm__pk__in=user_algorithms_with_active_credits
@@ -738,7 +797,11 @@ class AlgorithmImage(UUIDModel, ComponentImage):
             )
         )
 
-        return user_credits - spent_credits["total"]
+        return (
+            user_credits
+            - spent_credits["total"]
+            - spent_credits_first_day["total"]
+        )
 
     def get_remaining_jobs(self, *, user):
         return self.get_remaining_non_complimentary_jobs(
@@ -804,6 +867,117 @@ class JobManager(ComponentJobManager):
 
         return obj
 
+    def bulk_create_for_input_civ_sets(
+        self,
+        *,
+        input_civ_sets,
+        extra_viewer_groups=None,
+        extra_logs_viewer_groups=None,
+        **kwargs,
+    ):
+        """
+        Creates system jobs, one for each set of inputs, in bulk
+
+        This does the same as calling create for each set of inputs but
+        uses a fixed number of queries for all of the jobs. As no signals
+        are sent the permissions for the jobs and input images are
+        assigned here.
+
+        Parameters
+        ----------
+        input_civ_sets
+            The sets of component interface values to use as inputs
+        extra_viewer_groups
+            The groups that will also get permission to view the jobs
+        extra_logs_viewer_groups
+            The groups that will also get permission to view the logs for
+            the jobs
+        kwargs
+            The fields that are shared by all the jobs
+        """
+        if not input_civ_sets:
+            return []
+
+        jobs = [self.model(creator=None, **kwargs) for _ in input_civ_sets]
+
+        # These only depend on the shared fields so are set once
+        jobs[0].init_is_complimentary()
+        jobs[0].init_credits_consumed()
+
+        viewers_groups = Group.objects.bulk_create(
+            [Group(name=job.viewers_group_name) for job in jobs]
+        )
+
+        for job, viewers in zip(jobs, viewers_groups, strict=True):
+            job.viewers = viewers
+            job.is_complimentary = jobs[0].is_complimentary
+            job.credits_consumed = jobs[0].credits_consumed
+
+        jobs = self.bulk_create(jobs)
+        status_counters.record_changes(
+            model=self.model, changes=[(None, job.status) for job in jobs]
+        )
+
+        self.model.inputs.through.objects.bulk_create(
+            [
+                self.model.inputs.through(job=job, componentinterfacevalue=civ)
+                for job, civ_set in zip(jobs, input_civ_sets, strict=True)
+                for civ in civ_set
+            ]
+        )
+
+        viewer_groups = {
+            (job, group)
+            for job in jobs
+            for group in [job.viewers, *(extra_viewer_groups or [])]
+        }
+        self.model.viewer_groups.through.objects.bulk_create(
+            [
+                self.model.viewer_groups.through(job=job, group=group)
+                for job, group in viewer_groups
+            ]
+        )
+
+        permissions = {
+            codename: Permission.objects.get(
+                codename=codename,
+                content_type=ContentType.objects.get_for_model(self.model),
+            )
+            for codename in ("view_job", "view_logs")
+        }
+        JobGroupObjectPermission.objects.bulk_create(
+            [
+                *(
+                    JobGroupObjectPermission(
+                        content_object=job,
+                        group=group,
+                        permission=permissions["view_job"],
+                    )
+                    for job, group in viewer_groups
+                ),
+                *(
+                    JobGroupObjectPermission(
+                        content_object=job,
+                        group=group,
+                        permission=permissions["view_logs"],
+                    )
+                    for job in jobs
+                    for group in extra_logs_viewer_groups or []
+                ),
+            ]
+        )
+
+        Image.bulk_update_viewer_groups_permissions(
+            image_pks={
+                civ.image_id
+                for civ_set in input_civ_sets
+                for civ in civ_set
+                if civ.image_id
+            }
+        )
+
+        return jobs
+
     @staticmethod
     def retrieve_existing_civs(*, civ_data):
         """
@@ -819,7 +993,8 @@ class JobManager(ComponentJobManager):
         A list of ComponentInterfaceValues
 
         """
-        existing_civs = []
+        lookups = []
+
         for civ in civ_data:
             if (
                 civ.user_upload
@@ -829,26 +1004,31 @@ class JobManager(ComponentJobManager):
                 # uploads will create new CIVs, so ignore these
                 continue
             elif civ.image:
-                try:
-                    civs = ComponentInterfaceValue.objects.filter(
-                        interface__slug=civ.interface_slug, image=civ.image
-                    ).all()
-                    existing_civs.extend(civs)
-                except ObjectDoesNotExist:
-                    continue
+                lookups.append(
+                    Q(
+                        interface__slug=civ.interface_slug,
+                        content_hash=ComponentInterfaceValue.get_image_content_hash(
+                            image_pk=civ.image.pk
+                        ),
+                    )
+                )
             elif civ.file_civ:
-                existing_civs.append(civ.file_civ)
+                lookups.append(Q(pk=civ.file_civ.pk))
             else:
                 # values can be of different types, including None and False
-                try:
-                    civs = ComponentInterfaceValue.objects.filter(
-                        interface__slug=civ.interface_slug, value=civ.value
-                    ).all()
-                    existing_civs.extend(civs)
-                except ObjectDoesNotExist:
-                    continue
+                lookups.append(
+                    Q(
+                        interface__slug=civ.interface_slug,
+                        content_hash=ComponentInterfaceValue.get_value_content_hash(
+                            value=civ.value
+                        ),
+                    )
+                )
+
+        if not lookups:
+            return []
 
-        return existing_civs
+        return [*ComponentInterfaceValue.objects.filter(reduce(or_, lookups))]
 
     def get_jobs_with_same_inputs(
         self, *, inputs, algorithm_image, algorithm_model
@@ -998,6 +1178,21 @@ class Job(CIVForObjectMixin, ComponentJob):
     class Meta(UUIDModel.Meta, ComponentJob.Meta):
         ordering = ("created",)
         permissions = [("view_logs", "Can view the jobs logs")]
+        indexes = [
+            # For counting the complimentary jobs of an image
+            models.Index(
+                fields=["algorithm_image"],
+                condition=Q(is_complimentary=True),
+                name="job_complimentary_image_idx",
+            ),
+            # For the monthly site statistics
+            models.Index(fields=["created"]),
+            # For searching the job lists
+            GinIndex(
+                OpClass(Upper("comment"), name="gin_trgm_ops"),
+                name="job_comment_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Job {self.pk}"
@@ -1076,6 +1271,10 @@ class Job(CIVForObjectMixin, ComponentJob):
             self.init_permissions()
             self.init_followers()
 
+        self.update_credit_usage(adding=adding)
+        self.update_compute_costs(
+            adding=adding, update_fields=kwargs.get("update_fields")
+        )
         self.update_viewer_groups_for_public()
 
         if self.has_changed("status") and self.status == self.SUCCESS:
@@ -1085,11 +1284,51 @@ class Job(CIVForObjectMixin, ComponentJob):
                 ).apply_async
             )
 
-    def init_viewers_group(self):
-        self.viewers = Group.objects.create(
-            name=f"{self._meta.app_label}_{self._meta.model_name}_{self.pk}_viewers"
+        if self.has_changed("status") and self.status in {
+            self.SUCCESS,
+            self.CANCELLED,
+            self.FAILURE,
+            self.CLAIMED,
+        }:
+            on_commit(lambda: job_scheduler.release(job_pk=self.pk))
+
+    def update_compute_costs(self, *, adding, update_fields):
+        """Add changes in the compute cost of this job to the cost ledger"""
+        from grandchallenge.challenges.models import (
+            Challenge,
+            ComputeCostEntry,
+        )
+        from grandchallenge.evaluation.models import Phase
+
+        change = self.get_compute_cost_change(
+            adding=adding, update_fields=update_fields
+        )
+
+        if change:
+            ComputeCostEntry.add_compute_costs(
+                challenge_pks=Challenge.objects.filter(
+                    admins_group__in=JobGroupObjectPermission.objects.filter(
+                        content_object=self, permission__codename="view_job"
+                    ).values("group")
+                ).values_list("pk", flat=True),
+                phase_pks=Phase.objects.filter(
+                    archive__items__values__in=self.inputs.all(),
+                    submission__algorithm_image=self.algorithm_image_id,
+                )
+                .distinct()
+                .values_list("pk", flat=True),
+                compute_cost_euro_millicents=change,
+            )
+
+    @property
+    def viewers_group_name(self):
+        return (
+            f"{self._meta.app_label}_{self._meta.model_name}_{self.pk}_viewers"
         )
 
+    def init_viewers_group(self):
+        self.viewers = Group.objects.create(name=self.viewers_group_name)
+
     def init_is_complimentary(self):
         self.is_complimentary = bool(
             self.creator
@@ -1133,6 +1372,51 @@ class Job(CIVForObjectMixin, ComponentJob):
             credits_per_job,
         )
 
+    def _get_credit_usage(self, *, state):
+        """The fields of this job that determine its entry in the ledger"""
+        try:
+            return {
+                "user_pk": state["creator_id"],
+                "date": timezone.localdate(state["created"]),
+                "credits": state["credits_consumed"],
+                "is_complimentary": state["is_complimentary"],
+            }
+        except KeyError:
+            # Fields were deferred
+            return None
+
+    def update_credit_usage(self, *, adding):
+        """Keep the credit ledger up to date with this job"""
+        current_usage = self._get_credit_usage(state=self._current_state)
+
+        if current_usage is None:
+            return
+        elif adding:
+            previous_usage = None
+        elif hasattr(self, "_credit_usage"):
+            previous_usage = self._credit_usage
+        else:
+            previous_usage = self._get_credit_usage(state=self._initial_state)
+
+            if previous_usage is None:
+                return
+
+        if current_usage != previous_usage:
+            for usage, sign in ((previous_usage, -1), (current_usage, 1)):
+                if (
+                    usage is not None
+                    and usage["user_pk"] is not None
+                    and not usage["is_complimentary"]
+                ):
+                    AlgorithmUserCreditUsage.add_credits(
+                        user_pk=usage["user_pk"],
+                        algorithm_pk=self.algorithm_image.algorithm_id,
+                        date=usage["date"],
+                        credits=sign * usage["credits"],
+                    )
+
+        self._credit_usage = current_usage
+
     def init_permissions(self):
         # By default, only the viewers can view this job
         self.viewer_groups.set([self.viewers])
@@ -0,0 +1,432 @@
+import json
+import math
+import time
+
+from celery import signature
+from django.conf import settings
+from django.utils.timezone import now
+from django_redis import get_redis_connection
+from kombu.utils import json as kombu_json
+
+
+class JobScheduler:
+    """
+    Admits algorithm jobs by weighted fair share between tenants
+
+    A tenant is who the jobs are run for, e.g. a user, an archive or a
+    challenge, and is named "<kind>:<pk>". The number of active jobs of each
+    tenant and each resource class is kept in redis. Capacity is reserved
+    with admit, the reservation is assigned to the jobs that are created
+    with assign, and released when the jobs finish with release.
+
+    Tasks that cannot be admitted wait in redis until capacity is released,
+    the tasks of the tenant with the fewest active jobs by weight are
+    started first.
+    """
+
+    def __init__(self, *, prefix="algorithms.job_scheduler"):
+        self.prefix = prefix
+
+    @property
+    def _connection(self):
+        return get_redis_connection("default")
+
+    def _key(self, name):
+        return f"{self.prefix}.{name}"
+
+    @staticmethod
+    def get_resource_class(*, requires_gpu_type, requires_memory_gb):
+        resource_class = requires_gpu_type or "CPU"
+
+        if (
+            requires_memory_gb
+            > settings.ALGORITHMS_JOB_SCHEDULER_HIGH_MEMORY_GB
+        ):
+            resource_class += "-highmem"
+
+        return resource_class
+
+    @staticmethod
+    def get_weight(*, tenant):
+        kind = tenant.split(":")[0]
+        return settings.ALGORITHMS_JOB_SCHEDULER_TENANT_WEIGHTS.get(kind, 1)
+
+    @classmethod
+    def get_admissible(
+        cls, *, tenant, resource_class, num_jobs, active, resources, waiting
+    ):
+        """
+        Calculate how many jobs of the tenant can be admitted
+
+        Parameters
+        ----------
+        tenant
+            The tenant requesting the capacity
+        resource_class
+            The resource class of the jobs
+        num_jobs
+            How many jobs the tenant would like to start
+        active
+            The number of active jobs per tenant
+        resources
+            The number of active jobs per resource class
+        waiting
+            The tenants that are waiting for capacity
+
+        Returns
+        -------
+            The number of jobs that can be admitted and the reason
+        """
+        capacity = settings.ALGORITHMS_MAX_ACTIVE_JOBS
+        free = capacity - sum(active.values())
+
+        resource_class_limit = (
+            settings.ALGORITHMS_MAX_ACTIVE_JOBS_PER_RESOURCE_CLASS.get(
+                resource_class
+            )
+        )
+        if resource_class_limit is not None:
+            free = min(
+                free, resource_class_limit - resources.get(resource_class, 0)
+            )
+
+        if free <= 0:
+            return 0, f"No capacity for {resource_class} jobs"
+
+        if waiting - {tenant}:
+            # Other tenants are waiting, so limit this tenant to its share
+            competing = (
+                waiting | {t for t, n in active.items() if n > 0} | {tenant}
+            )
+            share = math.floor(
+                capacity
+                * cls.get_weight(tenant=tenant)
+                / sum(cls.get_weight(tenant=t) for t in competing)
+            )
+            free = min(free, max(share, 1) - active.get(tenant, 0))
+
+            if free <= 0:
+                return 0, "Fair share used"
+
+        return min(num_jobs, free), "Admitted"
+
+    def _get_state(self, *, pipe):
+        active = {
+            k.decode("utf-8"): int(v)
+            for k, v in pipe.hgetall(self._key("active")).items()
+        }
+        resources = {
+            k.decode("utf-8"): int(v)
+            for k, v in pipe.hgetall(self._key("resources")).items()
+        }
+        waiting = {
+            t.decode("utf-8") for t in pipe.zrange(self._key("waiting"), 0, -1)
+        }
+        return active, resources, waiting
+
+    def admit(
+        self, *, tenant, requires_gpu_type, requires_memory_gb, num_jobs
+    ):
+        """
+        Reserve capacity for up to num_jobs jobs of the tenant
+
+        Returns the number of jobs that can be created, the created jobs
+        must then be passed to assign.
+        """
+        if not settings.ALGORITHMS_JOB_SCHEDULER_ENABLED or num_jobs == 0:
+            return num_jobs
+
+        resource_class = self.get_resource_class(
+            requires_gpu_type=requires_gpu_type,
+            requires_memory_gb=requires_memory_gb,
+        )
+
+        def reserve(pipe):
+            active, resources, waiting = self._get_state(pipe=pipe)
+            admitted, reason = self.get_admissible(
+                tenant=tenant,
+                resource_class=resource_class,
+                num_jobs=num_jobs,
+                active=active,
+                resources=resources,
+                waiting=waiting,
+            )
+
+            pipe.multi()
+
+            if admitted:
+                pipe.hincrby(self._key("active"), tenant, admitted)
+                pipe.hincrby(self._key("resources"), resource_class, admitted)
+
+            return admitted, reason
+
+        admitted, reason = self._connection.transaction(
+            reserve,
+            self._key("active"),
+            self._key("resources"),
+            self._key("waiting"),
+            value_from_callable=True,
+        )
+
+        self._record_decision(
+            tenant=tenant,
+            resource_class=resource_class,
+            requested=num_jobs,
+            admitted=admitted,
+            reason=reason,
+        )
+
+        return admitted
+
+    def assign(
+        self,
+        *,
+        tenant,
+        requires_gpu_type,
+        requires_memory_gb,
+        job_pks,
+        reserved,
+    ):
+        """Assign the reserved capacity to the jobs that were created"""
+        if not settings.ALGORITHMS_JOB_SCHEDULER_ENABLED:
+            return
+
+        resource_class = self.get_resource_class(
+            requires_gpu_type=requires_gpu_type,
+            requires_memory_gb=requires_memory_gb,
+        )
+        unused = reserved - len(job_pks)
+
+        pipe = self._connection.pipeline()
+
+        if job_pks:
+            pipe.hset(
+                self._key("jobs"),
+                mapping={
+                    str(pk): json.dumps([tenant, resource_class])
+                    for pk in job_pks
+                },
+            )
+
+        if unused:
+            pipe.hincrby(self._key("active"), tenant, -unused)
+            pipe.hincrby(self._key("resources"), resource_class, -unused)
+
+        pipe.execute()
+
+        if unused:
+            self.start_waiting(limit=unused)
+
+    def release(self, *, job_pk):
+        """Release the capacity used by a job, and start waiting tasks"""
+        if not settings.ALGORITHMS_JOB_SCHEDULER_ENABLED:
+            return
+
+        def free(pipe):
+            assignment = pipe.hget(self._key("jobs"), str(job_pk))
+
+            pipe.multi()
+
+            if assignment is not None:
+                tenant, resource_class = json.loads(assignment)
+                pipe.hdel(self._key("jobs"), str(job_pk))
+                pipe.hincrby(self._key("active"), tenant, -1)
+                pipe.hincrby(self._key("resources"), resource_class, -1)
+
+            return assignment is not None
+
+        released = self._connection.transaction(
+            free, self._key("jobs"), value_from_callable=True
+        )
+
+        if released:
+            self.start_waiting(limit=1)
+
+    def wait(self, *, tenant, task):
+        """
+        Have the task wait until capacity is released
+
+        The task signature is serialized with kombu, as when it is sent to
+        the broker, so its arguments can include e.g. UUIDs.
+        """
+        if not settings.ALGORITHMS_JOB_SCHEDULER_ENABLED:
+            task.apply_async()
+            return
+
+        timestamp = time.time()
+
+        pipe = self._connection.pipeline()
+        pipe.zadd(
+            self._key(f"waiting.{tenant}"),
+            {kombu_json.dumps(dict(task)): timestamp},
+            nx=True,
+        )
+        pipe.zadd(self._key("waiting"), {tenant: timestamp}, nx=True)
+        pipe.execute()
+
+    def _pop_waiting(self, *, tenant):
+        tenant_key = self._key(f"waiting.{tenant}")
+
+        def pop(pipe):
+            tasks = pipe.zrange(tenant_key, 0, 1)
+
+            pipe.multi()
+
+            if tasks:
+                pipe.zrem(tenant_key, tasks[0])
+
+            if len(tasks) < 2:
+                pipe.zrem(self._key("waiting"), tenant)
+
+            return kombu_json.loads(tasks[0]) if tasks else None
+
+        return self._connection.transaction(
+            pop, tenant_key, value_from_callable=True
+        )
+
+    def start_waiting(self, *, limit=None):
+        """
+        Start the waiting tasks that fit in the free capacity
+
+        The tasks are started in order of the active jobs of their tenant
+        relative to the tenant's weight, then by the time they started
+        waiting. The started tasks need to be admitted again, so they
+        could go back to waiting if others were admitted first.
+        """
+        if not settings.ALGORITHMS_JOB_SCHEDULER_ENABLED:
+            return
+
+        connection = self._connection
+        active, _, _ = self._get_state(pipe=connection)
+
+        num_tasks = settings.ALGORITHMS_MAX_ACTIVE_JOBS - sum(active.values())
+
+        if limit is not None:
+            num_tasks = min(num_tasks, limit)
+
+        for _ in range(num_tasks):
+            waiting = [
+                t.decode("utf-8")
+                for t in connection.zrange(self._key("waiting"), 0, -1)
+            ]
+
+            if not waiting:
+                break
+
+            tenant = min(
+                waiting,
+                key=lambda t: active.get(t, 0) / self.get_weight(tenant=t),
+            )
+            task = self._pop_waiting(tenant=tenant)
+
+            if task is not None:
+                signature(task).apply_async()
+                active[tenant] = active.get(tenant, 0) + 1
+
+    def reconcile(self, *, active_jobs):
+        """
+        Rebuild the active counters from the active jobs
+
+        Corrects for jobs whose status was changed without the scheduler
+        being notified, and for reservations that were never assigned.
+        Active jobs that were not created through the scheduler are
+        assigned to the "unscheduled" tenant so that they use capacity.
+
+        Parameters
+        ----------
+        active_jobs
+            Iterable of (pk, requires_gpu_type, requires_memory_gb) of the
+            jobs that are currently active
+        """
+        if not settings.ALGORITHMS_JOB_SCHEDULER_ENABLED:
+            return
+
+        active_jobs = {
+            str(pk): self.get_resource_class(
+                requires_gpu_type=requires_gpu_type,
+                requires_memory_gb=requires_memory_gb,
+            )
+            for pk, requires_gpu_type, requires_memory_gb in active_jobs
+        }
+
+        def rebuild(pipe):
+            assignments = {
+                k.decode("utf-8"): json.loads(v)
+                for k, v in pipe.hgetall(self._key("jobs")).items()
+            }
+
+            for job_pk, resource_class in active_jobs.items():
+                assignments.setdefault(job_pk, ["unscheduled", resource_class])
+
+            active = {}
+            resources = {}
+
+            for job_pk in active_jobs:
+                tenant, resource_class = assignments[job_pk]
+                active[tenant] = active.get(tenant, 0) + 1
+                resources[resource_class] = (
+                    resources.get(resource_class, 0) + 1
+                )
+
+            pipe.multi()
+
+            pipe.delete(
+                self._key("jobs"), self._key("active"), self._key("resources")
+            )
+
+            if active:
+                pipe.hset(
+                    self._key("jobs"),
+                    mapping={
+                        job_pk: json.dumps(assignments[job_pk])
+                        for job_pk in active_jobs
+                    },
+                )
+                pipe.hset(self._key("active"), mapping=active)
+                pipe.hset(self._key("resources"), mapping=resources)
+
+        self._connection.transaction(
+            rebuild,
+            self._key("jobs"),
+            self._key("active"),
+            self._key("resources"),
+        )
+
+        self.start_waiting()
+
+    def _record_decision(self, **kwargs):
+        pipe = self._connection.pipeline()
+        pipe.lpush(
+            self._key("decisions"),
+            json.dumps({"time": now().isoformat(), **kwargs}),
+        )
+        pipe.ltrim(
+            self._key("decisions"),
+            0,
+            settings.ALGORITHMS_JOB_SCHEDULER_DECISIONS_LENGTH - 1,
+        )
+        pipe.execute()
+
+    def get_status(self):
+        """The current state and most recent decisions of the scheduler"""
+        connection = self._connection
+        active, resources, _ = self._get_state(pipe=connection)
+
+        return {
+            "active": {k: v for k, v in active.items() if v},
+            "resources": {k: v for k, v in resources.items() if v},
+            "waiting": {
+                tenant: connection.zcard(self._key(f"waiting.{tenant}"))
+                for tenant in (
+                    t.decode("utf-8")
+                    for t in connection.zrange(self._key("waiting"), 0, -1)
+                )
+            },
+            "decisions": [
+                json.loads(d)
+                for d in connection.lrange(self._key("decisions"), 0, -1)
+            ],
+        }
+
+
+job_scheduler = JobScheduler()
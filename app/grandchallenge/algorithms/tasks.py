@@ -3,17 +3,25 @@ from tempfile import TemporaryDirectory
 from typing import NamedTuple
 
 import boto3
+from billiard.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
 from botocore.exceptions import ClientError
+from celery import group
 from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
 from django.core.cache import cache
 from django.core.files.base import File
 from django.db import transaction
 from django.db.models import Count, Q
 from django.db.transaction import on_commit
 from django.utils._os import safe_join
+from redis.exceptions import LockError
 
-from grandchallenge.algorithms.exceptions import TooManyJobsScheduled
-from grandchallenge.components.tasks import lock_model_instance
+from grandchallenge.algorithms.exceptions import (
+    JobCapacityExhausted,
+    TooManyJobsScheduled,
+)
+from grandchallenge.algorithms.scheduler import job_scheduler
+from grandchallenge.components.tasks import lock_model_instance, provision_job
 from grandchallenge.core.celery import (
     acks_late_2xlarge_task,
     acks_late_micro_short_task,
@@ -25,13 +33,9 @@ from grandchallenge.subdomains.utils import reverse
 logger = logging.getLogger(__name__)
 
 
-@acks_late_micro_short_task(
-    retry_on=(LockNotAcquiredException, TooManyJobsScheduled)
-)
+@acks_late_micro_short_task(retry_on=(LockNotAcquiredException,))
 @transaction.atomic
 def execute_algorithm_job_for_inputs(*, job_pk):
-    from grandchallenge.algorithms.models import Job
-
     job = lock_model_instance(
         app_label="algorithms", model_name="job", pk=job_pk
     )
@@ -51,12 +55,30 @@ def execute_algorithm_job_for_inputs(*, job_pk):
         logger.info("Job has already been scheduled for execution.")
         return
 
-    if Job.objects.active().count() >= settings.ALGORITHMS_MAX_ACTIVE_JOBS:
-        raise TooManyJobsScheduled
+    tenant = f"user:{job.creator_id}"
+    scheduling_kwargs = {
+        "tenant": tenant,
+        "requires_gpu_type": job.requires_gpu_type,
+        "requires_memory_gb": job.requires_memory_gb,
+    }
+
+    if not job_scheduler.admit(**scheduling_kwargs, num_jobs=1):
+        job_scheduler.wait(
+            tenant=tenant,
+            task=execute_algorithm_job_for_inputs.signature(
+                kwargs={"job_pk": str(job.pk)}
+            ),
+        )
+        return
 
     job.task_on_success = linked_task
     job.status = job.PENDING
     job.save()
+    on_commit(
+        lambda: job_scheduler.assign(
+            **scheduling_kwargs, job_pks=[job.pk], reserved=1
+        )
+    )
     on_commit(job.execute)
 
 
@@ -67,12 +89,9 @@ def create_algorithm_jobs_for_archive(
     archive_item_pks=None,
     algorithm_pks=None,
 ):
-    from grandchallenge.algorithms.models import Algorithm, Job
+    from grandchallenge.algorithms.models import Algorithm
     from grandchallenge.archives.models import Archive
 
-    if Job.objects.active().count() >= settings.ALGORITHMS_MAX_ACTIVE_JOBS:
-        raise TooManyJobsScheduled
-
     for archive in Archive.objects.filter(pk__in=archive_pks).all():
         # Only the archive groups should be able to view the job
         # Can be shared with the algorithm editor if needed
@@ -92,25 +111,58 @@ def create_algorithm_jobs_for_archive(
         else:
             archive_items = archive.items.all()
 
-        for algorithm in algorithms:
-            if algorithm.active_image:
-                create_algorithm_jobs(
-                    algorithm_image=algorithm.active_image,
-                    algorithm_model=algorithm.active_model,
-                    civ_sets=[
-                        {*ai.values.all()}
-                        for ai in archive_items.prefetch_related(
-                            "values__interface"
-                        )
-                    ],
-                    extra_viewer_groups=archive_groups,
-                    # NOTE: no emails in case the logs leak data
-                    # to the algorithm editors
-                    task_on_success=None,
-                    time_limit=algorithm.time_limit,
-                    requires_gpu_type=algorithm.job_requires_gpu_type,
-                    requires_memory_gb=algorithm.job_requires_memory_gb,
-                )
+        try:
+            _create_algorithm_jobs_for_archive_items(
+                archive=archive,
+                archive_items=archive_items,
+                algorithms=algorithms,
+                extra_viewer_groups=archive_groups,
+            )
+        except JobCapacityExhausted:
+            # Come back for the remaining jobs of this archive
+            job_scheduler.wait(
+                tenant=f"archive:{archive.pk}",
+                task=create_algorithm_jobs_for_archive.signature(
+                    kwargs={
+                        "archive_pks": [str(archive.pk)],
+                        "archive_item_pks": (
+                            [str(pk) for pk in archive_item_pks]
+                            if archive_item_pks is not None
+                            else None
+                        ),
+                        "algorithm_pks": (
+                            [str(pk) for pk in algorithm_pks]
+                            if algorithm_pks is not None
+                            else None
+                        ),
+                    }
+                ),
+            )
+
+
+def _create_algorithm_jobs_for_archive_items(
+    *, archive, archive_items, algorithms, extra_viewer_groups
+):
+    for algorithm in algorithms:
+        if algorithm.active_image:
+            create_algorithm_jobs(
+                algorithm_image=algorithm.active_image,
+                algorithm_model=algorithm.active_model,
+                civ_sets=[
+                    {*ai.values.all()}
+                    for ai in archive_items.prefetch_related(
+                        "values__interface"
+                    )
+                ],
+                extra_viewer_groups=extra_viewer_groups,
+                # NOTE: no emails in case the logs leak data
+                # to the algorithm editors
+                task_on_success=None,
+                time_limit=algorithm.time_limit,
+                requires_gpu_type=algorithm.job_requires_gpu_type,
+                requires_memory_gb=algorithm.job_requires_memory_gb,
+                tenant=f"archive:{archive.pk}",
+            )
 
 
 def create_algorithm_jobs(
@@ -126,6 +178,7 @@ def create_algorithm_jobs(
     max_jobs=None,
     task_on_success=None,
     task_on_failure=None,
+    tenant=None,
 ):
     """
     Creates algorithm jobs for sets of component interface values
@@ -157,9 +210,18 @@ def create_algorithm_jobs(
         to handle being called more than once, and in parallel.
     task_on_failure
         Celery task that is run on job failure
+    tenant
+        Who the jobs are run for, used to share the capacity between
+        tenants. If None the jobs are created without being admitted
+        by the job scheduler.
+
+    Raises
+    ------
+    JobCapacityExhausted
+        If the job scheduler did not admit all of the jobs
+    TooManyJobsScheduled
+        If there are more jobs than fit in a batch
     """
-    from grandchallenge.algorithms.models import Job
-
     if not algorithm_image:
         raise RuntimeError("Algorithm image required to create jobs.")
 
@@ -175,29 +237,78 @@ def create_algorithm_jobs(
     if time_limit is None:
         time_limit = settings.ALGORITHMS_JOB_DEFAULT_TIME_LIMIT_SECONDS
 
-    jobs = []
-    for civ_set in civ_sets:
+    num_jobs = min(len(civ_sets), settings.ALGORITHMS_JOB_BATCH_LIMIT)
+
+    job_kwargs = {
+        "algorithm_image": algorithm_image,
+        "algorithm_model": algorithm_model,
+        "task_on_success": task_on_success,
+        "task_on_failure": task_on_failure,
+        "time_limit": time_limit,
+        "requires_gpu_type": requires_gpu_type,
+        "requires_memory_gb": requires_memory_gb,
+        "extra_viewer_groups": extra_viewer_groups,
+        "extra_logs_viewer_groups": extra_logs_viewer_groups,
+    }
 
-        if len(jobs) >= settings.ALGORITHMS_JOB_BATCH_LIMIT:
-            raise TooManyJobsScheduled
-
-        with transaction.atomic():
-            job = Job.objects.create(
-                creator=None,  # System jobs, so no creator
-                algorithm_image=algorithm_image,
-                algorithm_model=algorithm_model,
-                task_on_success=task_on_success,
-                task_on_failure=task_on_failure,
-                time_limit=time_limit,
-                requires_gpu_type=requires_gpu_type,
-                requires_memory_gb=requires_memory_gb,
-                extra_viewer_groups=extra_viewer_groups,
-                extra_logs_viewer_groups=extra_logs_viewer_groups,
-                input_civ_set=civ_set,
-            )
-            on_commit(job.execute)
+    if tenant is None:
+        jobs = _bulk_create_jobs(civ_sets=civ_sets[:num_jobs], **job_kwargs)
+    else:
+        jobs = _bulk_create_scheduled_jobs(
+            civ_sets=civ_sets[:num_jobs], tenant=tenant, **job_kwargs
+        )
 
-            jobs.append(job)
+    if len(civ_sets) > settings.ALGORITHMS_JOB_BATCH_LIMIT:
+        raise TooManyJobsScheduled
+
+    return jobs
+
+
+def _bulk_create_scheduled_jobs(*, civ_sets, tenant, **kwargs):
+    scheduling_kwargs = {
+        "tenant": tenant,
+        "requires_gpu_type": kwargs["requires_gpu_type"],
+        "requires_memory_gb": kwargs["requires_memory_gb"],
+    }
+    admitted = job_scheduler.admit(**scheduling_kwargs, num_jobs=len(civ_sets))
+
+    try:
+        jobs = _bulk_create_jobs(civ_sets=civ_sets[:admitted], **kwargs)
+    except Exception:
+        # No jobs were created, so release the reservation
+        job_scheduler.assign(
+            **scheduling_kwargs, job_pks=[], reserved=admitted
+        )
+        raise
+
+    job_pks = [job.pk for job in jobs]
+    on_commit(
+        lambda: job_scheduler.assign(
+            **scheduling_kwargs, job_pks=job_pks, reserved=admitted
+        )
+    )
+
+    if admitted < len(civ_sets):
+        raise JobCapacityExhausted
+
+    return jobs
+
+
+def _bulk_create_jobs(*, civ_sets, **kwargs):
+    from grandchallenge.algorithms.models import Job
+
+    with transaction.atomic():
+        jobs = Job.objects.bulk_create_for_input_civ_sets(
+            input_civ_sets=civ_sets, **kwargs
+        )
+
+        if jobs:
+            on_commit(
+                group(
+                    provision_job.signature(**job.signature_kwargs)
+                    for job in jobs
+                ).apply_async
+            )
 
     return jobs
 
@@ -225,8 +336,8 @@ def filter_civs_for_algorithm(*, civ_sets, algorithm_image, algorithm_model):
     input_interfaces = {*algorithm_image.algorithm.inputs.all()}
 
     existing_jobs = {
-        frozenset(j.inputs.all())
-        for j in Job.objects.filter(
+        frozenset(input_pks)
+        for input_pks in Job.objects.filter(
             algorithm_image=algorithm_image, algorithm_model=algorithm_model
         )
         .annotate(
@@ -235,10 +346,11 @@ def filter_civs_for_algorithm(*, civ_sets, algorithm_image, algorithm_model):
                 filter=Q(
                     inputs__in={civ for civ_set in civ_sets for civ in civ_set}
                 ),
-            )
+            ),
+            input_pks=ArrayAgg("inputs__pk", default=[]),
         )
         .filter(inputs_match_count=len(input_interfaces), creator=None)
-        .prefetch_related("inputs")
+        .values_list("input_pks", flat=True)
     }
 
     valid_job_inputs = []
@@ -256,7 +368,7 @@ def filter_civs_for_algorithm(*, civ_sets, algorithm_image, algorithm_model):
             continue
 
         # Check job has not been run
-        if frozenset(valid_input) in existing_jobs:
+        if frozenset(civ.pk for civ in valid_input) in existing_jobs:
             continue
 
         valid_job_inputs.append(valid_input)
@@ -378,3 +490,19 @@ def update_algorithm_average_duration(*, algorithm_pk):
         algorithm_image__algorithm=algorithm, status=Job.SUCCESS
     ).average_duration()
     algorithm.save(update_fields=("average_duration",))
+
+
+@acks_late_micro_short_task(
+    ignore_result=True,
+    singleton=True,
+    # No need to retry here as the periodic task call this again
+    ignore_errors=(LockError, SoftTimeLimitExceeded, TimeLimitExceeded),
+)
+def reconcile_job_scheduler():
+    from grandchallenge.algorithms.models import Job
+
+    job_scheduler.reconcile(
+        active_jobs=Job.objects.active().values_list(
+            "pk", "requires_gpu_type", "requires_memory_gb"
+        )
+    )
@@ -609,6 +609,9 @@ class JobsList(PaginatedTableListView):
     ]
 
     default_sort_column = 1
+    indexed_search = True
+    keyset_pagination = True
+    approximate_count_threshold = 10_000
 
     @cached_property
     def algorithm(self):
@@ -21,18 +21,20 @@ def update_permissions_on_archive_item_changed(
         if pk_set is None:
             # When using a _clear action, pk_set is None
             # https://docs.djangoproject.com/en/2.2/ref/signals/#m2m-changed
-            images = [
-                civ.image
-                for civ in instance.values.filter(image__isnull=False)
-            ]
+            images = list(
+                Image.objects.filter(
+                    componentinterfacevalue__in=instance.values.all()
+                )
+            )
         else:
             images = Image.objects.filter(
                 componentinterfacevalue__pk__in=pk_set
             )
 
     def update_permissions():
-        for image in images:
-            image.update_viewer_groups_permissions()
+        Image.bulk_update_viewer_groups_permissions(
+            image_pks=[image.pk for image in images]
+        )
 
     on_commit(update_permissions)
 
@@ -40,11 +42,14 @@ def update_permissions_on_archive_item_changed(
 @receiver(pre_delete, sender=ArchiveItem)
 @receiver(post_save, sender=ArchiveItem)
 def update_view_image_permissions(*_, instance: ArchiveItem, **__):
-    images = [civ.image for civ in instance.values.filter(image__isnull=False)]
+    images = list(
+        instance.values.filter(image__isnull=False).values_list(
+            "image", flat=True
+        )
+    )
 
     def update_permissions():
-        for image in images:
-            image.update_viewer_groups_permissions()
+        Image.bulk_update_viewer_groups_permissions(image_pks=images)
 
     on_commit(update_permissions)
 
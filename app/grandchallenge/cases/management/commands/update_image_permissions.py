@@ -0,0 +1,30 @@
+from itertools import islice
+
+from django.core.management import BaseCommand
+
+from grandchallenge.cases.models import Image
+from grandchallenge.cases.tasks import update_viewer_groups_permissions
+
+
+class Command(BaseCommand):
+    help = "Reconcile the view permissions of the viewer groups for images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The number of images to update in each task",
+        )
+
+    def handle(self, *args, **options):
+        image_pks = Image.objects.values_list("pk", flat=True).iterator()
+
+        while batch := [
+            str(pk) for pk in islice(image_pks, options["batch_size"])
+        ]:
+            update_viewer_groups_permissions.apply_async(
+                kwargs={"image_pks": batch}
+            )
+
+        self.stdout.write("Image permission update tasks scheduled")
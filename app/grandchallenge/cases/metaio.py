@@ -0,0 +1,192 @@
+import zlib
+from math import prod
+from pathlib import Path
+
+import numpy as np
+from panimg.models import MAXIMUM_SEGMENTS_LENGTH
+
+METAIO_ELEMENT_TYPES = {
+    "MET_CHAR": np.int8,
+    "MET_UCHAR": np.uint8,
+    "MET_SHORT": np.int16,
+    "MET_USHORT": np.uint16,
+    "MET_INT": np.int32,
+    "MET_UINT": np.uint32,
+    "MET_LONG_LONG": np.int64,
+    "MET_ULONG_LONG": np.uint64,
+    "MET_FLOAT": np.float32,
+    "MET_DOUBLE": np.float64,
+}
+
+# Only 8 bit images are checked for segments, as in panimg
+MASK_ELEMENT_TYPES = {"MET_CHAR", "MET_UCHAR"}
+
+# The maximum number of bytes of voxel data held in memory at once
+CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def read_metaimage_header(*, header_path):
+    """
+    Read the header of a MetaImage file
+
+    Returns the header as a dict, the byte offset of the element data
+    is stored under HeaderEnd for files with LOCAL element data.
+    """
+    header = {}
+
+    with open(header_path, "rb") as f:
+        while line := f.readline():
+            key, _, value = line.decode("utf-8").partition("=")
+            header[key.strip()] = value.strip()
+
+            if key.strip() == "ElementDataFile":
+                header["HeaderEnd"] = f.tell()
+                break
+
+    return header
+
+
+def iter_voxel_chunks(*, header_path, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over the voxel values of a MetaImage file in flat chunks
+
+    Uncompressed element data is memory mapped and read in slabs along the
+    slowest axis, compressed element data is decompressed incrementally.
+    Either way no more than chunk_size bytes are read at once.
+    """
+    header_path = Path(header_path)
+    header = read_metaimage_header(header_path=header_path)
+
+    try:
+        dtype = np.dtype(METAIO_ELEMENT_TYPES[header["ElementType"]])
+    except KeyError:
+        raise ValueError(
+            f"Unsupported element type {header.get('ElementType')!r}"
+        )
+
+    if (
+        header.get(
+            "BinaryDataByteOrderMSB", header.get("ElementByteOrderMSB", "")
+        ).lower()
+        == "true"
+    ):
+        dtype = dtype.newbyteorder(">")
+
+    shape = [int(d) for d in header["DimSize"].split()]
+    num_channels = int(header.get("ElementNumberOfChannels", 1))
+    num_elements = prod(shape) * num_channels
+
+    if header["ElementDataFile"] == "LOCAL":
+        data_path = header_path
+        offset = header["HeaderEnd"]
+    elif (
+        header["ElementDataFile"].startswith("LIST")
+        or "%" in header["ElementDataFile"]
+    ):
+        raise ValueError("Element data split over multiple files")
+    else:
+        data_path = header_path.parent / header["ElementDataFile"]
+        offset = int(header.get("HeaderSize", 0))
+
+        if offset == -1:
+            # The data is at the end of the file
+            offset = data_path.stat().st_size - num_elements * dtype.itemsize
+
+    if num_elements == 0:
+        return
+    elif header.get("CompressedData", "").lower() == "true":
+        yield from _iter_compressed_chunks(
+            data_path=data_path,
+            offset=offset,
+            dtype=dtype,
+            chunk_size=chunk_size,
+        )
+    else:
+        yield from _iter_memory_mapped_slabs(
+            data_path=data_path,
+            offset=offset,
+            dtype=dtype,
+            num_elements=num_elements,
+            slab_elements=num_elements // shape[-1],
+            chunk_size=chunk_size,
+        )
+
+
+def _iter_memory_mapped_slabs(
+    *, data_path, offset, dtype, num_elements, slab_elements, chunk_size
+):
+    voxels = np.memmap(
+        data_path, dtype=dtype, mode="r", offset=offset, shape=(num_elements,)
+    )
+    step = max(1, chunk_size // (slab_elements * dtype.itemsize))
+    step *= slab_elements
+
+    for start in range(0, num_elements, step):
+        yield voxels[start : start + step]
+
+
+def _iter_compressed_chunks(*, data_path, offset, dtype, chunk_size):
+    decompressor = zlib.decompressobj()
+    remainder = b""
+
+    with open(data_path, "rb") as f:
+        f.seek(offset)
+
+        while not decompressor.eof:
+            data = decompressor.unconsumed_tail
+
+            if not data:
+                data = f.read(chunk_size)
+
+                if not data:
+                    break
+
+            data = remainder + decompressor.decompress(
+                data, max_length=chunk_size
+            )
+            aligned = len(data) - len(data) % dtype.itemsize
+            remainder = data[aligned:]
+
+            if aligned:
+                yield np.frombuffer(data[:aligned], dtype=dtype)
+
+
+def get_segments(*, header_path):
+    """
+    Get the unique voxel values of a MetaImage file chunk by chunk
+
+    Matches panimg's SimpleITKImage.segments. Returns None if the image
+    does not have 8 bit integer voxels, has more than one channel, or has
+    more than MAXIMUM_SEGMENTS_LENGTH unique values. 4D images must be
+    binary, and have one segment per volume.
+    """
+    header = read_metaimage_header(header_path=header_path)
+
+    if (
+        int(header.get("ElementNumberOfChannels", 1)) != 1
+        or header.get("ElementType") not in MASK_ELEMENT_TYPES
+    ):
+        return None
+
+    n_dims = len(header["DimSize"].split())
+    segments = set()
+
+    for chunk in iter_voxel_chunks(header_path=header_path):
+        segments.update(np.unique(chunk).tolist())
+
+        if n_dims == 4 and not segments.issubset({0, 1}):
+            # 4D segmentations must only have values 0 and 1
+            # as the 4th dimension encodes the overlay type
+            return None
+        elif len(segments) > MAXIMUM_SEGMENTS_LENGTH:
+            return None
+
+    if n_dims == 4:
+        # Use 1-indexing for each volume
+        n_volumes = int(header["DimSize"].split()[3])
+        segments = {idx + 1 for idx in range(n_volumes)}
+
+    if len(segments) <= MAXIMUM_SEGMENTS_LENGTH:
+        return frozenset(segments)
+    else:
+        return None
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.17 on 2025-01-28 09:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is created concurrently as the images table is large
+    atomic = False
+
+    dependencies = [
+        ("cases", "0014_imagefile_size_in_storage"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="image",
+            index=models.Index(
+                fields=["created"], name="cases_image_created_a0f3a2_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The index is created concurrently as the images table is large
+    atomic = False
+
+    dependencies = [
+        ("cases", "0015_image_cases_image_created_a0f3a2_idx"),
+        ("documentation", "0002_trigram_extension"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="image",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="gin_trgm_ops",
+                ),
+                name="image_name_trgm_idx",
+            ),
+        ),
+    ]
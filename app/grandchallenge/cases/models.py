@@ -6,9 +6,13 @@ from tempfile import TemporaryDirectory
 from actstream.actions import follow
 from actstream.models import Follow
 from django.conf import settings
+from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ObjectDoesNotExist, SuspiciousFileOperation
 from django.db import models
+from django.db.models import Count, Q
+from django.db.models.functions import Upper
 from django.db.models.signals import post_delete, pre_delete
 from django.db.transaction import on_commit
 from django.dispatch import receiver
@@ -16,7 +20,7 @@ from django.template.defaultfilters import pluralize
 from django.utils._os import safe_join
 from django.utils.text import get_valid_filename
 from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
-from guardian.shortcuts import assign_perm, get_groups_with_perms, remove_perm
+from guardian.shortcuts import assign_perm
 from panimg.image_builders.metaio_utils import load_sitk_image
 from panimg.models import (
     MAXIMUM_SEGMENTS_LENGTH,
@@ -26,6 +30,7 @@ from panimg.models import (
 )
 from storages.utils import clean_name
 
+from grandchallenge.cases.metaio import get_segments
 from grandchallenge.core.error_handlers import (
     RawImageUploadSessionErrorHandler,
 )
@@ -246,6 +251,23 @@ class RawImageUploadSession(UUIDModel):
     def api_url(self) -> str:
         return reverse("api:upload-session-detail", kwargs={"pk": self.pk})
 
+    @property
+    def post_processing_progress(self):
+        """The number of images of this session that have been post processed"""
+        counts = self.image_set.aggregate(
+            total=Count("pk", distinct=True),
+            pending=Count(
+                "pk",
+                filter=Q(files__post_processed=False)
+                & ~Q(files__image_type=ImageFile.IMAGE_TYPE_DZI),
+                distinct=True,
+            ),
+        )
+        return {
+            "completed": counts["total"] - counts["pending"],
+            "total": counts["total"],
+        }
+
 
 class RawImageUploadSessionUserObjectPermission(UserObjectPermissionBase):
     content_object = models.ForeignKey(
@@ -539,20 +561,11 @@ class Image(UUIDModel):
             )
 
         with TemporaryDirectory() as tempdirname:
-            for file in files:
-                with (
-                    file.file.open("rb") as infile,
-                    open(
-                        Path(tempdirname) / Path(file.file.name).name, "wb"
-                    ) as outfile,
-                ):
-                    buffer = True
-                    while buffer:
-                        buffer = infile.read(1024)
-                        outfile.write(buffer)
+            hdr_path = self._download_metaimage_files(
+                files=files, directory=tempdirname
+            )
 
             try:
-                hdr_path = Path(tempdirname) / Path(files[0].file.name).name
                 sitk_image = load_sitk_image(hdr_path)
             except RuntimeError as e:
                 logging.error(
@@ -562,6 +575,42 @@ class Image(UUIDModel):
 
         return sitk_image
 
+    @staticmethod
+    def _download_metaimage_files(*, files, directory):
+        """Download the MHA or MHD/RAW files, returning the header path"""
+        for file in files:
+            file.file.storage.download_file(
+                name=file.file.name,
+                filename=Path(directory) / Path(file.file.name).name,
+            )
+
+        return Path(directory) / Path(files[0].file.name).name
+
+    def calculate_segments(self):
+        """
+        Calculate the unique voxel values of this image
+
+        Unlike sitk_image there is no limit to the image size as the voxels
+        are read chunk by chunk.
+
+        Returns
+        -------
+            The set of voxel values, or None if the image is not a
+            segmentation
+        """
+        files = [i for i in self._metaimage_files if i is not None]
+
+        for file in files:
+            if not file.file.storage.exists(name=file.file.name):
+                raise FileNotFoundError(f"No file found for {file.file}")
+
+        with TemporaryDirectory() as tempdirname:
+            return get_segments(
+                header_path=self._download_metaimage_files(
+                    files=files, directory=tempdirname
+                )
+            )
+
     def update_viewer_groups_permissions(self, *, exclude_jobs=None):
         """
         Update the permissions for the algorithm jobs viewers groups to
@@ -575,68 +624,111 @@ class Image(UUIDModel):
             image from the results image set, and is used when the pre_clear
             signal is sent.
         """
+        Image.bulk_update_viewer_groups_permissions(
+            image_pks=[self.pk], exclude_jobs=exclude_jobs
+        )
+
+    @classmethod
+    def bulk_update_viewer_groups_permissions(
+        cls, *, image_pks, exclude_jobs=None
+    ):
+        """
+        Reconcile the view_image group permissions of many images at once.
+
+        The expected groups of all the images are gathered with one query
+        per relation, and the differences with the existing permissions are
+        applied with a single insert and a single delete.
+
+        Parameters
+        ----------
+        image_pks
+            The primary keys of the images to update
+        exclude_jobs
+            Exclude these results from being considered, see
+            update_viewer_groups_permissions.
+        """
         from grandchallenge.algorithms.models import Job
         from grandchallenge.archives.models import Archive
-        from grandchallenge.reader_studies.models import ReaderStudy
+        from grandchallenge.reader_studies.models import Answer, ReaderStudy
+
+        image_pks = set(image_pks)
+
+        if not image_pks:
+            return
 
         if exclude_jobs is None:
             exclude_jobs = set()
         else:
             exclude_jobs = {j.pk for j in exclude_jobs}
 
-        expected_groups = set()
-
-        for key in ["inputs__image", "outputs__image"]:
-            for job in (
-                Job.objects.exclude(pk__in=exclude_jobs)
-                .filter(**{key: self})
-                .prefetch_related("viewer_groups")
-            ):
-                expected_groups.update(job.viewer_groups.all())
+        expected = set()
 
-        for archive in Archive.objects.filter(
-            items__values__image=self
-        ).select_related("editors_group", "uploaders_group", "users_group"):
-            expected_groups.update(
-                [
-                    archive.editors_group,
-                    archive.uploaders_group,
-                    archive.users_group,
-                ]
+        for key in ["inputs", "outputs"]:
+            expected.update(
+                Job.viewer_groups.through.objects.filter(
+                    **{f"job__{key}__image__in": image_pks}
+                )
+                .exclude(job__in=exclude_jobs)
+                .values_list(f"job__{key}__image", "group")
             )
 
-        for rs in ReaderStudy.objects.filter(
-            display_sets__values__image=self
-        ).select_related("editors_group", "readers_group"):
-            expected_groups.update(
-                [
-                    rs.editors_group,
-                    rs.readers_group,
-                ]
-            )
+        for image_pk, *group_pks in Archive.objects.filter(
+            items__values__image__in=image_pks
+        ).values_list(
+            "items__values__image",
+            "editors_group",
+            "uploaders_group",
+            "users_group",
+        ):
+            expected.update((image_pk, group_pk) for group_pk in group_pks)
 
-        # Reader study editors for reader studies that have answers that
-        # include this image.
-        for answer in self.answer_set.select_related(
-            "question__reader_study__editors_group"
-        ).all():
-            expected_groups.add(answer.question.reader_study.editors_group)
-
-        current_groups = get_groups_with_perms(self, attach_perms=True)
-        current_groups = {
-            group
-            for group, perms in current_groups.items()
-            if "view_image" in perms
-        }
+        for image_pk, *group_pks in ReaderStudy.objects.filter(
+            display_sets__values__image__in=image_pks
+        ).values_list(
+            "display_sets__values__image", "editors_group", "readers_group"
+        ):
+            expected.update((image_pk, group_pk) for group_pk in group_pks)
 
-        groups_missing_perms = expected_groups - current_groups
-        groups_with_extra_perms = current_groups - expected_groups
+        # Reader study editors for reader studies that have answers that
+        # include these images.
+        expected.update(
+            Answer.objects.filter(answer_image__in=image_pks).values_list(
+                "answer_image", "question__reader_study__editors_group"
+            )
+        )
 
-        for g in groups_missing_perms:
-            assign_perm("view_image", g, self)
+        permission = Permission.objects.get(
+            codename="view_image",
+            content_type=ContentType.objects.get_for_model(cls),
+        )
+        current_permissions = ImageGroupObjectPermission.objects.filter(
+            content_object__in=image_pks, permission=permission
+        )
+        current = {
+            (image_pk, group_pk): pk
+            for pk, image_pk, group_pk in current_permissions.values_list(
+                "pk", "content_object", "group"
+            )
+        }
 
-        for g in groups_with_extra_perms:
-            remove_perm("view_image", g, self)
+        ImageGroupObjectPermission.objects.bulk_create(
+            [
+                ImageGroupObjectPermission(
+                    content_object_id=image_pk,
+                    group_id=group_pk,
+                    permission=permission,
+                )
+                for image_pk, group_pk in expected - current.keys()
+            ],
+            ignore_conflicts=True,
+        )
+        ImageGroupObjectPermission.objects.filter(
+            pk__in=[
+                pk
+                for image_pk_group_pk, pk in current.items()
+                if image_pk_group_pk not in expected
+            ]
+        ).delete()
 
     def assign_view_perm_to_creator(self):
         for answer in self.answer_set.all():
@@ -648,6 +740,15 @@ class Image(UUIDModel):
 
     class Meta:
         ordering = ("name",)
+        indexes = [
+            # For the monthly site statistics
+            models.Index(fields=["created"]),
+            # For searching the job and display set lists
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="image_name_trgm_idx",
+            ),
+        ]
 
 
 class ImageUserObjectPermission(UserObjectPermissionBase):
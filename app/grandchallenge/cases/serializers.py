@@ -110,6 +110,7 @@ class RawImageUploadSessionSerializer(serializers.ModelSerializer):
             "error_message",
             "image_set",
             "api_url",
+            "post_processing_progress",
             "user_uploads",
             "archive",
             "answer",
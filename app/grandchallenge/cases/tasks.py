@@ -1,11 +1,15 @@
 import logging
+import time
 import zipfile
 from collections.abc import Callable, Sequence
-from dataclasses import asdict, dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from pathlib import Path
 from shutil import rmtree
 from tempfile import TemporaryDirectory
 
+import billiard
 from billiard.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
@@ -41,11 +45,16 @@ class DuplicateFilesException(ValueError):
     pass
 
 
-def _populate_tmp_dir(tmp_dir, upload_session):
+def _populate_tmp_dir(tmp_dir, upload_session, timings):
     session_files = [*upload_session.user_uploads.all()]
 
+    start = time.monotonic()
     populate_provisioning_directory(session_files, tmp_dir)
+    timings["download"] = time.monotonic() - start
+
+    start = time.monotonic()
     extract_files(source_path=tmp_dir)
+    timings["extract"] = time.monotonic() - start
 
 
 def populate_provisioning_directory(
@@ -55,14 +64,34 @@ def populate_provisioning_directory(
     Provisions provisioning_dir with the files associated using the given
     list of uploaded files.
     """
+    destinations = {}
+
     for input_file in input_files:
         dest = Path(safe_join(provisioning_dir, input_file.filename))
 
-        if dest.exists():
+        if dest.exists() or dest in destinations:
             raise DuplicateFilesException("Duplicate files uploaded")
 
-        with open(dest, "wb") as f:
-            input_file.download_fileobj(fileobj=f)
+        destinations[dest] = input_file
+
+    with ThreadPoolExecutor(
+        max_workers=settings.CASES_IMPORT_TRANSFER_MAX_WORKERS
+    ) as pool:
+        futures = [
+            pool.submit(
+                _download_user_upload, user_upload=input_file, dest=dest
+            )
+            for dest, input_file in destinations.items()
+        ]
+
+        for future in futures:
+            # Raises the first exception of any failed download
+            future.result()
+
+
+def _download_user_upload(*, user_upload, dest):
+    with open(dest, "wb") as f:
+        user_upload.download_fileobj(fileobj=f)
 
 
 def check_compressed_and_extract(*, src_path: Path, checked_paths: set[Path]):
@@ -169,7 +198,8 @@ def build_images(  # noqa:C901
     try:
         with TemporaryDirectory() as tmp_dir:
             tmp_dir = Path(tmp_dir).resolve()
-            _populate_tmp_dir(tmp_dir, upload_session)
+            timings = {}
+            _populate_tmp_dir(tmp_dir, upload_session, timings)
             importer_result = import_images(
                 input_directory=tmp_dir, origin=upload_session
             )
@@ -178,6 +208,7 @@ def build_images(  # noqa:C901
                 file_errors=importer_result.file_errors,
                 base_directory=tmp_dir,
                 upload_session=upload_session,
+                timings={**timings, **importer_result.timings},
             )
 
         if upload_session.image_set.count() == 0:
@@ -230,6 +261,7 @@ class ImporterResult:
     new_images: set[Image]
     consumed_files: set[Path]
     file_errors: dict[Path, list[str]]
+    timings: dict[str, float] = field(default_factory=dict)
 
 
 def import_images(
@@ -257,14 +289,17 @@ def import_images(
         any file errors
 
     """
+    timings = {}
+
     with TemporaryDirectory() as output_directory:
-        panimg_result = convert(
-            input_directory=input_directory,
-            output_directory=output_directory,
+        start = time.monotonic()
+        panimg_result = _convert_directories(
+            input_directory=Path(input_directory),
+            output_directory=Path(output_directory),
             builders=builders,
-            post_processors=[],  # Do the post-processing later
             recurse_subdirectories=recurse_subdirectories,
         )
+        timings["convert"] = time.monotonic() - start
 
         _check_all_ids(panimg_result=panimg_result)
 
@@ -273,26 +308,119 @@ def import_images(
             new_image_files=panimg_result.new_image_files,
         )
 
+        start = time.monotonic()
         _store_images(
             origin=origin,
             images=django_result.new_images,
             image_files=django_result.new_image_files,
         )
+        timings["store"] = time.monotonic() - start
 
-        for image in django_result.new_images:
-            on_commit(
-                post_process_image.signature(
-                    kwargs={"image_pk": image.pk}
-                ).apply_async
-            )
+        _schedule_post_processing(
+            images=django_result.new_images,
+            image_files=django_result.new_image_files,
+        )
 
     return ImporterResult(
         new_images=django_result.new_images,
         consumed_files=panimg_result.consumed_files,
         file_errors=panimg_result.file_errors,
+        timings=timings,
     )
 
 
+def _convert_directories(
+    *, input_directory, output_directory, builders, recurse_subdirectories
+) -> PanImgResult:
+    """
+    Converts the files in each directory in parallel
+
+    panimg only combines files from the same directory into an image,
+    so the directories can be converted independently of each other.
+    """
+    if recurse_subdirectories:
+        directories = [
+            input_directory,
+            *(d for d in input_directory.rglob("*") if d.is_dir()),
+        ]
+    else:
+        directories = [input_directory]
+
+    conversions = []
+
+    for directory in directories:
+        if not any(f.is_file() for f in directory.iterdir()):
+            continue
+
+        directory_output = output_directory / directory.relative_to(
+            input_directory
+        )
+        directory_output.mkdir(parents=True, exist_ok=True)
+
+        conversions.append(
+            {
+                "input_directory": directory,
+                "output_directory": directory_output,
+                "builders": builders,
+                "post_processors": [],  # Do the post-processing later
+                "recurse_subdirectories": False,
+            }
+        )
+
+    results = _call_in_processes(
+        func=convert,
+        kwargs_list=conversions,
+        max_workers=settings.CASES_IMPORT_CONVERSION_MAX_WORKERS,
+    )
+
+    return PanImgResult(
+        new_images={im for r in results for im in r.new_images},
+        new_image_files={f for r in results for f in r.new_image_files},
+        consumed_files={f for r in results for f in r.consumed_files},
+        file_errors={
+            path: errors
+            for r in results
+            for path, errors in r.file_errors.items()
+        },
+    )
+
+
+def _call_in_processes(
+    *, func, kwargs_list, max_workers, return_exceptions=False
+):
+    """
+    Calls ``func`` with each of the kwargs in a pool of processes
+
+    The calls are made in this process if there is only one worker or call.
+    If ``return_exceptions`` is set, the exception raised by a call is
+    returned in place of its result.
+    """
+    max_workers = min(max_workers, len(kwargs_list))
+
+    def get_result(call):
+        try:
+            return call()
+        except (SoftTimeLimitExceeded, TimeLimitExceeded):
+            raise
+        except Exception as error:
+            if return_exceptions:
+                return error
+            raise
+
+    if max_workers > 1:
+        # Use billiard rather than multiprocessing, as multiprocessing does
+        # not allow the daemonic prefork pool workers of celery to have
+        # children. Spawn rather than fork as the parent process has threads
+        # and open database connections.
+        with billiard.get_context("spawn").Pool(processes=max_workers) as pool:
+            results = [
+                pool.apply_async(func, kwds=kwargs) for kwargs in kwargs_list
+            ]
+            return [get_result(result.get) for result in results]
+    else:
+        return [get_result(partial(func, **kwargs)) for kwargs in kwargs_list]
+
+
 def _check_all_ids(*, panimg_result: PanImgResult):
     """
     Check the integrity of the conversion job.
@@ -350,14 +478,46 @@ def _store_images(
     images: set[Image],
     image_files: set[ImageFile],
 ):
+    images_by_pk = {}
+
     for image in images:
         image.origin = origin
-        image.full_clean()
-        image.save()
+        # Uniqueness and the origin do not need to be checked for new images
+        image.full_clean(exclude=["origin"], validate_unique=False)
+        images_by_pk[image.pk] = image
+
+    Image.objects.bulk_create(
+        images, batch_size=settings.CASES_IMPORT_BULK_CREATE_BATCH_SIZE
+    )
 
     for obj in image_files:
-        obj.full_clean()
-        obj.save()
+        # Set the instance to avoid fetching the image for each file
+        obj.image = images_by_pk[obj.image_id]
+        obj.full_clean(exclude=["image"], validate_unique=False)
+
+    with ThreadPoolExecutor(
+        max_workers=settings.CASES_IMPORT_TRANSFER_MAX_WORKERS
+    ) as pool:
+        futures = [
+            pool.submit(_upload_image_file, image_file=image_file)
+            for image_file in image_files
+        ]
+
+        for future in futures:
+            # Raises the first exception of any failed upload
+            future.result()
+
+    ImageFile.objects.bulk_create(
+        image_files, batch_size=settings.CASES_IMPORT_BULK_CREATE_BATCH_SIZE
+    )
+
+
+def _upload_image_file(*, image_file):
+    """Does the work of ImageFile.save for new files, without the query"""
+    image_file.size_in_storage = image_file.file.size
+    image_file.file.save(
+        image_file.file.name, image_file.file.file, save=False
+    )
 
 
 def _handle_raw_files(
@@ -366,6 +526,7 @@ def _handle_raw_files(
     file_errors: dict[Path, list[str]],
     base_directory: Path,
     upload_session: RawImageUploadSession,
+    timings: dict[str, float],
 ):
     upload_session.import_result = {
         "consumed_files": [
@@ -376,41 +537,127 @@ def _handle_raw_files(
             for k, v in file_errors.items()
             if k not in consumed_files
         },
+        "timings": timings,
     }
 
 
+@acks_late_2xlarge_task
+@transaction.atomic
+def update_viewer_groups_permissions(*, image_pks):
+    Image.bulk_update_viewer_groups_permissions(image_pks=image_pks)
+
+
+def _schedule_post_processing(*, images, image_files):
+    """
+    Schedules the post processing of new images in batches
+
+    The batches are bounded by the number of images and the total size
+    of their files, as all the files of a batch are downloaded to the
+    scratch disk of the worker.
+    """
+    image_sizes = {image.pk: 0 for image in images}
+
+    for image_file in image_files:
+        image_sizes[image_file.image_id] += image_file.size_in_storage
+
+    batches = []
+    batch, batch_size = [], 0
+
+    for image_pk, image_size in image_sizes.items():
+        if batch and (
+            len(batch) >= settings.CASES_POST_PROCESSING_BATCH_MAX_IMAGES
+            or batch_size + image_size
+            > settings.CASES_POST_PROCESSING_BATCH_MAX_BYTES
+        ):
+            batches.append(batch)
+            batch, batch_size = [], 0
+
+        batch.append(image_pk)
+        batch_size += image_size
+
+    if batch:
+        batches.append(batch)
+
+    for batch in batches:
+        on_commit(
+            post_process_images.signature(
+                kwargs={"image_pks": batch}
+            ).apply_async
+        )
+
+
 @acks_late_2xlarge_task
 @transaction.atomic
 def post_process_image(*, image_pk):
-    with TemporaryDirectory() as output_directory:
+    _post_process_batch(image_pks=[image_pk])
+
+
+@acks_late_2xlarge_task
+@transaction.atomic
+def post_process_images(*, image_pks):
+    _post_process_batch(image_pks=image_pks)
+
+
+def _post_process_batch(*, image_pks):
+    """
+    Post processes a batch of images
+
+    The files of all images are downloaded to one scratch directory,
+    then the post processors are run for each image in parallel.
+    The results of each image are stored separately, an image that fails
+    is logged and left to be post processed again.
+    """
+    with TemporaryDirectory() as scratch_directory:
+        # Skip the images that are being post processed by another task
         image_files = ImageFile.objects.filter(
-            image__pk=image_pk, post_processed=False
-        ).select_for_update(nowait=True)
+            image__pk__in=image_pks, post_processed=False
+        ).select_for_update(skip_locked=True)
 
         # Acquire the locks
         image_files = list(image_files)
 
         panimg_files = _download_image_files(
-            image_files=image_files, dir=output_directory
+            image_files=image_files, dir=scratch_directory
         )
 
-        post_processor_result = post_process(
-            image_files=panimg_files, post_processors=POST_PROCESSORS
+        post_processor_results = _run_post_processors(
+            panimg_files=panimg_files
         )
 
-        _check_post_processor_result(
-            post_processor_result=post_processor_result, image_pk=image_pk
-        )
+        for image_pk, post_processor_result in post_processor_results.items():
+            try:
+                if isinstance(post_processor_result, Exception):
+                    raise post_processor_result
+
+                with transaction.atomic():
+                    _store_post_processor_result(
+                        post_processor_result=post_processor_result,
+                        image_pk=image_pk,
+                        image_files=[
+                            f for f in image_files if f.image_id == image_pk
+                        ],
+                    )
+            except Exception:
+                logger.error(
+                    f"Could not post process image {image_pk}", exc_info=True
+                )
+
+
+def _store_post_processor_result(
+    *, post_processor_result, image_pk, image_files
+):
+    _check_post_processor_result(
+        post_processor_result=post_processor_result, image_pk=image_pk
+    )
 
-        django_result = _convert_panimg_to_internal(
-            new_images=[],
-            new_image_files=post_processor_result.new_image_files,
-        )
+    django_result = _convert_panimg_to_internal(
+        new_images=[], new_image_files=post_processor_result.new_image_files
+    )
 
-        _store_post_processed_images(
-            image_files=image_files,
-            new_image_files=django_result.new_image_files,
-        )
+    _store_post_processed_images(
+        image_files=image_files,
+        new_image_files=django_result.new_image_files,
+    )
 
 
 def _download_image_files(*, image_files, dir):
@@ -419,26 +666,56 @@ def _download_image_files(*, image_files, dir):
 
     Returns a set of PanImgFiles that point to the local files
     """
-    panimg_files = set()
-
-    for im_file in image_files:
-        dest = safe_join(dir, im_file.file.name)
-        panimg_files.add(
-            PanImgFile(
-                image_id=im_file.image.pk,
-                image_type=im_file.image_type,
-                file=dest,
-            )
-        )
+    with ThreadPoolExecutor(
+        max_workers=settings.CASES_IMPORT_TRANSFER_MAX_WORKERS
+    ) as pool:
+        futures = [
+            pool.submit(_download_image_file, image_file=image_file, dir=dir)
+            for image_file in image_files
+        ]
+        return {future.result() for future in futures}
+
+
+def _download_image_file(*, image_file, dir):
+    dest = safe_join(dir, image_file.file.name)
+
+    # Safe to create directories as safe_join has been used
+    Path(dest).parent.mkdir(parents=True, exist_ok=True)
+
+    with image_file.file.open("rb") as fs, open(dest, "wb") as fd:
+        for chunk in fs.chunks():
+            fd.write(chunk)
+
+    return PanImgFile(
+        image_id=image_file.image_id,
+        image_type=image_file.image_type,
+        file=dest,
+    )
+
+
+def _run_post_processors(*, panimg_files):
+    """
+    Runs the post processors for each image, returning the results by image
 
-        # Safe to create directories as safe_join has been used
-        Path(dest).parent.mkdir(parents=True, exist_ok=True)
+    The exception is returned in place of the result of an image if its
+    post processors failed.
+    """
+    files_by_image = {}
 
-        with im_file.file.open("rb") as fs, open(dest, "wb") as fd:
-            for chunk in fs.chunks():
-                fd.write(chunk)
+    for panimg_file in panimg_files:
+        files_by_image.setdefault(panimg_file.image_id, set()).add(panimg_file)
 
-    return panimg_files
+    results = _call_in_processes(
+        func=post_process,
+        kwargs_list=[
+            {"image_files": files, "post_processors": POST_PROCESSORS}
+            for files in files_by_image.values()
+        ],
+        max_workers=settings.CASES_POST_PROCESSING_MAX_WORKERS,
+        return_exceptions=True,
+    )
+
+    return dict(zip(files_by_image, results, strict=True))
 
 
 def _check_post_processor_result(*, post_processor_result, image_pk):
@@ -453,9 +730,9 @@ def _check_post_processor_result(*, post_processor_result, image_pk):
 
 def _store_post_processed_images(*, image_files, new_image_files):
     """Save the post processed files"""
-    for im_file in image_files:
-        im_file.post_processed = True
-        im_file.save(update_fields=["post_processed"])
+    ImageFile.objects.filter(pk__in=[f.pk for f in image_files]).update(
+        post_processed=True
+    )
 
     for obj in new_image_files:
         obj.full_clean()
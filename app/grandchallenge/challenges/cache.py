@@ -0,0 +1,97 @@
+import pickle
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class ChallengeSubdomainCache:
+    """
+    A cache of the challenges that are looked up by their subdomain.
+
+    The pickled challenges are kept in the shared cache, and the most
+    recently used are also kept in this process. Each lookup gets a new
+    instance so that nothing set on a challenge during one request leaks
+    into another. A timeout of zero disables the cache.
+    """
+
+    def __init__(self, *, maxsize):
+        self.maxsize = maxsize
+        self._challenges = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _cache_key(*, short_name):
+        return f"challenges.challenge.subdomain.{short_name.lower()}"
+
+    def get(self, *, short_name):
+        if settings.CHALLENGES_SUBDOMAIN_CACHE_TIMEOUT <= 0:
+            return None
+
+        key = self._cache_key(short_name=short_name)
+
+        with self._lock:
+            try:
+                expires, data = self._challenges[key]
+            except KeyError:
+                data = None
+            else:
+                if expires > time.monotonic():
+                    self._challenges.move_to_end(key)
+                else:
+                    del self._challenges[key]
+                    data = None
+
+        if data is None:
+            data = cache.get(key)
+
+            if data is None:
+                return None
+
+            self._set_local(key=key, data=data)
+
+        return pickle.loads(data)
+
+    def set(self, *, short_name, challenge):
+        if settings.CHALLENGES_SUBDOMAIN_CACHE_TIMEOUT <= 0:
+            return
+
+        key = self._cache_key(short_name=short_name)
+        data = pickle.dumps(challenge)
+
+        cache.set(
+            key, data, timeout=settings.CHALLENGES_SUBDOMAIN_CACHE_TIMEOUT
+        )
+        self._set_local(key=key, data=data)
+
+    def _set_local(self, *, key, data):
+        expires = (
+            time.monotonic()
+            + settings.CHALLENGES_SUBDOMAIN_CACHE_LOCAL_TIMEOUT
+        )
+
+        with self._lock:
+            self._challenges[key] = (expires, data)
+            self._challenges.move_to_end(key)
+
+            while len(self._challenges) > self.maxsize:
+                self._challenges.popitem(last=False)
+
+    def invalidate(self, *, short_name):
+        key = self._cache_key(short_name=short_name)
+
+        with self._lock:
+            self._challenges.pop(key, None)
+
+        cache.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._challenges.clear()
+
+
+challenge_subdomain_cache = ChallengeSubdomainCache(
+    maxsize=settings.CHALLENGES_SUBDOMAIN_CACHE_SIZE
+)
@@ -13,7 +13,7 @@ from grandchallenge.components.models import ComponentInterfaceValue
 from grandchallenge.evaluation.models import Evaluation, Method
 
 
-def annotate_job_duration_and_compute_costs(*, phase):
+def get_phase_jobs(*, phase):
     algorithm_jobs = (
         Job.objects.with_duration()
         .filter(
@@ -26,17 +26,10 @@ def annotate_job_duration_and_compute_costs(*, phase):
         submission__phase=phase, submission__phase__external_evaluation=False
     ).distinct()
 
-    update_average_algorithm_job_duration(
-        phase=phase, algorithm_jobs=algorithm_jobs
-    )
-    update_compute_cost_euro_millicents(
-        obj=phase,
-        algorithm_jobs=algorithm_jobs,
-        evaluation_jobs=evaluation_jobs,
-    )
+    return algorithm_jobs, evaluation_jobs
 
 
-def annotate_compute_costs_and_storage_size(*, challenge):
+def get_challenge_jobs(*, challenge):
     permission = Permission.objects.get(
         codename="view_job",
         content_type__app_label="algorithms",
@@ -52,16 +45,25 @@ def annotate_compute_costs_and_storage_size(*, challenge):
         submission__phase__external_evaluation=False,
     ).distinct()
 
+    return algorithm_jobs, evaluation_jobs
+
+
+def annotate_job_duration(*, phase):
+    algorithm_jobs, _ = get_phase_jobs(phase=phase)
+
+    update_average_algorithm_job_duration(
+        phase=phase, algorithm_jobs=algorithm_jobs
+    )
+
+
+def annotate_storage_size(*, challenge):
+    algorithm_jobs, evaluation_jobs = get_challenge_jobs(challenge=challenge)
+
     update_size_in_storage_and_registry(
         challenge=challenge,
         algorithm_jobs=algorithm_jobs,
         evaluation_jobs=evaluation_jobs,
     )
-    update_compute_cost_euro_millicents(
-        obj=challenge,
-        algorithm_jobs=algorithm_jobs,
-        evaluation_jobs=evaluation_jobs,
-    )
 
 
 def update_size_in_storage_and_registry(
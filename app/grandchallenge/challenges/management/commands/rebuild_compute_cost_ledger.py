@@ -0,0 +1,58 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from grandchallenge.challenges.costs import (
+    get_challenge_jobs,
+    get_phase_jobs,
+    update_compute_cost_euro_millicents,
+)
+from grandchallenge.challenges.models import Challenge, ComputeCostEntry
+from grandchallenge.evaluation.models import Phase
+
+
+class Command(BaseCommand):
+    help = "Rebuild the compute cost ledger from the jobs and evaluations"
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        ComputeCostEntry.objects.all().delete()
+
+        entries = []
+
+        for challenge in Challenge.objects.iterator():
+            algorithm_jobs, evaluation_jobs = get_challenge_jobs(
+                challenge=challenge
+            )
+            update_compute_cost_euro_millicents(
+                obj=challenge,
+                algorithm_jobs=algorithm_jobs,
+                evaluation_jobs=evaluation_jobs,
+            )
+            entries.append(
+                ComputeCostEntry(
+                    challenge=challenge,
+                    compute_cost_euro_millicents=challenge.compute_cost_euro_millicents,
+                )
+            )
+
+        for phase in Phase.objects.iterator():
+            algorithm_jobs, evaluation_jobs = get_phase_jobs(phase=phase)
+            update_compute_cost_euro_millicents(
+                obj=phase,
+                algorithm_jobs=algorithm_jobs,
+                evaluation_jobs=evaluation_jobs,
+            )
+            entries.append(
+                ComputeCostEntry(
+                    phase=phase,
+                    compute_cost_euro_millicents=phase.compute_cost_euro_millicents,
+                )
+            )
+
+        entries = ComputeCostEntry.objects.bulk_create(
+            entries, batch_size=1000
+        )
+
+        self.stdout.write(
+            f"Compute cost ledger rebuilt with {len(entries)} entries"
+        )
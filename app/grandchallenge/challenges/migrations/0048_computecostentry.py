@@ -0,0 +1,68 @@
+# Generated by Django 4.2.17 on 2025-02-03 09:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "challenges",
+            "0047_challenge_percent_budget_consumed_warning_thresholds",
+        ),
+        ("evaluation", "0072_evaluationmetric"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComputeCostEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, db_index=True),
+                ),
+                (
+                    "compute_cost_euro_millicents",
+                    models.BigIntegerField(
+                        help_text="The change in compute cost in Euro Cents, including Tax"
+                    ),
+                ),
+                (
+                    "challenge",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="challenges.challenge",
+                    ),
+                ),
+                (
+                    "phase",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="evaluation.phase",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="computecostentry",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("challenge__isnull", True),
+                    ("phase__isnull", True),
+                    _connector="XOR",
+                ),
+                name="computecostentry_challenge_xor_phase",
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import datetime
 import logging
 import math
+from functools import partial
 from itertools import chain, product
 
 from actstream.actions import follow, unfollow
@@ -18,7 +19,7 @@ from django.core.validators import (
 )
 from django.db import models
 from django.db.models import ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
-from django.db.models.signals import post_delete, pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.db.transaction import on_commit
 from django.dispatch import receiver
 from django.template.loader import render_to_string
@@ -40,6 +41,7 @@ from machina.apps.forum_permission.models import (
 from stdimage import JPEGField
 
 from grandchallenge.anatomy.models import BodyStructure
+from grandchallenge.challenges.cache import challenge_subdomain_cache
 from grandchallenge.challenges.emails import (
     send_challenge_requested_email_to_requester,
     send_challenge_requested_email_to_reviewers,
@@ -703,6 +705,21 @@ class Challenge(ChallengeBase, FieldChangeMixin):
         user.groups.remove(self.admins_group)
         unfollow(user=user, obj=self.forum, send_action=False)
 
+    def invalidate_subdomain_cache(self):
+        # The challenge could also be cached under its previous short name
+        short_names = {
+            self.short_name,
+            self._initial_state.get("short_name", self.short_name),
+        }
+
+        for short_name in short_names:
+            on_commit(
+                partial(
+                    challenge_subdomain_cache.invalidate,
+                    short_name=short_name,
+                )
+            )
+
     @cached_property
     def should_show_verification_warning(self):
         for phase in self.visible_phases:
@@ -834,6 +851,76 @@ class ChallengeGroupObjectPermission(GroupObjectPermissionBase):
     content_object = models.ForeignKey(Challenge, on_delete=models.CASCADE)
 
 
+class ComputeCostEntry(models.Model):
+    """
+    A change in the compute costs of a challenge or of a phase
+
+    This is an append-only ledger, the entries are added when the compute
+    costs of algorithm jobs or evaluations change. The totals of the
+    challenges and phases with recent entries are updated from the
+    ledger by update_compute_costs_and_storage_size.
+    """
+
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    challenge = models.ForeignKey(
+        Challenge, null=True, on_delete=models.CASCADE
+    )
+    phase = models.ForeignKey(
+        "evaluation.Phase", null=True, on_delete=models.CASCADE
+    )
+    compute_cost_euro_millicents = models.BigIntegerField(
+        help_text="The change in compute cost in Euro Cents, including Tax"
+    )
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=Q(challenge__isnull=True) ^ Q(phase__isnull=True),
+                name="computecostentry_challenge_xor_phase",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.compute_cost_euro_millicents} for "
+            f"{self.challenge or self.phase} at {self.created}"
+        )
+
+    @classmethod
+    def add_compute_costs(
+        cls, *, challenge_pks, phase_pks, compute_cost_euro_millicents
+    ):
+        cls.objects.bulk_create(
+            [
+                *(
+                    cls(
+                        challenge_id=pk,
+                        compute_cost_euro_millicents=compute_cost_euro_millicents,
+                    )
+                    for pk in challenge_pks
+                ),
+                *(
+                    cls(
+                        phase_id=pk,
+                        compute_cost_euro_millicents=compute_cost_euro_millicents,
+                    )
+                    for pk in phase_pks
+                ),
+            ]
+        )
+
+    @classmethod
+    def get_totals(cls, *, field, pks):
+        """The total compute costs of the challenges or phases by pk"""
+        return dict(
+            cls.objects.filter(**{f"{field}__in": pks})
+            .values(field)
+            .annotate(total=Sum("compute_cost_euro_millicents"))
+            .values_list(field, "total")
+            .order_by()
+        )
+
+
 @receiver(post_delete, sender=Challenge)
 def delete_challenge_groups_hook(*_, instance: Challenge, using, **__):
     """
@@ -853,6 +940,12 @@ def delete_challenge_groups_hook(*_, instance: Challenge, using, **__):
         pass
 
 
+@receiver(post_save, sender=Challenge)
+@receiver(post_delete, sender=Challenge)
+def invalidate_challenge_subdomain_cache(*_, instance: Challenge, **__):
+    instance.invalidate_subdomain_cache()
+
+
 @receiver(pre_delete, sender=Challenge)
 def delete_challenge_follows(*_, instance: Challenge, **__):
     ct = ContentType.objects.filter(
@@ -1,17 +1,19 @@
 import functools
 import random
 import time
+from datetime import timedelta
 
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.db.models import Count, Max
+from django.utils.timezone import now
 from psycopg.errors import LockNotAvailable
 
 from grandchallenge.challenges.costs import (
-    annotate_compute_costs_and_storage_size,
-    annotate_job_duration_and_compute_costs,
+    annotate_job_duration,
+    annotate_storage_size,
 )
-from grandchallenge.challenges.models import Challenge
+from grandchallenge.challenges.models import Challenge, ComputeCostEntry
 from grandchallenge.core.celery import acks_late_2xlarge_task
 from grandchallenge.evaluation.models import Evaluation, Phase
 
@@ -85,34 +87,80 @@ def retry_with_backoff(exceptions, max_attempts=5, base_delay=1, max_delay=10):
 
 @acks_late_2xlarge_task
 def update_compute_costs_and_storage_size():
-    for challenge in Challenge.objects.with_available_compute().iterator():
-        with transaction.atomic():
-            annotate_compute_costs_and_storage_size(challenge=challenge)
+    """
+    Update the challenges and phases that have recent compute costs
+
+    The compute costs are the totals from the cost ledger, the storage
+    size and average job duration are recalculated.
+    """
+    # This task runs hourly, look back further to include entries from
+    # transactions that were committed late
+    recent_entries = ComputeCostEntry.objects.filter(
+        created__gt=now() - timedelta(hours=2)
+    )
+    challenge_pks = {
+        *recent_entries.filter(challenge__isnull=False)
+        .values_list("challenge", flat=True)
+        .distinct()
+    }
+    phase_pks = {
+        *recent_entries.filter(phase__isnull=False)
+        .values_list("phase", flat=True)
+        .distinct()
+    }
 
-            @retry_with_backoff((LockNotAvailable,))
-            def save_challenge():
-                challenge.save(
-                    update_fields=(
-                        "size_in_storage",
-                        "size_in_registry",
-                        "compute_cost_euro_millicents",
-                    )
-                )
+    challenge_totals = ComputeCostEntry.get_totals(
+        field="challenge", pks=challenge_pks
+    )
+
+    for challenge in (
+        Challenge.objects.with_available_compute()
+        .filter(pk__in=challenge_pks)
+        .iterator()
+    ):
+        with transaction.atomic():
+            challenge.compute_cost_euro_millicents = max(
+                challenge_totals.get(challenge.pk, 0), 0
+            )
+            annotate_storage_size(challenge=challenge)
+            _save_with_backoff(
+                obj=challenge,
+                update_fields=(
+                    "size_in_storage",
+                    "size_in_registry",
+                    "compute_cost_euro_millicents",
+                ),
+            )
+
+    phase_totals = ComputeCostEntry.get_totals(field="phase", pks=phase_pks)
+
+    for phase in Phase.objects.filter(pk__in=phase_pks).iterator():
+        with transaction.atomic():
+            phase.compute_cost_euro_millicents = max(
+                phase_totals.get(phase.pk, 0), 0
+            )
+            annotate_job_duration(phase=phase)
+            _save_with_backoff(
+                obj=phase,
+                skip_calculate_ranks=True,
+                update_fields=(
+                    "average_algorithm_job_duration",
+                    "compute_cost_euro_millicents",
+                ),
+            )
 
-            save_challenge()
 
-    for phase in Phase.objects.iterator():
+@acks_late_2xlarge_task
+def update_storage_size():
+    for challenge in Challenge.objects.iterator():
         with transaction.atomic():
-            annotate_job_duration_and_compute_costs(phase=phase)
-
-            @retry_with_backoff((LockNotAvailable,))
-            def save_phase():
-                phase.save(
-                    skip_calculate_ranks=True,
-                    update_fields=(
-                        "average_algorithm_job_duration",
-                        "compute_cost_euro_millicents",
-                    ),
-                )
-
-            save_phase()
+            annotate_storage_size(challenge=challenge)
+            _save_with_backoff(
+                obj=challenge,
+                update_fields=("size_in_storage", "size_in_registry"),
+            )
+
+
+@retry_with_backoff((LockNotAvailable,))
+def _save_with_backoff(*, obj, **kwargs):
+    obj.save(**kwargs)
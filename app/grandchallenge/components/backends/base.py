@@ -2,7 +2,9 @@ import io
 import json
 import logging
 import os
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from json import JSONDecodeError
 from math import ceil
 from pathlib import Path
@@ -12,6 +14,8 @@ from uuid import UUID
 
 import boto3
 import botocore
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from django.conf import settings
 from django.core.exceptions import SuspiciousFileOperation, ValidationError
 from django.db import transaction
@@ -51,6 +55,7 @@ class Executor(ABC):
         requires_gpu_type: GPUTypeChoices,
         algorithm_model=None,
         ground_truth=None,
+        input_size_bytes=None,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
@@ -64,12 +69,32 @@ class Executor(ABC):
         self.__s3_client = None
         self._algorithm_model = algorithm_model
         self._ground_truth = ground_truth
+        self._provisioned_size_bytes = input_size_bytes
+        self._output_metrics = []
 
     def provision(self, *, input_civs, input_prefixes):
-        self._provision_inputs(
-            input_civs=input_civs, input_prefixes=input_prefixes
-        )
-        self._provision_auxilliary_data()
+        # Clients are thread safe, so create one to share with the pool
+        _ = self._s3_client
+
+        with ThreadPoolExecutor(
+            max_workers=settings.COMPONENTS_PROVISIONING_MAX_WORKERS
+        ) as pool:
+            futures = [
+                *self._provision_inputs(
+                    input_civs=input_civs,
+                    input_prefixes=input_prefixes,
+                    pool=pool,
+                ),
+                *self._provision_auxilliary_data(pool=pool),
+            ]
+
+            # Raises the first exception of any failed copy
+            self._provisioned_size_bytes = sum(f.result() for f in futures)
+
+    @property
+    def provisioned_size_bytes(self):
+        """The total size of the provisioned inputs, if known"""
+        return self._provisioned_size_bytes
 
     @abstractmethod
     def execute(self, *, input_civs, input_prefixes): ...
@@ -80,11 +105,17 @@ class Executor(ABC):
     def get_outputs(self, *, output_interfaces):
         """Create ComponentInterfaceValues from the output interfaces"""
         outputs = []
+        self._output_metrics = []
+
+        # Clients are thread safe, so create one to share with the pool
+        _ = self._s3_client
 
         with transaction.atomic():
             # Atomic block required as create_instance needs to
             # create interfaces in order to store the files
             for interface in output_interfaces:
+                start = time.monotonic()
+
                 if interface.is_image_kind:
                     res = self._create_images_result(interface=interface)
                 elif interface.is_json_kind:
@@ -92,6 +123,12 @@ class Executor(ABC):
                 else:
                     res = self._create_file_result(interface=interface)
 
+                self._output_metrics.append(
+                    {
+                        "interface": interface.slug,
+                        "duration": time.monotonic() - start,
+                    }
+                )
                 outputs.append(res)
 
         return outputs
@@ -139,6 +176,10 @@ class Executor(ABC):
     @abstractmethod
     def runtime_metrics(self): ...
 
+    @property
+    def output_metrics(self):
+        return self._output_metrics
+
     @property
     def invocation_environment(self):
         env = {  # Up to 16 pairs
@@ -198,9 +239,21 @@ class Executor(ABC):
             self.__s3_client = boto3.client(
                 "s3",
                 endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                config=Config(
+                    max_pool_connections=self._s3_max_pool_connections
+                ),
             )
         return self.__s3_client
 
+    @property
+    def _s3_max_pool_connections(self):
+        # The client is shared by the workers of the provisioning and
+        # output download pools, each of which can run a multipart transfer
+        return settings.COMPONENTS_TRANSFER_MAX_CONCURRENCY * max(
+            settings.COMPONENTS_PROVISIONING_MAX_WORKERS,
+            settings.COMPONENTS_OUTPUT_DOWNLOAD_MAX_WORKERS,
+        )
+
     @property
     def _auxiliary_data_prefix(self):
         return safe_join("/auxiliary-data", *self.job_path_parts)
@@ -224,6 +277,9 @@ class Executor(ABC):
 
     @cached_property
     def _input_size_bytes(self):
+        if self._provisioned_size_bytes is not None:
+            return self._provisioned_size_bytes
+
         inputs_size_bytes = self._get_input_prefix_size_bytes(
             prefix=self._io_prefix
         )
@@ -282,57 +338,117 @@ class Executor(ABC):
             "output_prefix": self._io_prefix,
         }
 
-    def _provision_inputs(self, *, input_civs, input_prefixes):
+    def _provision_inputs(self, *, input_civs, input_prefixes, pool):
+        """
+        Submits the copies and uploads of the inputs to the pool.
+
+        Only the requests to S3 are made by the pool, the database is only
+        accessed from this thread. Returns the futures of the sizes of the
+        provisioned objects.
+        """
+        futures = []
+
         for civ in input_civs:
             key, _ = self._get_key_and_relative_path(
                 civ=civ, input_prefixes=input_prefixes
             )
 
             if civ.image:
-                self._copy_input_file(src=civ.image_file, dest_key=key)
+                futures.append(
+                    self._copy_input_file(
+                        src=civ.image_file, dest_key=key, pool=pool
+                    )
+                )
             elif civ.file:
-                self._copy_input_file(src=civ.file, dest_key=key)
+                futures.append(
+                    self._copy_input_file(
+                        src=civ.file, dest_key=key, pool=pool
+                    )
+                )
             else:
-                with io.BytesIO() as f:
-                    f.write(json.dumps(civ.value).encode("utf-8"))
-                    f.seek(0)
-                    self._s3_client.upload_fileobj(
-                        Fileobj=f,
-                        Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
-                        Key=key,
+                futures.append(
+                    pool.submit(
+                        self._upload_input_bytes,
+                        body=json.dumps(civ.value).encode("utf-8"),
+                        dest_key=key,
                     )
+                )
+
+        return futures
+
+    def _provision_auxilliary_data(self, *, pool):
+        futures = []
 
-    def _provision_auxilliary_data(self):
         if self._algorithm_model:
-            self._copy_input_file(
-                src=self._algorithm_model, dest_key=self._algorithm_model_key
+            futures.append(
+                self._copy_input_file(
+                    src=self._algorithm_model,
+                    dest_key=self._algorithm_model_key,
+                    pool=pool,
+                )
             )
         if self._ground_truth:
-            self._copy_input_file(
-                src=self._ground_truth, dest_key=self._ground_truth_key
+            futures.append(
+                self._copy_input_file(
+                    src=self._ground_truth,
+                    dest_key=self._ground_truth_key,
+                    pool=pool,
+                )
+            )
+
+        return futures
+
+    def _copy_input_file(self, *, src, dest_key, pool):
+        return pool.submit(
+            self._copy_input_object,
+            copy_source={"Bucket": src.storage.bucket_name, "Key": src.name},
+            dest_key=dest_key,
+        )
+
+    @cached_property
+    def _provisioning_transfer_config(self):
+        return TransferConfig(
+            multipart_threshold=settings.COMPONENTS_PROVISIONING_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.COMPONENTS_PROVISIONING_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.COMPONENTS_TRANSFER_MAX_CONCURRENCY,
+        )
+
+    def _copy_input_object(self, *, copy_source, dest_key):
+        """Copies an object within S3, returns the size of the object"""
+        size = self._s3_client.head_object(**copy_source)["ContentLength"]
+
+        if size < settings.COMPONENTS_PROVISIONING_MULTIPART_THRESHOLD:
+            self._s3_client.copy_object(
+                CopySource=copy_source,
+                Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+                Key=dest_key,
+            )
+        else:
+            # Uses a server side multipart copy
+            self._s3_client.copy(
+                CopySource=copy_source,
+                Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+                Key=dest_key,
+                Config=self._provisioning_transfer_config,
             )
 
-    def _copy_input_file(self, *, src, dest_key):
-        self._s3_client.copy(
-            CopySource={"Bucket": src.storage.bucket.name, "Key": src.name},
+        return size
+
+    def _upload_input_bytes(self, *, body, dest_key):
+        """Uploads a small input, returns the size of the object"""
+        self._s3_client.put_object(
+            Body=body,
             Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
             Key=dest_key,
         )
+        return len(body)
 
     def _create_images_result(self, *, interface):
         prefix = safe_join(self._io_prefix, interface.relative_path)
 
-        response = self._s3_client.list_objects_v2(
-            Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
-            Prefix=(prefix.lstrip("/") if settings.USING_MINIO else prefix),
+        output_files = self._list_output_files(
+            prefix=prefix, relative_path=interface.relative_path
         )
-
-        if response.get("IsTruncated", False):
-            raise ComponentException(
-                f"Too many files produced in {interface.relative_path!r}"
-            )
-
-        output_files = response.get("Contents", [])
         if not output_files:
             raise ComponentException(
                 f"Output directory {interface.relative_path!r} is empty"
@@ -379,40 +495,85 @@ class Executor(ABC):
 
         return civ
 
+    def _list_output_files(self, *, prefix, relative_path):
+        paginator = self._s3_client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+            Prefix=(prefix.lstrip("/") if settings.USING_MINIO else prefix),
+        )
+
+        output_files = []
+
+        for page in pages:
+            output_files.extend(page.get("Contents", []))
+
+            if len(output_files) > settings.COMPONENTS_MAXIMUM_OUTPUT_FILES:
+                raise ComponentException(
+                    f"Too many files produced in {relative_path!r}"
+                )
+
+        return output_files
+
+    @cached_property
+    def _output_download_transfer_config(self):
+        return TransferConfig(
+            multipart_threshold=settings.COMPONENTS_OUTPUT_DOWNLOAD_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.COMPONENTS_OUTPUT_DOWNLOAD_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.COMPONENTS_TRANSFER_MAX_CONCURRENCY,
+        )
+
     def _download_output_files(self, *, output_files, tmpdir, prefix):
-        for file in output_files:
-            try:
-                root_key = safe_join("/", file["Key"])
-                dest = safe_join(tmpdir, Path(root_key).relative_to(prefix))
-            except (SuspiciousFileOperation, ValueError):
-                logger.warning(f"Skipping {file=}")
-                continue
-
-            logger.info(
-                f"Downloading {file['Key']} to {dest} from "
-                f"{settings.COMPONENTS_OUTPUT_BUCKET_NAME}"
-            )
+        with ThreadPoolExecutor(
+            max_workers=settings.COMPONENTS_OUTPUT_DOWNLOAD_MAX_WORKERS
+        ) as pool:
+            futures = []
+
+            for file in output_files:
+                try:
+                    root_key = safe_join("/", file["Key"])
+                    dest = safe_join(
+                        tmpdir, Path(root_key).relative_to(prefix)
+                    )
+                except (SuspiciousFileOperation, ValueError):
+                    logger.warning(f"Skipping {file=}")
+                    continue
 
-            Path(dest).parent.mkdir(parents=True, exist_ok=True)
-            self._s3_client.download_file(
-                Filename=dest,
-                Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
-                Key=file["Key"],
-            )
+                logger.info(
+                    f"Downloading {file['Key']} to {dest} from "
+                    f"{settings.COMPONENTS_OUTPUT_BUCKET_NAME}"
+                )
+
+                Path(dest).parent.mkdir(parents=True, exist_ok=True)
+                futures.append(
+                    pool.submit(
+                        self._s3_client.download_file,
+                        Filename=dest,
+                        Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+                        Key=file["Key"],
+                        Config=self._output_download_transfer_config,
+                    )
+                )
+
+            for future in futures:
+                # Raises the first exception of any failed download
+                future.result()
 
     def _create_json_result(self, *, interface):
         key = safe_join(self._io_prefix, interface.relative_path)
 
         try:
-            with io.BytesIO() as fileobj:
+            # Large files are spooled to disk rather than held in memory
+            # alongside the parsed result
+            with SpooledTemporaryFile(max_size=MAX_SPOOL_SIZE) as fileobj:
                 self._s3_client.download_fileobj(
                     Fileobj=fileobj,
                     Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
                     Key=key,
+                    Config=self._output_download_transfer_config,
                 )
                 fileobj.seek(0)
-                result = json.loads(
-                    fileobj.read().decode("utf-8"),
+                result = json.load(
+                    io.TextIOWrapper(fileobj, encoding="utf-8"),
                     parse_constant=lambda x: None,  # Removes -inf, inf and NaN
                 )
             civ = interface.create_instance(value=result)
@@ -440,6 +601,7 @@ class Executor(ABC):
                     Fileobj=fileobj,
                     Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
                     Key=key,
+                    Config=self._output_download_transfer_config,
                 )
                 fileobj.seek(0)
                 civ = interface.create_instance(fileobj=fileobj)
@@ -8,10 +8,8 @@ from grandchallenge.cases.widgets import (
     FlexibleImageWidget,
 )
 from grandchallenge.components.models import ComponentInterfaceValue
-from grandchallenge.components.schemas import INTERFACE_VALUE_SCHEMA
 from grandchallenge.components.widgets import SelectUploadWidget
 from grandchallenge.core.guardian import get_objects_for_user
-from grandchallenge.core.validators import JSONValidator
 from grandchallenge.core.widgets import JSONEditorWidget
 from grandchallenge.serving.models import (
     get_component_interface_values_for_user,
@@ -137,15 +135,13 @@ class InterfaceFormField:
 
     def get_json_field(self):
         field_type = self.instance.default_field
-        default_schema = {
-            **INTERFACE_VALUE_SCHEMA,
-            "anyOf": [{"$ref": f"#/definitions/{self.instance.kind}"}],
-        }
         if field_type == forms.JSONField:
-            self.kwargs["widget"] = JSONEditorWidget(schema=default_schema)
+            self.kwargs["widget"] = JSONEditorWidget(
+                schema=self.instance.default_schema
+            )
         self.kwargs["validators"] = [
-            JSONValidator(schema=default_schema),
-            JSONValidator(schema=self.instance.schema),
+            self.instance.default_schema_validator,
+            self.instance.schema_validator,
         ]
         extra_help = ""
         return field_type(
@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand
+
+from grandchallenge.components.models import ComponentInterfaceValue
+
+
+class Command(BaseCommand):
+    help = "Set the content hash of values that do not have one"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The number of values to update in each query",
+        )
+
+    def handle(self, *args, **options):
+        queryset = ComponentInterfaceValue.objects.filter(
+            content_hash=""
+        ).only("pk", "value", "image", "file", "content_hash")
+
+        last_pk = 0
+        n_updated = 0
+
+        while batch := [
+            *queryset.filter(pk__gt=last_pk).order_by("pk")[
+                : options["batch_size"]
+            ]
+        ]:
+            for civ in batch:
+                civ.content_hash = civ.calculate_content_hash()
+
+            n_updated += ComponentInterfaceValue.objects.bulk_update(
+                [civ for civ in batch if civ.content_hash],
+                fields=["content_hash"],
+            )
+            last_pk = batch[-1].pk
+
+        self.stdout.write(f"Content hashes set for {n_updated} values")
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.17 on 2025-02-10 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("components", "0024_alter_componentinterface_kind_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="componentinterfacevalue",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="The hash of the canonical value, the pk of the image or the sha256 of the file, used to find existing values",
+                max_length=71,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.17 on 2025-02-10 09:13
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is created concurrently as the values table is large
+    atomic = False
+
+    dependencies = [
+        ("components", "0025_componentinterfacevalue_content_hash"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="componentinterfacevalue",
+            index=models.Index(
+                fields=["interface", "content_hash"],
+                name="components__interfa_3334b0_idx",
+            ),
+        ),
+    ]
@@ -2,6 +2,7 @@ import json
 import logging
 import re
 from datetime import timedelta
+from hashlib import sha256
 from json import JSONDecodeError
 from pathlib import Path
 from tempfile import NamedTemporaryFile
@@ -53,6 +54,7 @@ from grandchallenge.components.tasks import (
     _repo_login_and_run,
     assign_docker_image_from_upload,
     deprovision_job,
+    get_object_sha256,
     provision_job,
     validate_docker_image,
 )
@@ -81,6 +83,7 @@ from grandchallenge.core.validators import (
     ExtensionValidator,
     JSONSchemaValidator,
     JSONValidator,
+    JSONValidatorCache,
     MimeTypeValidator,
 )
 from grandchallenge.uploads.models import UserUpload
@@ -394,6 +397,11 @@ class OverlaySegmentsMixin(models.Model):
         abstract = True
 
 
+json_validator_cache = JSONValidatorCache(
+    maxsize=settings.JSON_SCHEMA_VALIDATOR_CACHE_SIZE
+)
+
+
 class ComponentInterface(OverlaySegmentsMixin):
     Kind = InterfaceKind.InterfaceKindChoices
     SuperKind = InterfaceSuperKindChoices
@@ -462,10 +470,20 @@ class ComponentInterface(OverlaySegmentsMixin):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._overlay_segments_orig = self.overlay_segments
+        self._schema_orig = self.schema
 
     def __str__(self):
         return f"{self.title} ({self.get_kind_display()})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        if self._schema_orig != self.schema:
+            json_validator_cache.evict(
+                key=self._get_schema_validator_key(schema=self._schema_orig)
+            )
+            self._schema_orig = self.schema
+
     @property
     def is_image_kind(self):
         return self.kind in InterfaceKind.interface_type_image()
@@ -681,17 +699,39 @@ class ComponentInterface(OverlaySegmentsMixin):
                 f"The example value for this interface is not valid: {error}"
             )
 
+    @property
+    def default_schema(self):
+        return {
+            **INTERFACE_VALUE_SCHEMA,
+            "anyOf": [{"$ref": f"#/definitions/{self.kind}"}],
+        }
+
+    @property
+    def default_schema_validator(self):
+        return json_validator_cache.get(
+            key=("kind", self.kind), schema=self.default_schema
+        )
+
+    @staticmethod
+    def _get_schema_validator_key(*, schema):
+        schema_hash = sha256(
+            json.dumps(schema, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return ("schema", schema_hash)
+
+    @property
+    def schema_validator(self):
+        return json_validator_cache.get(
+            key=self._get_schema_validator_key(schema=self.schema),
+            schema=self.schema,
+        )
+
     def validate_against_schema(self, *, value):
         """Validates values against both default and custom schemas"""
-        JSONValidator(
-            schema={
-                **INTERFACE_VALUE_SCHEMA,
-                "anyOf": [{"$ref": f"#/definitions/{self.kind}"}],
-            }
-        )(value=value)
+        self.default_schema_validator(value=value)
 
         if self.schema:
-            JSONValidator(schema=self.schema)(value=value)
+            self.schema_validator(value=value)
 
     @cached_property
     def value_required(self):
@@ -1249,11 +1289,28 @@ def component_interface_value_path(instance, filename):
 
 class ComponentInterfaceValueManager(models.Manager):
 
-    def get_first_or_create(self, **kwargs):
-        try:
-            return self.get_or_create(**kwargs)
-        except MultipleObjectsReturned:
-            return self.filter(**kwargs).first(), False
+    def get_first_or_create(self, *, interface, value=None, image=None):
+        """Get the first value with the same content, or create a new one"""
+        if image is None:
+            content_hash = ComponentInterfaceValue.get_value_content_hash(
+                value=value
+            )
+        else:
+            content_hash = ComponentInterfaceValue.get_image_content_hash(
+                image_pk=image.pk
+            )
+
+        civ = self.filter(
+            interface=interface, content_hash=content_hash
+        ).first()
+
+        if civ is None:
+            return (
+                self.create(interface=interface, value=value, image=image),
+                True,
+            )
+        else:
+            return civ, False
 
 
 class ComponentInterfaceValue(models.Model):
@@ -1322,6 +1379,16 @@ class ComponentInterfaceValue(models.Model):
         default=0,
         help_text="The number of bytes stored in the storage backend",
     )
+    content_hash = models.CharField(
+        max_length=71,
+        editable=False,
+        blank=True,
+        default="",
+        help_text=(
+            "The hash of the canonical value, the pk of the image or the "
+            "sha256 of the file, used to find existing values"
+        ),
+    )
 
     _user_upload_validated = False
 
@@ -1416,11 +1483,43 @@ class ComponentInterfaceValue(models.Model):
                 "Please create a new CIV instead."
             )
 
-        if self._file_orig != self.file:
+        file_changed = self._file_orig != self.file
+
+        if file_changed:
             self.update_size_in_storage()
 
+        if not self.file:
+            self.content_hash = self.calculate_content_hash()
+
         super().save(*args, **kwargs)
 
+        if self.file and file_changed:
+            # The file is only in storage once the instance has been saved
+            self.content_hash = self.calculate_content_hash()
+            ComponentInterfaceValue.objects.filter(pk=self.pk).update(
+                content_hash=self.content_hash
+            )
+
+    @staticmethod
+    def get_value_content_hash(*, value):
+        canonical_value = json.dumps(
+            value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return f"json:{sha256(canonical_value.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def get_image_content_hash(*, image_pk):
+        return f"image:{image_pk}"
+
+    def calculate_content_hash(self):
+        if self.image_id:
+            return self.get_image_content_hash(image_pk=self.image_id)
+        elif self.file:
+            # Empty if the checksum is not available
+            return get_object_sha256(self.file)
+        else:
+            return self.get_value_content_hash(value=self.value)
+
     def clean(self):
         super().clean()
         attributes = [
@@ -1530,6 +1629,7 @@ class ComponentInterfaceValue(models.Model):
 
     class Meta:
         ordering = ("pk",)
+        indexes = [models.Index(fields=["interface", "content_hash"])]
 
 
 class ComponentJobManager(models.QuerySet):
@@ -1617,6 +1717,12 @@ class ComponentJob(FieldChangeMixin, UUIDModel):
         default=None,
         help_text="The total compute cost for this job in Euro Cents, including Tax",
     )
+    input_size_bytes = models.PositiveBigIntegerField(
+        editable=False,
+        null=True,
+        default=None,
+        help_text="The total size of the provisioned inputs in bytes",
+    )
     input_prefixes = models.JSONField(
         default=dict,
         editable=False,
@@ -1745,6 +1851,26 @@ class ComponentJob(FieldChangeMixin, UUIDModel):
         elif self.status in [self.FAILURE, self.CANCELLED]:
             on_commit(self.execute_task_on_failure)
 
+    def get_compute_cost_change(self, *, adding, update_fields=None):
+        """The change in compute cost that was saved with this job"""
+        if (
+            update_fields is not None
+            and "compute_cost_euro_millicents" not in update_fields
+        ):
+            return 0
+        elif adding:
+            previous_cost = None
+        elif hasattr(self, "_saved_compute_cost_euro_millicents"):
+            previous_cost = self._saved_compute_cost_euro_millicents
+        else:
+            previous_cost = self.initial_value("compute_cost_euro_millicents")
+
+        self._saved_compute_cost_euro_millicents = (
+            self.compute_cost_euro_millicents
+        )
+
+        return (self.compute_cost_euro_millicents or 0) - (previous_cost or 0)
+
     @property
     def executor_kwargs(self):
         return {
@@ -1753,6 +1879,7 @@ class ComponentJob(FieldChangeMixin, UUIDModel):
             "time_limit": self.time_limit,
             "requires_gpu_type": self.requires_gpu_type,
             "memory_limit": self.requires_memory_gb,
+            "input_size_bytes": self.input_size_bytes,
         }
 
     def get_executor(self, *, backend):
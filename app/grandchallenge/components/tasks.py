@@ -27,7 +27,6 @@ from django.db.models import DateTimeField, ExpressionWrapper, F
 from django.db.transaction import on_commit
 from django.utils.module_loading import import_string
 from django.utils.timezone import now
-from panimg.models import SimpleITKImage
 
 from grandchallenge.cases.models import Image, ImageFile, RawImageUploadSession
 from grandchallenge.components.backends.exceptions import (
@@ -687,6 +686,8 @@ def provision_job(
         )
         logger.error("Could not provision job", exc_info=True)
     else:
+        # Saved so that the execute task does not need to list the inputs
+        job.input_size_bytes = executor.provisioned_size_bytes
         job.update_status(status=job.PROVISIONED)
         on_commit(execute_job.signature(**job.signature_kwargs).apply_async)
 
@@ -906,7 +907,13 @@ def parse_job_outputs(
         logger.error("Could not parse outputs", exc_info=True)
     else:
         job.outputs.add(*outputs)
-        job.update_status(status=job.SUCCESS)
+        job.update_status(
+            status=job.SUCCESS,
+            runtime_metrics={
+                **job.runtime_metrics,
+                "outputs": executor.output_metrics,
+            },
+        )
 
 
 @acks_late_micro_short_task(retry_on=(RetryStep,))
@@ -1186,13 +1193,7 @@ def validate_voxel_values(*, civ_pk):
         civ.image.segments is None
         and first_file.image_type == ImageFile.IMAGE_TYPE_MHD
     ):
-        sitk_image = SimpleITKImage(
-            image=civ.image.sitk_image,
-            name=civ.image.name,
-            consumed_files=set(),
-            spacing_valid=True,
-        )
-        segments = sitk_image.segments
+        segments = civ.image.calculate_segments()
         if segments is not None:
             civ.image.segments = [int(segment) for segment in segments]
             civ.image.save()
@@ -1,55 +1,170 @@
+import bz2
+import csv
+import gzip
 import json
+import sys
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Prefetch
 
 from grandchallenge.challenges.models import Challenge
+from grandchallenge.components.models import ComponentInterfaceValue
 from grandchallenge.evaluation.models import Evaluation
 
+FIELDS = (
+    "pk",
+    "created",
+    "phase",
+    "submission",
+    "submission_comment",
+    "submission_file",
+    "supplementary_file",
+    "supplementary_url",
+    "method",
+    "creator",
+    "published",
+    "metrics",
+    "rank",
+    "rank_score",
+    "rank_per_metric",
+)
+# Fields that are serialized to JSON in flat formats
+NESTED_FIELDS = {"metrics", "rank_per_metric"}
+
+COMPRESSORS = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+}
+
+
+def get_results(*, challenge, chunk_size):
+    """Iterate over the results of a challenge, chunk_size rows at a time"""
+    evaluations = (
+        Evaluation.objects.filter(submission__phase__challenge=challenge)
+        .select_related("submission__phase", "submission__creator", "method")
+        .prefetch_related(
+            Prefetch(
+                "outputs",
+                queryset=ComponentInterfaceValue.objects.filter(
+                    interface__slug="metrics-json-file"
+                ),
+                to_attr="metrics_outputs",
+            )
+        )
+        .order_by("created", "pk")
+    )
+
+    for evaluation in evaluations.iterator(chunk_size=chunk_size):
+        submission = evaluation.submission
+
+        yield {
+            "pk": str(evaluation.pk),
+            "created": evaluation.created.isoformat(),
+            "phase": submission.phase.slug,
+            "submission": str(submission.pk),
+            "submission_comment": submission.comment,
+            "submission_file": (
+                submission.predictions_file.url
+                if submission.predictions_file
+                else None
+            ),
+            "supplementary_file": (
+                submission.supplementary_file.url
+                if submission.supplementary_file
+                else None
+            ),
+            "supplementary_url": submission.supplementary_url,
+            "method": str(evaluation.method.pk),
+            "creator": str(submission.creator),
+            "published": evaluation.published,
+            "metrics": (
+                evaluation.metrics_outputs[0].value
+                if evaluation.metrics_outputs
+                else None
+            ),
+            "rank": evaluation.rank,
+            "rank_score": evaluation.rank_score,
+            "rank_per_metric": evaluation.rank_per_metric,
+        }
+
+
+def flatten(*, row):
+    return {
+        k: json.dumps(v) if k in NESTED_FIELDS and v is not None else v
+        for k, v in row.items()
+    }
+
+
+def write_jsonl(*, rows, file):
+    for row in rows:
+        file.write(json.dumps(row) + "\n")
+
+
+def write_csv(*, rows, file):
+    writer = csv.DictWriter(file, fieldnames=FIELDS)
+    writer.writeheader()
+
+    for row in rows:
+        writer.writerow(flatten(row=row))
+
 
 class Command(BaseCommand):
+    help = "Export the results of a challenge"
+
     def add_arguments(self, parser):
-        parser.add_argument("challenge_short_name", nargs="+", type=str)
+        parser.add_argument("challenge_short_name", type=str)
+        parser.add_argument(
+            "--format",
+            choices=("jsonl", "csv"),
+            default="jsonl",
+            help="The format of the export, one result per row",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="The file to write to, defaults to stdout",
+        )
+        parser.add_argument(
+            "--compression",
+            choices=tuple(COMPRESSORS),
+            default=None,
+            help="Compress the output",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="The number of results to fetch from the database at once",
+        )
 
     def handle(self, *args, **options):
-        challenge = Challenge.objects.get(
-            short_name__iexact=options["challenge_short_name"][0]
-        )
+        try:
+            challenge = Challenge.objects.get(
+                short_name__iexact=options["challenge_short_name"]
+            )
+        except Challenge.DoesNotExist:
+            raise CommandError(
+                f"Could not find challenge {options['challenge_short_name']}."
+            )
 
-        jobs = (
-            Evaluation.objects.filter(method__challenge=challenge)
-            .select_related("submission", "method")
-            .prefetch_related("outputs")
+        output = options["output"]
+        compression = options["compression"]
+        rows = get_results(
+            challenge=challenge, chunk_size=options["chunk_size"]
         )
 
-        print("[")
-
-        for j in jobs:
-            out = {
-                "pk": str(j.pk),
-                "created": j.created.isoformat(),
-                "submission": str(j.submission.pk),
-                "submission_comment": j.submission.comment,
-                "submission_file": (
-                    j.submission.predictions_file.url
-                    if j.submission.predictions_file
-                    else None
-                ),
-                "supplementary_file": (
-                    j.submission.supplementary_file.url
-                    if j.submission.supplementary_file
-                    else None
-                ),
-                "supplementary_url": j.submission.supplementary_url,
-                "method": str(j.method.pk),
-                "creator": str(j.submission.creator),
-                "published": j.published,
-                "metrics": j.outputs.get(
-                    interface__slug="metrics-json-file"
-                ).value,
-                "rank": j.rank,
-                "rank_score": j.rank_score,
-                "rank_per_metric": j.rank_per_metric,
-            }
-            print(json.dumps(out, indent=2) + ",")
-
-        print("]")
+        writer = write_csv if options["format"] == "csv" else write_jsonl
+
+        if output is None and compression is None:
+            writer(rows=rows, file=self.stdout)
+        elif output is None:
+            with COMPRESSORS[compression](
+                sys.stdout.buffer, "wt", newline=""
+            ) as file:
+                writer(rows=rows, file=file)
+        else:
+            opener = COMPRESSORS.get(compression, open)
+
+            with opener(output, "wt", newline="") as file:
+                writer(rows=rows, file=file)
@@ -0,0 +1,129 @@
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Count
+from django.db.transaction import on_commit
+from django_redis import get_redis_connection
+
+# The models whose number of objects per status are sent to CloudWatch
+STATUS_COUNTED_MODELS = (
+    ("algorithms", "Job"),
+    ("evaluation", "Evaluation"),
+    ("workstations", "Session"),
+    ("cases", "RawImageUploadSession"),
+)
+
+
+def get_status_counted_models():
+    return [
+        apps.get_model(app_label=app_label, model_name=model_name)
+        for app_label, model_name in STATUS_COUNTED_MODELS
+    ]
+
+
+class StatusCounters:
+    """
+    The number of objects of a model with each status
+
+    The counts are kept in a redis hash per model, and are updated when the
+    objects are saved or deleted once the transaction is committed. Status
+    changes that bypass save, such as queryset updates, are corrected by
+    reconcile.
+    """
+
+    def __init__(self, *, prefix="core.status_counters"):
+        self.prefix = prefix
+
+    @property
+    def _connection(self):
+        return get_redis_connection("default")
+
+    def _key(self, *, model):
+        return f"{self.prefix}.{model._meta.label_lower}"
+
+    def record_changes(self, *, model, changes):
+        """
+        Record changes of the statuses of a model
+
+        Parameters
+        ----------
+        model
+            The model whose objects changed
+        changes
+            Iterable of (previous_status, status) pairs, where the previous
+            status is None for new objects and the status is None for
+            deleted objects
+        """
+        if not settings.CORE_STATUS_COUNTERS_ENABLED:
+            return
+
+        increments = Counter()
+
+        for previous_status, status in changes:
+            if previous_status is not None:
+                increments[previous_status] -= 1
+            if status is not None:
+                increments[status] += 1
+
+        increments = {k: v for k, v in increments.items() if v}
+
+        if not increments:
+            return
+
+        key = self._key(model=model)
+
+        def increment():
+            pipe = self._connection.pipeline(transaction=False)
+            for status, n in increments.items():
+                pipe.hincrby(key, status, n)
+            pipe.execute()
+
+        on_commit(increment)
+
+    @staticmethod
+    def _count_in_database(*, model):
+        return {
+            q["status"]: q["status__count"]
+            for q in model.objects.values("status")
+            .annotate(Count("status"))
+            .order_by("status")
+        }
+
+    def get_counts(self, *, model):
+        """The number of objects per status, reconciled if not counted yet"""
+        if not settings.CORE_STATUS_COUNTERS_ENABLED:
+            return self._count_in_database(model=model)
+
+        counts = self._connection.hgetall(self._key(model=model))
+
+        if not counts:
+            return self.reconcile(model=model)
+
+        return {int(k): int(v) for k, v in counts.items()}
+
+    def reconcile(self, *, model):
+        """Replace the counts of a model with those from the database"""
+        counts = self._count_in_database(model=model)
+
+        if not settings.CORE_STATUS_COUNTERS_ENABLED:
+            return counts
+
+        key = self._key(model=model)
+
+        pipe = self._connection.pipeline()
+        pipe.delete(key)
+        # Store the zero counts too so that the hash exists
+        pipe.hset(
+            key,
+            mapping={
+                status: counts.get(status, 0)
+                for status in dict(model.status.field.choices)
+            },
+        )
+        pipe.execute()
+
+        return counts
+
+
+status_counters = StatusCounters()
@@ -8,6 +8,8 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Q
 from django.db.models.signals import (
     m2m_changed,
+    post_delete,
+    post_init,
     post_save,
     pre_delete,
     pre_save,
@@ -20,10 +22,12 @@ from machina.apps.forum_conversation.models import Topic
 from grandchallenge.algorithms.models import (
     Algorithm,
     AlgorithmPermissionRequest,
+    Job,
 )
 from grandchallenge.archives.models import Archive, ArchivePermissionRequest
 from grandchallenge.cases.models import RawImageUploadSession
 from grandchallenge.challenges.models import Challenge
+from grandchallenge.core.metrics import status_counters
 from grandchallenge.core.utils import disable_for_loaddata
 from grandchallenge.evaluation.models import Evaluation, Phase, Submission
 from grandchallenge.notifications.models import Notification, NotificationType
@@ -32,6 +36,7 @@ from grandchallenge.reader_studies.models import (
     ReaderStudy,
     ReaderStudyPermissionRequest,
 )
+from grandchallenge.workstations.models import Session
 
 
 @receiver(post_save, sender=get_user_model())
@@ -216,3 +221,44 @@ def clean_up_notifications(instance, **_):
         & Q(action_object_content_type=ct)
         | Q(target_object_id=instance.pk) & Q(target_content_type=ct)
     ).delete()
+
+
+@receiver(post_init, sender=Job)
+@receiver(post_init, sender=Evaluation)
+@receiver(post_init, sender=Session)
+@receiver(post_init, sender=RawImageUploadSession)
+def store_counted_status(instance, **_):
+    # Use the instance dict as the status could be deferred
+    instance._counted_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=Evaluation)
+@receiver(post_save, sender=Session)
+@receiver(post_save, sender=RawImageUploadSession)
+def count_saved_status(sender, *, instance, created, update_fields, **_):
+    if update_fields is not None and "status" not in update_fields:
+        return
+
+    previous_status = None if created else instance._counted_status
+
+    # The previous status is unknown if it was deferred when loaded
+    if previous_status != instance.status and (
+        created or previous_status is not None
+    ):
+        status_counters.record_changes(
+            model=sender, changes=[(previous_status, instance.status)]
+        )
+
+    instance._counted_status = instance.status
+
+
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=Evaluation)
+@receiver(post_delete, sender=Session)
+@receiver(post_delete, sender=RawImageUploadSession)
+def count_deleted_status(sender, *, instance, **_):
+    if instance._counted_status is not None:
+        status_counters.record_changes(
+            model=sender, changes=[(instance._counted_status, None)]
+        )
@@ -44,6 +44,12 @@ class S3Storage(S3Boto3Storage):
             Key=to_name,
         )
 
+    def download_file(self, *, name, filename):
+        """Download an object to a local file using concurrent ranged reads"""
+        name = self._normalize_name(clean_name(name))
+
+        self.bucket.download_file(Key=name, Filename=str(filename))
+
 
 @deconstructible
 class PrivateS3Storage(S3Storage):
@@ -1,17 +1,23 @@
+from collections import defaultdict
 from datetime import timedelta
 
 import boto3
+from billiard.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.db import transaction
-from django.db.models import Count
 from django.utils import timezone
 from django.utils.timezone import now
 from django_celery_results.models import TaskResult
+from redis.exceptions import LockError
 
 from grandchallenge.algorithms.models import AlgorithmImage, Job
 from grandchallenge.cases.models import RawImageUploadSession
 from grandchallenge.core.celery import acks_late_micro_short_task
+from grandchallenge.core.metrics import (
+    get_status_counted_models,
+    status_counters,
+)
 from grandchallenge.evaluation.models import Evaluation, Method
 from grandchallenge.workstations.models import Session
 
@@ -31,14 +37,36 @@ def put_cloudwatch_metrics():
     client = boto3.client(
         "cloudwatch", region_name=settings.AWS_CLOUDWATCH_REGION_NAME
     )
-    metrics = _get_metrics()
+    _put_metrics(client=client, metrics=_get_metrics())
+
+
+@acks_late_micro_short_task(
+    ignore_result=True,
+    singleton=True,
+    # No need to retry here as the periodic task call this again
+    ignore_errors=(LockError, SoftTimeLimitExceeded, TimeLimitExceeded),
+)
+def reconcile_status_counters():
+    for model in get_status_counted_models():
+        status_counters.reconcile(model=model)
+
+
+# The maximum number of metrics in one call to put_metric_data
+MAX_METRIC_DATA_PER_CALL = 1000
+
+
+def _put_metrics(*, client, metrics):
+    """Send the metrics with one call per namespace"""
+    metric_data = defaultdict(list)
 
     for metric in metrics:
-        # Limit of 20 metrics per call, each model can have up to 11 status
-        # elements, so send individually
-        if metric["MetricData"]:
+        metric_data[metric["Namespace"]].extend(metric["MetricData"])
+
+    for namespace, data in metric_data.items():
+        for start in range(0, len(data), MAX_METRIC_DATA_PER_CALL):
             client.put_metric_data(
-                Namespace=metric["Namespace"], MetricData=metric["MetricData"]
+                Namespace=namespace,
+                MetricData=data[start : start + MAX_METRIC_DATA_PER_CALL],
             )
 
 
@@ -46,20 +74,16 @@ def _get_metrics():
     site = Site.objects.get_current()
     metric_data = []
 
-    # Create CloudWatch metrics for a choice field in a model
-    models = [Job, Evaluation, Session, RawImageUploadSession]
-    field = "status"
-
-    for model in models:
-        choice_to_display = dict(getattr(model, field).field.choices)
+    # Create CloudWatch metrics for the status of a model
+    for model in get_status_counted_models():
+        choice_to_display = dict(model.status.field.choices)
 
         def choice_to_name(choice):
             return f"{model.__name__}s{choice_to_display[choice]}".translate(
                 {ord(c): None for c in " -."}
             )
 
-        qs = model.objects.values(field).annotate(Count(field)).order_by(field)
-        counts = {q[field]: q[f"{field}__count"] for q in qs}
+        counts = status_counters.get_counts(model=model)
 
         metric_data.append(
             {
@@ -1,4 +1,7 @@
-from django.db import connection
+import json
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
 
 
 def index(queryset, obj):
@@ -13,9 +16,25 @@ def index(queryset, obj):
     return -1
 
 
-def set_seed(seed):
-    # Note: this only works for postgres, if we ever switch dbs, this
-    # may need changing.
-    cursor = connection.cursor()
-    cursor.execute(f"SELECT setseed({seed});")
-    cursor.close()
+def get_estimated_count(queryset):
+    """
+    The number of rows that the query planner estimates the queryset returns
+
+    This avoids counting the rows of large tables, but can be inaccurate
+    for selective filters. Postgres only.
+    """
+    queryset = queryset.order_by()
+
+    try:
+        sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    except EmptyResultSet:
+        return 0
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -1,6 +1,8 @@
 import re
+from collections import OrderedDict
 from functools import cache
 from pathlib import Path
+from threading import Lock
 
 import magic
 import referencing
@@ -9,9 +11,9 @@ import requests
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.deconstruct import deconstructible
-from jsonschema import SchemaError
-from jsonschema import ValidationError as JSONValidationError
-from jsonschema import validate, validators
+from django.utils.functional import cached_property
+from jsonschema import SchemaError, validators
+from jsonschema.exceptions import best_match
 
 
 @deconstructible
@@ -157,10 +159,17 @@ class JSONValidator:
         self.registry = get_json_schema_registry()
         super().__init__()
 
+    @cached_property
+    def validator(self):
+        """The validator for the schema, which is checked only once"""
+        cls = validators.validator_for(self.schema)
+        cls.check_schema(self.schema)
+        return cls(self.schema, registry=self.registry)
+
     def __call__(self, value):
-        try:
-            validate(value, self.schema, registry=self.registry)
-        except JSONValidationError as e:
+        e = best_match(self.validator.iter_errors(value))
+
+        if e is not None:
             raise ValidationError(
                 f"JSON does not fulfill schema: instance {e.message.replace(str(e.instance) + ' ', '')}"
             )
@@ -172,6 +181,49 @@ class JSONValidator:
         return not (self == other)
 
 
+class JSONValidatorCache:
+    """
+    A bounded cache of JSON validators that evicts the least recently used.
+
+    The schemas are identified by the keys, so a key must change when its
+    schema changes.
+    """
+
+    def __init__(self, *, maxsize):
+        self.maxsize = maxsize
+        self._validators = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, *, key, schema):
+        with self._lock:
+            try:
+                self._validators.move_to_end(key)
+                return self._validators[key]
+            except KeyError:
+                pass
+
+        validator = JSONValidator(schema=schema)
+
+        with self._lock:
+            self._validators[key] = validator
+
+            while len(self._validators) > self.maxsize:
+                self._validators.popitem(last=False)
+
+        return validator
+
+    def evict(self, *, key):
+        with self._lock:
+            self._validators.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._validators.clear()
+
+    def __len__(self):
+        return len(self._validators)
+
+
 @deconstructible
 class JSONSchemaValidator:
     """Validates JSON Schema against the latest or defined schema."""
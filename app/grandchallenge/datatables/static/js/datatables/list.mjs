@@ -8,6 +8,9 @@ const defaultSortOrder = JSON.parse(
     document.getElementById("defaultSortOrder").textContent,
 );
 
+// The position of the last row for fetching the next page, if supported
+let cursor = null;
+
 document.addEventListener("DOMContentLoaded", () => {
     renderVegaChartsObserver.observe(document.getElementById("ajaxDataTable"), {
         childList: true,
@@ -28,6 +31,15 @@ document.addEventListener("DOMContentLoaded", () => {
         ],
         ajax: {
             url: ".",
+            data: data => {
+                if (cursor) {
+                    data.cursor = cursor;
+                }
+            },
+            dataSrc: json => {
+                cursor = json.cursor || null;
+                return json.data;
+            },
         },
         ordering: true,
         drawCallback: settings => {
@@ -1,13 +1,16 @@
 from dataclasses import dataclass
-from functools import reduce
+from functools import cached_property, reduce
 from operator import or_
 
-from django.core.paginator import EmptyPage
-from django.db.models import Q
+from django.core import signing
+from django.db.models import F, Q
 from django.http import JsonResponse
-from django.template.loader import render_to_string
+from django.template import Context
+from django.template.loader import get_template
 from django.views.generic import ListView
 
+from grandchallenge.core.utils.query import get_estimated_count
+
 
 class PaginatedTableListView(ListView):
     columns = []
@@ -15,6 +18,20 @@ class PaginatedTableListView(ListView):
     default_sort_column = 0
     text_align = "center"
     default_sort_order = "desc"
+    # Search each field in a separate query over the listed objects and
+    # combine the matches with a union rather than an OR of joins. Each
+    # query can use an index on its field, where there is one, and the
+    # results do not need to be made distinct.
+    indexed_search = False
+    # Fetch the next page after the last row of the previous page rather
+    # than counting through the offset, the rows are tie broken on the pk
+    keyset_pagination = False
+    # Use the estimate of the query planner for the total number of rows
+    # if it exceeds this many rows, searches are always counted exactly
+    approximate_count_threshold = None
+
+    cursor_salt = "grandchallenge.datatables.cursor"
+    cursor_annotation = "datatables_cursor_value"
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(object_list=object_list, **kwargs)
@@ -28,13 +45,18 @@ class PaginatedTableListView(ListView):
         )
         return context
 
+    @cached_property
+    def compiled_row_template(self):
+        return get_template(self.row_template).template
+
     def render_row(self, *, object_, page_context):
-        return render_to_string(
-            self.row_template, context={**page_context, "object": object_}
-        ).split("<split></split>")
+        with page_context.push(object=object_):
+            return self.compiled_row_template.render(page_context).split(
+                "<split></split>"
+            )
 
     def render_rows(self, *, object_list):
-        page_context = self.get_context_data(object_list=object_list)
+        page_context = Context(self.get_context_data(object_list=object_list))
         return [
             self.render_row(object_=o, page_context=page_context)
             for o in object_list
@@ -51,30 +73,152 @@ class PaginatedTableListView(ListView):
         direction = form_data.get("order[0][dir]") or self.default_sort_order
         return f"{'-' if direction == 'desc' else ''}{order_by}"
 
+    def get_records_total(self):
+        """The number of rows to list, and whether that is an estimate"""
+        if self.approximate_count_threshold is not None:
+            estimate = get_estimated_count(self.object_list)
+            if estimate > self.approximate_count_threshold:
+                return estimate, True
+
+        return self.object_list.count(), False
+
+    @staticmethod
+    def correct_estimate(*, estimate, start, page_size, num_objects):
+        if 0 < num_objects < page_size:
+            # This is the last page
+            return start + num_objects
+        elif num_objects == page_size:
+            # Keep the next page reachable
+            return max(estimate, start + page_size + 1)
+        else:
+            return estimate
+
+    def get_cursor(self, *, form_data, start, search, order_by):
+        """The position of the last row of the previous page, if usable"""
+        if not (self.keyset_pagination and order_by and start):
+            return None
+
+        try:
+            cursor = signing.loads(
+                form_data.get("cursor", ""), salt=self.cursor_salt
+            )
+        except signing.BadSignature:
+            return None
+
+        if cursor["position"] != [start, search or "", order_by]:
+            # The table was paged backwards, searched or sorted
+            return None
+
+        return cursor
+
+    def dump_cursor(self, *, object_list, start, search, order_by):
+        """The position of the last row of this page for the next request"""
+        if not (self.keyset_pagination and order_by and object_list):
+            return None
+
+        last = object_list[-1]
+        value = getattr(last, self.cursor_annotation)
+
+        if value is None:
+            # The nulls are not comparable, so page by offset instead
+            return None
+        elif not isinstance(value, (bool, int, float, str)):
+            value = str(value)
+
+        return signing.dumps(
+            {
+                "position": [start + len(object_list), search or "", order_by],
+                "value": value,
+                "pk": str(last.pk),
+            },
+            salt=self.cursor_salt,
+        )
+
+    def seek(self, queryset, *, cursor, order_by):
+        field = order_by.lstrip("-")
+
+        if order_by.startswith("-"):
+            # Nulls are sorted first in descending order
+            after = Q(**{f"{field}__lt": cursor["value"]}) | Q(
+                **{field: cursor["value"], "pk__lt": cursor["pk"]}
+            )
+        else:
+            # Nulls are sorted last in ascending order
+            after = (
+                Q(**{f"{field}__gt": cursor["value"]})
+                | Q(**{field: cursor["value"], "pk__gt": cursor["pk"]})
+                | Q(**{f"{field}__isnull": True})
+            )
+
+        return queryset.filter(after)
+
     def draw_response(self, *, form_data):
         start = int(form_data.get("start", 0))
         page_size = int(form_data.get("length"))
         search = form_data.get("search[value]")
-        page = start // page_size + 1
         order_by = self.get_order_by(form_data)
         data = self.filter_queryset(self.object_list, search, order_by)
-        paginator = self.get_paginator(queryset=data, per_page=page_size)
 
-        try:
-            objects = paginator.page(page)
-        except EmptyPage:
-            # If the page is out of range, show the last page
-            objects = paginator.page(paginator.num_pages)
+        records_total, total_is_estimate = self.get_records_total()
 
-        return JsonResponse(
-            {
-                "draw": int(form_data.get("draw")),
-                "recordsTotal": self.object_list.count(),
-                "recordsFiltered": paginator.count,
-                "data": self.render_rows(object_list=objects),
-            }
+        if search:
+            records_filtered = data.count()
+            filtered_is_estimate = False
+        else:
+            records_filtered = records_total
+            filtered_is_estimate = total_is_estimate
+
+        # Start on a page boundary, and show the last page if out of range
+        start = start // page_size * page_size
+        if (
+            not filtered_is_estimate
+            and records_filtered
+            and start >= records_filtered
+        ):
+            start = (records_filtered - 1) // page_size * page_size
+
+        if self.keyset_pagination and order_by:
+            data = data.annotate(
+                **{self.cursor_annotation: F(order_by.lstrip("-"))}
+            )
+
+        cursor = self.get_cursor(
+            form_data=form_data, start=start, search=search, order_by=order_by
         )
 
+        if cursor is None:
+            objects = [*data[start : start + page_size]]
+        else:
+            objects = [
+                *self.seek(data, cursor=cursor, order_by=order_by)[:page_size]
+            ]
+
+        if filtered_is_estimate:
+            # Correct the estimate with what is known from this page
+            records_total = records_filtered = self.correct_estimate(
+                estimate=records_total,
+                start=start,
+                page_size=page_size,
+                num_objects=len(objects),
+            )
+
+        response = {
+            "draw": int(form_data.get("draw")),
+            "recordsTotal": records_total,
+            "recordsFiltered": records_filtered,
+            "data": self.render_rows(object_list=objects),
+        }
+
+        if self.keyset_pagination:
+            response["cursor"] = self.dump_cursor(
+                object_list=objects,
+                start=start,
+                search=search,
+                order_by=order_by,
+            )
+
+        return JsonResponse(response)
+
     def get(self, request, *args, **kwargs):
         response = super().get(request, *args, **kwargs)
         if request.headers.get("x-requested-with") == "XMLHttpRequest":
@@ -86,17 +230,36 @@ class PaginatedTableListView(ListView):
         """Handles giant URL queries from jquery datatables"""
         return self.get(request, *args, **kwargs)
 
+    def get_search_filter(self, search, *, queryset):
+        lookups = [
+            Q(**{f"{field}__icontains": search})
+            for field in self.search_fields
+        ]
+
+        if self.indexed_search and lookups:
+            matches = [
+                queryset.filter(lookup).order_by().values("pk")
+                for lookup in lookups
+            ]
+            return Q(pk__in=matches[0].union(*matches[1:]))
+
+        return reduce(or_, lookups, Q())
+
     def filter_queryset(self, queryset, search, order_by):
         if search:
-            q = reduce(
-                or_,
-                [Q(**{f"{f}__icontains": search}) for f in self.search_fields],
-                Q(),
+            queryset = queryset.filter(
+                self.get_search_filter(search, queryset=queryset)
+            )
+        if order_by and self.keyset_pagination:
+            queryset = queryset.order_by(
+                order_by, f"{'-' if order_by.startswith('-') else ''}pk"
             )
-            queryset = queryset.filter(q)
-        if order_by:
+        elif order_by:
             queryset = queryset.order_by(order_by)
-        return queryset.distinct()
+        if self.indexed_search:
+            return queryset
+        else:
+            return queryset.distinct()
 
 
 @dataclass
@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand
+
+from grandchallenge.evaluation.models import Phase
+from grandchallenge.evaluation.tasks import update_evaluation_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the metrics of successful evaluations for ranking and display"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "challenge_short_name",
+            nargs="*",
+            type=str,
+            help="Only update the phases of these challenges",
+        )
+
+    def handle(self, *args, **options):
+        phases = Phase.objects.all()
+
+        if options["challenge_short_name"]:
+            phases = phases.filter(
+                challenge__short_name__in=options["challenge_short_name"]
+            )
+
+        for phase_pk in phases.values_list("pk", flat=True).iterator():
+            update_evaluation_metrics.apply_async(
+                kwargs={"phase_pk": str(phase_pk)}
+            )
+
+        self.stdout.write("Metric update tasks scheduled")
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.17 on 2025-01-20 10:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "evaluation",
+            "0071_alter_combinedleaderboardphase_unique_together_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EvaluationMetric",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "path",
+                    models.CharField(
+                        help_text="The jsonpath of this metric in the metrics json file",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "value",
+                    models.FloatField(
+                        help_text="The value of this metric, null if the value in the metrics json file is missing or not a number",
+                        null=True,
+                    ),
+                ),
+                (
+                    "evaluation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metrics",
+                        to="evaluation.evaluation",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["path", "value"],
+                        name="evaluation__path_4a6e53_idx",
+                    )
+                ],
+                "unique_together": {("evaluation", "path")},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("evaluation", "0072_evaluationmetric"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evaluation",
+            name="input_size_bytes",
+            field=models.PositiveBigIntegerField(
+                default=None,
+                editable=False,
+                help_text="The total size of the provisioned inputs in bytes",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 import logging
+import uuid
 from datetime import timedelta
 from statistics import mean, median
 
@@ -10,7 +11,7 @@ from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.mail import mail_managers
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Count, Q
 from django.db.transaction import on_commit
 from django.utils import timezone
@@ -28,7 +29,7 @@ from grandchallenge.algorithms.models import (
     Job,
 )
 from grandchallenge.archives.models import Archive, ArchiveItem
-from grandchallenge.challenges.models import Challenge
+from grandchallenge.challenges.models import Challenge, ComputeCostEntry
 from grandchallenge.components.models import (
     ComponentImage,
     ComponentInterface,
@@ -64,14 +65,17 @@ from grandchallenge.evaluation.tasks import (
     calculate_ranks,
     create_evaluation,
     update_combined_leaderboard,
+    update_evaluation_metrics,
 )
 from grandchallenge.evaluation.templatetags.evaluation_extras import (
     get_jsonpath,
 )
 from grandchallenge.evaluation.utils import (
+    MAX_EXACT_INTEGER,
     Metric,
     StatusChoices,
     SubmissionKindChoices,
+    absolute,
 )
 from grandchallenge.hanging_protocols.models import HangingProtocolMixin
 from grandchallenge.notifications.models import Notification, NotificationType
@@ -677,6 +681,8 @@ class Phase(FieldChangeMixin, HangingProtocolMixin, UUIDModel):
 
         if self.has_changed("public"):
             self.assign_permissions()
+            for leaderboard in self.combinedleaderboard_set.all():
+                leaderboard.clear_combined_ranks_cache()
             on_commit(
                 assign_evaluation_permissions.signature(
                     kwargs={"phase_pks": [self.pk]}
@@ -694,6 +700,20 @@ class Phase(FieldChangeMixin, HangingProtocolMixin, UUIDModel):
         ):
             self.send_give_algorithm_editors_job_view_permissions_changed_email()
 
+        if not adding and any(
+            self.has_changed(field)
+            for field in (
+                "score_jsonpath",
+                "score_error_jsonpath",
+                "extra_results_columns",
+            )
+        ):
+            on_commit(
+                update_evaluation_metrics.signature(
+                    kwargs={"phase_pk": self.pk}
+                ).apply_async
+            )
+
         if not skip_calculate_ranks:
             on_commit(
                 lambda: calculate_ranks.apply_async(
@@ -810,10 +830,7 @@ class Phase(FieldChangeMixin, HangingProtocolMixin, UUIDModel):
     @property
     def scoring_method(self):
         if self.scoring_method_choice == self.ABSOLUTE:
-
-            def scoring_method(x):
-                return list(x)[0]
-
+            scoring_method = absolute
         elif self.scoring_method_choice == self.MEAN:
             scoring_method = mean
         elif self.scoring_method_choice == self.MEDIAN:
@@ -823,6 +840,25 @@ class Phase(FieldChangeMixin, HangingProtocolMixin, UUIDModel):
 
         return scoring_method
 
+    @property
+    def metric_paths(self):
+        """All of the paths in metrics.json that are used for display or ranking"""
+        paths = {self.score_jsonpath}
+
+        if self.score_error_jsonpath:
+            paths.add(self.score_error_jsonpath)
+
+        for col in self.extra_results_columns:
+            paths.add(col["path"])
+            if col.get("error_path"):
+                paths.add(col["error_path"])
+
+        return paths
+
+    @property
+    def ranking_engine_cache_key(self):
+        return f"{self._meta.app_label}.{self._meta.model_name}.ranking_engine.{self.pk}"
+
     @cached_property
     def valid_metrics(self):
         return (
@@ -1566,6 +1602,9 @@ class Evaluation(ComponentJob):
         super().save(*args, **kwargs)
 
         self.assign_permissions()
+        self.update_compute_costs(
+            adding=adding, update_fields=kwargs.get("update_fields")
+        )
 
         on_commit(
             lambda: calculate_ranks.apply_async(
@@ -1577,6 +1616,20 @@ class Evaluation(ComponentJob):
     def title(self):
         return f"#{self.rank} {self.submission.creator.username}"
 
+    def update_compute_costs(self, *, adding, update_fields):
+        """Add changes in the compute cost of this evaluation to the ledger"""
+        change = self.get_compute_cost_change(
+            adding=adding, update_fields=update_fields
+        )
+
+        if change and not self.submission.phase.external_evaluation:
+            phase = self.submission.phase
+            ComputeCostEntry.add_compute_costs(
+                challenge_pks=[phase.challenge_id],
+                phase_pks=[phase.pk],
+                compute_cost_euro_millicents=change,
+            )
+
     def assign_permissions(self):
         admins_group = self.submission.phase.challenge.admins_group
         assign_perm("view_evaluation", admins_group, self)
@@ -1698,14 +1751,62 @@ class Evaluation(ComponentJob):
             if output.interface.slug == "metrics-json-file":
                 return output.value
 
+    @cached_property
+    def metric_values(self):
+        return {metric.path: metric.value for metric in self.metrics.all()}
+
+    def get_metric_value(self, path):
+        """
+        Gets the value of a metric, preferring the denormalized value.
+
+        Falls back to the metrics json file if the metric has not been
+        stored. Non-numeric values are returned as an empty string, as
+        with `get_jsonpath`.
+        """
+        try:
+            value = self.metric_values[path]
+        except KeyError:
+            return get_jsonpath(self.metrics_json_file, path)
+
+        return "" if value is None else value
+
+    def has_stored_metrics(self, *, paths):
+        return set(paths) <= self.metric_values.keys()
+
+    def update_metrics(self):
+        """Stores the values of the metrics used by the phase of this evaluation"""
+        EvaluationMetric.objects.replace(
+            metrics_by_evaluation={self.pk: self.build_metrics()}
+        )
+        self.__dict__.pop("metric_values", None)
+
+    def build_metrics(self):
+        metrics = []
+
+        for path in self.submission.phase.metric_paths:
+            value = get_jsonpath(self.metrics_json_file, path)
+
+            if not isinstance(value, (int, float)):
+                value = None
+            elif value != value or (
+                isinstance(value, int) and abs(value) > MAX_EXACT_INTEGER
+            ):
+                # These cannot be stored exactly, so are read from the
+                # metrics json file instead
+                continue
+
+            metrics.append(
+                EvaluationMetric(evaluation=self, path=path, value=value)
+            )
+
+        return metrics
+
     @cached_property
     def invalid_metrics(self):
         return {
             metric.path
             for metric in self.submission.phase.valid_metrics
-            if not isinstance(
-                get_jsonpath(self.metrics_json_file, metric.path), (int, float)
-            )
+            if not isinstance(self.get_metric_value(metric.path), (int, float))
         }
 
     def clean(self):
@@ -1720,6 +1821,9 @@ class Evaluation(ComponentJob):
         super().clean()
 
     def update_status(self, *args, **kwargs):
+        if kwargs.get("status") == self.SUCCESS:
+            self.update_metrics()
+
         res = super().update_status(*args, **kwargs)
 
         if self.status in [self.FAILURE, self.SUCCESS, self.CANCELLED]:
@@ -1769,6 +1873,66 @@ class EvaluationGroupObjectPermission(GroupObjectPermissionBase):
     content_object = models.ForeignKey(Evaluation, on_delete=models.CASCADE)
 
 
+class EvaluationMetricManager(models.Manager):
+    def upsert(self, *, metrics):
+        return self.bulk_create(
+            metrics,
+            update_conflicts=True,
+            unique_fields=["evaluation", "path"],
+            update_fields=["value"],
+        )
+
+    def replace(self, *, metrics_by_evaluation):
+        """
+        Stores the metrics of each evaluation and deletes any other metrics
+        stored for them, such as those for paths that are no longer used
+        """
+        evaluations_by_paths = {}
+
+        for evaluation_pk, metrics in metrics_by_evaluation.items():
+            paths = frozenset(metric.path for metric in metrics)
+            evaluations_by_paths.setdefault(paths, []).append(evaluation_pk)
+
+        with transaction.atomic():
+            for paths, evaluation_pks in evaluations_by_paths.items():
+                self.filter(evaluation__in=evaluation_pks).exclude(
+                    path__in=paths
+                ).delete()
+
+            return self.upsert(
+                metrics=[
+                    metric
+                    for metrics in metrics_by_evaluation.values()
+                    for metric in metrics
+                ]
+            )
+
+
+class EvaluationMetric(models.Model):
+    """A metric value of an evaluation, extracted from its metrics json file"""
+
+    evaluation = models.ForeignKey(
+        Evaluation, on_delete=models.CASCADE, related_name="metrics"
+    )
+    path = models.CharField(
+        max_length=255,
+        help_text="The jsonpath of this metric in the metrics json file",
+    )
+    value = models.FloatField(
+        null=True,
+        help_text=(
+            "The value of this metric, null if the value in the metrics json "
+            "file is missing or not a number"
+        ),
+    )
+
+    objects = EvaluationMetricManager()
+
+    class Meta:
+        unique_together = (("evaluation", "path"),)
+        indexes = [models.Index(fields=["path", "value"])]
+
+
 class CombinedLeaderboard(TitleSlugDescriptionModel, UUIDModel):
     class CombinationMethodChoices(models.TextChoices):
         MEAN = "MEAN", "Mean"
@@ -1805,11 +1969,12 @@ class CombinedLeaderboard(TitleSlugDescriptionModel, UUIDModel):
 
     @cached_property
     def _combined_ranks_object(self):
+        # Changes to the phases clear the cache, so the phases
+        # do not need to be checked here
         result = cache.get(self.combined_ranks_cache_key)
 
         if (
             result is None
-            or result["phases"] != {phase.pk for phase in self.public_phases}
             or result["combination_method"] != self.combination_method
         ):
             self.schedule_combined_ranks_update()
@@ -1838,54 +2003,141 @@ class CombinedLeaderboard(TitleSlugDescriptionModel, UUIDModel):
             return None
 
     @property
-    def users_best_evaluation_per_phase(self):
-        evaluations = Evaluation.objects.filter(
-            # Note, only use public phases here to prevent leaking of
-            # evaluations for hidden phases
-            submission__phase__in=self.public_phases,
-            published=True,
-            status=Evaluation.SUCCESS,
-            rank__gt=0,
-        ).values(
-            "submission__creator__username",
-            "submission__phase__pk",
-            "pk",
-            "created",
-            "rank",
-        )
+    def combined_ranks_cache_key(self):
+        return f"{self._meta.app_label}.{self._meta.model_name}.combined_ranks.{self.pk}"
 
-        users_best_evaluation_per_phase = {}
+    @classmethod
+    def get_phase_contribution_cache_key(cls, *, phase_pk):
+        return f"{cls._meta.app_label}.{cls._meta.model_name}.phase_contribution.{phase_pk}"
+
+    @classmethod
+    def update_phase_contributions_cache(cls, *, phase_pks):
+        """
+        Caches the best evaluation of each user for each of the phases
+
+        Each contribution gets a new version so that the combined
+        leaderboards can tell which of their phases have been re-ranked.
+        """
+        users_best_evaluation_per_phase = {
+            phase_pk: {} for phase_pk in phase_pks
+        }
+
+        evaluations = (
+            Evaluation.objects.filter(
+                submission__phase__in=phase_pks,
+                published=True,
+                status=Evaluation.SUCCESS,
+                rank__gt=0,
+            )
+            .order_by(
+                "submission__phase_id",
+                "submission__creator__username",
+                "rank",
+                "created",
+            )
+            .distinct("submission__phase_id", "submission__creator__username")
+            .values(
+                "submission__phase_id",
+                "submission__creator__username",
+                "pk",
+                "created",
+                "rank",
+            )
+        )
 
         for evaluation in evaluations.iterator():
-            phase = evaluation["submission__phase__pk"]
-            user = evaluation["submission__creator__username"]
+            users_best_evaluation_per_phase[
+                evaluation["submission__phase_id"]
+            ][evaluation["submission__creator__username"]] = {
+                "pk": evaluation["pk"],
+                "created": evaluation["created"],
+                "rank": evaluation["rank"],
+            }
 
-            if user not in users_best_evaluation_per_phase:
-                users_best_evaluation_per_phase[user] = {}
+        contributions = {
+            phase_pk: {
+                "version": uuid.uuid4().hex,
+                "users_best_evaluation": users_best_evaluation,
+            }
+            for phase_pk, users_best_evaluation in users_best_evaluation_per_phase.items()
+        }
 
-            if (
-                phase not in users_best_evaluation_per_phase[user]
-                or evaluation["rank"]
-                < users_best_evaluation_per_phase[user][phase]["rank"]
-            ):
-                users_best_evaluation_per_phase[user][phase] = {
-                    "pk": evaluation["pk"],
-                    "created": evaluation["created"],
-                    "rank": evaluation["rank"],
-                }
+        cache.set_many(
+            {
+                cls.get_phase_contribution_cache_key(
+                    phase_pk=phase_pk
+                ): contribution
+                for phase_pk, contribution in contributions.items()
+            },
+            timeout=None,
+        )
 
-        return users_best_evaluation_per_phase
+        return contributions
 
-    @property
-    def combined_ranks_cache_key(self):
-        return f"{self._meta.app_label}.{self._meta.model_name}.combined_ranks.{self.pk}"
+    def _get_phase_contributions(self, *, phase_pks):
+        cache_keys = {
+            self.get_phase_contribution_cache_key(phase_pk=phase_pk): phase_pk
+            for phase_pk in phase_pks
+        }
+
+        contributions = {
+            cache_keys[key]: contribution
+            for key, contribution in cache.get_many(cache_keys).items()
+        }
+
+        if missing_phase_pks := [
+            phase_pk for phase_pk in phase_pks if phase_pk not in contributions
+        ]:
+            contributions.update(
+                self.update_phase_contributions_cache(
+                    phase_pks=missing_phase_pks
+                )
+            )
+
+        return contributions
 
     def update_combined_ranks_cache(self):
+        phases = dict(self.phases.values_list("pk", "public"))
+
+        # Note, only use public phases here to prevent leaking of
+        # evaluations for hidden phases
+        contributions = self._get_phase_contributions(
+            phase_pks=[pk for pk, public in phases.items() if public]
+        )
+        versions = {
+            phase_pk: (
+                contributions[phase_pk]["version"]
+                if phase_pk in contributions
+                else None
+            )
+            for phase_pk in phases
+        }
+
+        current = cache.get(self.combined_ranks_cache_key)
+
+        if (
+            current is not None
+            and current["phases"] == versions
+            and current["combination_method"] == self.combination_method
+        ):
+            # None of the phases have been re-ranked
+            return
+
+        users_best_evaluation_per_phase = {}
+
+        for phase_pk, contribution in contributions.items():
+            for user, evaluation in contribution[
+                "users_best_evaluation"
+            ].items():
+                users_best_evaluation_per_phase.setdefault(user, {})[
+                    phase_pk
+                ] = evaluation
+
         combined_ranks = []
-        num_phases = self.public_phases.count()
+        num_phases = len(phases)
 
         now = timezone.now()
-        for user, evaluations in self.users_best_evaluation_per_phase.items():
+        for user, evaluations in users_best_evaluation_per_phase.items():
             if len(evaluations) == num_phases:  # Exclude missing data
                 combined_ranks.append(
                     {
@@ -1911,7 +2163,7 @@ class CombinedLeaderboard(TitleSlugDescriptionModel, UUIDModel):
         self._rank_combined_rank_scores(combined_ranks)
 
         cache_object = {
-            "phases": {phase.pk for phase in self.public_phases},
+            "phases": versions,
             "combination_method": self.combination_method,
             "created": now,
             "results": combined_ranks,
@@ -1919,6 +2171,9 @@ class CombinedLeaderboard(TitleSlugDescriptionModel, UUIDModel):
 
         cache.set(self.combined_ranks_cache_key, cache_object, timeout=None)
 
+    def clear_combined_ranks_cache(self):
+        cache.delete(self.combined_ranks_cache_key)
+
     @staticmethod
     def _rank_combined_rank_scores(combined_ranks):
         """In-place addition of a rank based on the combined rank"""
@@ -1955,7 +2210,7 @@ class CombinedLeaderboard(TitleSlugDescriptionModel, UUIDModel):
         )
 
     def delete(self, *args, **kwargs):
-        cache.delete(self.combined_ranks_cache_key)
+        self.clear_combined_ranks_cache()
         return super().delete(*args, **kwargs)
 
 
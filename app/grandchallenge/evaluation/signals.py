@@ -1,6 +1,11 @@
 from actstream.models import Follow
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import m2m_changed, pre_delete
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
 from django.dispatch import receiver
 
 from grandchallenge.evaluation.models import (
@@ -18,6 +23,13 @@ def clean_up_submission_follows(instance, **_):
     Follow.objects.filter(object_id=instance.pk, content_type=ct).delete()
 
 
+@receiver(post_save, sender=Phase)
+@receiver(post_delete, sender=Phase)
+def invalidate_challenge_subdomain_cache(instance, **_):
+    # The phases are cached along with the challenge
+    instance.challenge.invalidate_subdomain_cache()
+
+
 @receiver(m2m_changed, sender=CombinedLeaderboardPhase)
 def handle_combined_leaderboard_phase_change(
     sender, instance, action, reverse, **_
@@ -34,4 +46,5 @@ def handle_combined_leaderboard_phase_change(
         leaderboards = [instance]
 
     for leaderboard in leaderboards:
+        leaderboard.clear_combined_ranks_cache()
         leaderboard.schedule_combined_ranks_update()
@@ -4,14 +4,25 @@ from datetime import timedelta
 
 from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, OperationalError, transaction
-from django.db.models import Case, IntegerField, Value, When
+from django.db.models import (
+    Case,
+    IntegerField,
+    Value,
+    When,
+    prefetch_related_objects,
+)
 from django.db.transaction import on_commit
 from django.utils.timezone import now
 
-from grandchallenge.algorithms.exceptions import TooManyJobsScheduled
-from grandchallenge.algorithms.models import AlgorithmModel, Job
+from grandchallenge.algorithms.exceptions import (
+    JobCapacityExhausted,
+    TooManyJobsScheduled,
+)
+from grandchallenge.algorithms.models import AlgorithmModel
+from grandchallenge.algorithms.scheduler import job_scheduler
 from grandchallenge.algorithms.tasks import create_algorithm_jobs
 from grandchallenge.components.models import (
     ComponentInterface,
@@ -23,7 +34,11 @@ from grandchallenge.core.celery import (
 )
 from grandchallenge.core.exceptions import LockNotAcquiredException
 from grandchallenge.core.validators import get_file_mimetype
-from grandchallenge.evaluation.utils import rank_results
+from grandchallenge.evaluation.utils import (
+    RankingEngine,
+    UnrankableValue,
+    rank_results,
+)
 from grandchallenge.notifications.models import Notification, NotificationType
 
 logger = logging.getLogger(__name__)
@@ -176,9 +191,6 @@ def create_algorithm_jobs_for_evaluation(*, evaluation_pk, max_jobs=1):
     max_jobs
         The maximum number of jobs to create
     """
-    if Job.objects.active().count() >= settings.ALGORITHMS_MAX_ACTIVE_JOBS:
-        raise TooManyJobsScheduled
-
     Evaluation = apps.get_model(  # noqa: N806
         app_label="evaluation", model_name="Evaluation"
     )
@@ -232,32 +244,47 @@ def create_algorithm_jobs_for_evaluation(*, evaluation_pk, max_jobs=1):
     except Exception:
         requires_memory_gb = 4  # Default value if any exception occurs
 
-    jobs = create_algorithm_jobs(
-        algorithm_image=evaluation.submission.algorithm_image,
-        algorithm_model=evaluation.submission.algorithm_model,
-        civ_sets=[
-            {*ai.values.all()}
-            for ai in evaluation.submission.phase.archive.items.prefetch_related(
-                "values__interface"
-            )
-            .annotate(
-                has_title=Case(
-                    When(title="", then=Value(1)),
-                    default=Value(0),
-                    output_field=IntegerField(),
+    tenant = f"challenge:{evaluation.submission.phase.challenge_id}"
+
+    try:
+        jobs = create_algorithm_jobs(
+            algorithm_image=evaluation.submission.algorithm_image,
+            algorithm_model=evaluation.submission.algorithm_model,
+            civ_sets=[
+                {*ai.values.all()}
+                for ai in evaluation.submission.phase.archive.items.prefetch_related(
+                    "values__interface"
                 )
-            )
-            .order_by("has_title", "title", "created")
-        ],
-        extra_viewer_groups=viewer_groups,
-        extra_logs_viewer_groups=viewer_groups,
-        task_on_success=task_on_success,
-        task_on_failure=task_on_failure,
-        max_jobs=max_jobs,
-        time_limit=evaluation.submission.phase.algorithm_time_limit,
-        requires_gpu_type=evaluation.submission.algorithm_requires_gpu_type,
-        requires_memory_gb=requires_memory_gb,
-    )
+                .annotate(
+                    has_title=Case(
+                        When(title="", then=Value(1)),
+                        default=Value(0),
+                        output_field=IntegerField(),
+                    )
+                )
+                .order_by("has_title", "title", "created")
+            ],
+            extra_viewer_groups=viewer_groups,
+            extra_logs_viewer_groups=viewer_groups,
+            task_on_success=task_on_success,
+            task_on_failure=task_on_failure,
+            max_jobs=max_jobs,
+            time_limit=evaluation.submission.phase.algorithm_time_limit,
+            requires_gpu_type=evaluation.submission.algorithm_requires_gpu_type,
+            requires_memory_gb=requires_memory_gb,
+            tenant=tenant,
+        )
+    except JobCapacityExhausted:
+        job_scheduler.wait(
+            tenant=tenant,
+            task=create_algorithm_jobs_for_evaluation.signature(
+                kwargs={
+                    "evaluation_pk": str(evaluation.pk),
+                    "max_jobs": max_jobs,
+                }
+            ),
+        )
+        return
 
     if not jobs:
         # No more jobs created from this task, so everything must be
@@ -426,6 +453,62 @@ def filter_by_creators_best(*, evaluations, ranks):
     return [r for r in best_result_per_user.values()]
 
 
+def rank_results_incrementally(*, phase, evaluations):
+    """
+    Rank all of the evaluations for a phase, reusing the cached ranking
+    engine if the only change since the last run is one new evaluation.
+
+    The cache entry records every evaluation that was considered, including
+    those with invalid metrics, so that any other change (removals,
+    unpublishing, changes to the metrics of the phase) triggers a full
+    rebuild.
+    """
+    cache_key = phase.ranking_engine_cache_key
+    cached = cache.get(cache_key)
+
+    evaluations_by_pk = {e.pk: e for e in evaluations}
+    considered_pks = set(evaluations_by_pk)
+
+    engine = None
+
+    if cached is not None and cached["metrics"] == phase.valid_metrics:
+        new_pks = considered_pks - cached["considered_pks"]
+
+        if cached["considered_pks"] <= considered_pks and len(new_pks) <= 1:
+            engine = cached["engine"]
+
+            try:
+                for pk in new_pks:
+                    engine.insert(evaluation=evaluations_by_pk[pk])
+            except UnrankableValue:
+                engine = None
+
+    if engine is None:
+        try:
+            engine = RankingEngine.from_evaluations(
+                evaluations=evaluations, metrics=phase.valid_metrics
+            )
+        except UnrankableValue:
+            cache.delete(cache_key)
+            return rank_results(
+                evaluations=evaluations,
+                metrics=phase.valid_metrics,
+                score_method=phase.scoring_method,
+            )
+
+    cache.set(
+        cache_key,
+        {
+            "metrics": phase.valid_metrics,
+            "considered_pks": considered_pks,
+            "engine": engine,
+        },
+        timeout=None,
+    )
+
+    return engine.get_positions(score_method=phase.scoring_method)
+
+
 # Use 2xlarge for memory use
 @acks_late_2xlarge_task(
     retry_on=(LockNotAcquiredException,), delayed_retry=False
@@ -451,11 +534,21 @@ def calculate_ranks(*, phase_pk: uuid.UUID):
             .select_for_update(nowait=True, of=("self",))
             .order_by("-created")
             .select_related("submission__creator", "submission__phase")
-            .prefetch_related("outputs__interface")
+            .prefetch_related("metrics")
         )
     except OperationalError as error:
         raise LockNotAcquiredException from error
 
+    # Only fetch the outputs for evaluations without stored metrics
+    prefetch_related_objects(
+        [
+            e
+            for e in evaluations
+            if not e.has_stored_metrics(paths=phase.metric_paths)
+        ],
+        "outputs__interface",
+    )
+
     valid_evaluations = [
         e
         for e in evaluations
@@ -466,21 +559,27 @@ def calculate_ranks(*, phase_pk: uuid.UUID):
         valid_evaluations = filter_by_creators_most_recent(
             evaluations=valid_evaluations
         )
-    elif phase.result_display_choice == phase.BEST:
-        all_positions = rank_results(
+        final_positions = rank_results(
             evaluations=valid_evaluations,
             metrics=phase.valid_metrics,
             score_method=phase.scoring_method,
         )
+    elif phase.result_display_choice == phase.BEST:
+        all_positions = rank_results_incrementally(
+            phase=phase, evaluations=valid_evaluations
+        )
         valid_evaluations = filter_by_creators_best(
             evaluations=valid_evaluations, ranks=all_positions.ranks
         )
-
-    final_positions = rank_results(
-        evaluations=valid_evaluations,
-        metrics=phase.valid_metrics,
-        score_method=phase.scoring_method,
-    )
+        final_positions = rank_results(
+            evaluations=valid_evaluations,
+            metrics=phase.valid_metrics,
+            score_method=phase.scoring_method,
+        )
+    else:
+        final_positions = rank_results_incrementally(
+            phase=phase, evaluations=valid_evaluations
+        )
 
     for e in evaluations:
         try:
@@ -501,6 +600,13 @@ def calculate_ranks(*, phase_pk: uuid.UUID):
         evaluations, ["rank", "rank_score", "rank_per_metric"]
     )
 
+    # Always refresh the contribution, the phase could be added to a
+    # combined leaderboard later on
+    CombinedLeaderboard = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="CombinedLeaderboard"
+    )
+    CombinedLeaderboard.update_phase_contributions_cache(phase_pks=[phase.pk])
+
     for leaderboard in phase.combinedleaderboard_set.all():
         leaderboard.schedule_combined_ranks_update()
 
@@ -516,6 +622,41 @@ def update_combined_leaderboard(*, pk):
     leaderboard.update_combined_ranks_cache()
 
 
+@acks_late_2xlarge_task
+def update_evaluation_metrics(*, phase_pk: uuid.UUID):
+    """Store the metrics for all successful evaluations of a phase"""
+    Evaluation = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="Evaluation"
+    )
+    EvaluationMetric = apps.get_model(  # noqa: N806
+        app_label="evaluation", model_name="EvaluationMetric"
+    )
+
+    evaluations = (
+        Evaluation.objects.filter(
+            submission__phase__pk=phase_pk, status=Evaluation.SUCCESS
+        )
+        .select_related("submission__phase")
+        .prefetch_related("outputs__interface")
+        .order_by("pk")
+    )
+
+    metrics_by_evaluation = {}
+
+    for evaluation in evaluations.iterator(chunk_size=1000):
+        metrics_by_evaluation[evaluation.pk] = evaluation.build_metrics()
+
+        if len(metrics_by_evaluation) >= 1000:
+            EvaluationMetric.objects.replace(
+                metrics_by_evaluation=metrics_by_evaluation
+            )
+            metrics_by_evaluation = {}
+
+    EvaluationMetric.objects.replace(
+        metrics_by_evaluation=metrics_by_evaluation
+    )
+
+
 @acks_late_2xlarge_task
 @transaction.atomic
 def assign_evaluation_permissions(*, phase_pks: uuid.UUID):
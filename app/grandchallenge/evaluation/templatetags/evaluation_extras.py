@@ -27,6 +27,12 @@ def get_jsonpath(obj: dict, jsonpath):
         return ""
 
 
+@register.filter
+def get_metric(evaluation, jsonpath):
+    """Gets the value of a metric from an evaluation, see `get_jsonpath`"""
+    return evaluation.get_metric_value(jsonpath)
+
+
 @register.filter
 def get_key(obj: dict, key):
     try:
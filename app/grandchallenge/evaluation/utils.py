@@ -1,14 +1,12 @@
 from collections import OrderedDict
 from collections.abc import Callable, Iterable
+from statistics import mean, median
 from typing import NamedTuple
 
+import numpy as np
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from django.db import models
 
-from grandchallenge.evaluation.templatetags.evaluation_extras import (
-    get_jsonpath,
-)
-
 
 class Metric(NamedTuple):
     path: str
@@ -21,6 +19,11 @@ class Positions(NamedTuple):
     rank_per_metric: dict[str, dict[str, float]]
 
 
+def absolute(x):
+    """Score using the rank of the first metric only."""
+    return list(x)[0]
+
+
 def get(inputs):
     """Substitute for queryset.get when the qs already exists."""
     if len(inputs) == 1:
@@ -35,6 +38,220 @@ def rank_results(
     *, evaluations: list, metrics: tuple[Metric, ...], score_method: Callable
 ) -> Positions:
     """Determine the overall rank for each result."""
+    try:
+        engine = RankingEngine.from_evaluations(
+            evaluations=evaluations, metrics=metrics
+        )
+    except UnrankableValue:
+        # Fall back to ranking with Python comparisons, which is slower
+        # but defines the canonical order for all values
+        return _rank_results_python(
+            evaluations=evaluations,
+            metrics=metrics,
+            score_method=score_method,
+        )
+
+    return engine.get_positions(score_method=score_method)
+
+
+class UnrankableValue(ValueError):
+    """A metric value that cannot be ranked exactly as a float64"""
+
+
+# Integers above this cannot all be represented exactly as a float64
+MAX_EXACT_INTEGER = 2**53
+
+
+def _get_metric_values(*, evaluation, metrics: tuple[Metric, ...]):
+    """
+    Extract the values of the metrics for this evaluation in one pass
+
+    Returns None if any of the metrics are invalid for this evaluation,
+    this is equivalent to checking `Evaluation.invalid_metrics`.
+    """
+    values = []
+
+    for metric in metrics:
+        value = evaluation.get_metric_value(metric.path)
+
+        if not isinstance(value, (int, float)):
+            return None
+        elif isinstance(value, int) and abs(value) > MAX_EXACT_INTEGER:
+            raise UnrankableValue(value)
+        elif value != value:
+            # NaN is not orderable, so the ranks would depend on the
+            # input order
+            raise UnrankableValue(value)
+
+        values.append(value)
+
+    return values
+
+
+class RankingEngine:
+    """
+    Ranks evaluations on a columnar matrix of their metric values
+
+    The metric values are stored as a float64 matrix with one row per
+    evaluation and one column per metric. For each metric a sorted array
+    of the (sign adjusted) values is kept, so the rank of every evaluation
+    is the number of strictly better values plus one, which is found with
+    a vectorized binary search. Ties share the lowest rank, matching
+    `_scores_to_ranks`.
+
+    New evaluations can be inserted into the sorted arrays with `insert`,
+    which avoids re-sorting all of the values when one result is added.
+    The engine holds no references to model instances so it can be
+    pickled and cached between runs.
+    """
+
+    def __init__(self, *, metrics: tuple[Metric, ...]):
+        self.metrics = tuple(metrics)
+        self.pks = []
+        self._keys = np.empty((0, len(self.metrics)), dtype=np.float64)
+        self._sorted_keys = [
+            np.empty(0, dtype=np.float64) for _ in self.metrics
+        ]
+
+    def __len__(self):
+        return len(self.pks)
+
+    @property
+    def _signs(self):
+        return np.array(
+            [-1.0 if metric.reverse else 1.0 for metric in self.metrics],
+            dtype=np.float64,
+        )
+
+    @classmethod
+    def from_evaluations(
+        cls, *, evaluations: Iterable, metrics: tuple[Metric, ...]
+    ):
+        """
+        Build the engine for all evaluations with valid metrics
+
+        Raises `UnrankableValue` if any of the values cannot be ranked
+        identically to Python comparisons.
+        """
+        engine = cls(metrics=metrics)
+
+        pks = []
+        rows = []
+
+        for evaluation in evaluations:
+            values = _get_metric_values(
+                evaluation=evaluation, metrics=engine.metrics
+            )
+            if values is not None:
+                pks.append(evaluation.pk)
+                rows.append(values)
+
+        engine.pks = pks
+        engine._keys = (
+            np.array(rows, dtype=np.float64).reshape(
+                len(rows), len(engine.metrics)
+            )
+            * engine._signs
+        )
+        engine._sorted_keys = [
+            np.sort(engine._keys[:, idx]) for idx in range(len(metrics))
+        ]
+
+        return engine
+
+    def insert(self, *, evaluation):
+        """
+        Add a single evaluation to the engine without re-sorting
+
+        Returns False if the evaluation has invalid metrics and was not
+        added. Raises `UnrankableValue` if any of the values cannot be
+        ranked identically to Python comparisons.
+        """
+        if evaluation.pk in self.pks:
+            raise ValueError(f"{evaluation.pk} has already been ranked")
+
+        values = _get_metric_values(
+            evaluation=evaluation, metrics=self.metrics
+        )
+        if values is None:
+            return False
+
+        keys = np.array(values, dtype=np.float64) * self._signs
+
+        self.pks.append(evaluation.pk)
+        self._keys = np.vstack((self._keys, keys))
+        self._sorted_keys = [
+            np.insert(
+                sorted_keys,
+                np.searchsorted(sorted_keys, keys[idx]),
+                keys[idx],
+            )
+            for idx, sorted_keys in enumerate(self._sorted_keys)
+        ]
+
+        return True
+
+    def get_positions(self, *, score_method: Callable) -> Positions:
+        """Calculate the ranks of all evaluations in the engine"""
+        rank_per_path = {}
+        for idx, metric in enumerate(self.metrics):
+            # Later metrics with the same path replace earlier ones
+            rank_per_path[metric.path] = _keys_to_ranks(
+                sorted_keys=self._sorted_keys[idx], keys=self._keys[:, idx]
+            )
+
+        rank_matrix = list(zip(*rank_per_path.values(), strict=True))
+        paths = list(rank_per_path.keys())
+
+        rank_per_metric = {
+            pk: dict(zip(paths, ranks, strict=True))
+            for pk, ranks in zip(self.pks, rank_matrix, strict=True)
+        }
+
+        if score_method in _VECTORIZED_SCORE_METHODS and rank_matrix:
+            scores = _VECTORIZED_SCORE_METHODS[score_method](
+                np.array(rank_matrix, dtype=np.int64)
+            ).tolist()
+        else:
+            scores = [score_method(list(ranks)) for ranks in rank_matrix]
+
+        rank_scores = dict(zip(self.pks, scores, strict=True))
+
+        score_keys = np.array(list(rank_scores.values()), dtype=np.float64)
+        ranks = _keys_to_ranks(
+            sorted_keys=np.sort(score_keys), keys=score_keys
+        )
+
+        return Positions(
+            ranks=dict(zip(self.pks, ranks, strict=True)),
+            rank_scores=rank_scores,
+            rank_per_metric=rank_per_metric,
+        )
+
+
+# Vectorized equivalents of the scoring methods of a phase. The ranks are
+# small integers so the float64 sums are exact, and the divisions are
+# correctly rounded, which gives the same results as the statistics module.
+_VECTORIZED_SCORE_METHODS = {
+    absolute: lambda rank_matrix: rank_matrix[:, 0],
+    mean: lambda rank_matrix: rank_matrix.mean(axis=1),
+    median: lambda rank_matrix: np.median(rank_matrix, axis=1),
+}
+
+
+def _keys_to_ranks(*, sorted_keys, keys) -> list[int]:
+    """
+    Vectorized equivalent of `_scores_to_ranks` for ascending keys
+
+    The rank is one more than the number of strictly smaller keys, so
+    equal keys share the same rank.
+    """
+    return (np.searchsorted(sorted_keys, keys, side="left") + 1).tolist()
+
+
+def _rank_results_python(
+    *, evaluations: list, metrics: tuple[Metric, ...], score_method: Callable
+) -> Positions:
     evaluations = _filter_valid_results(
         evaluations=evaluations, metrics=metrics
     )
@@ -77,11 +294,7 @@ def _get_rank_per_metric(
         # Extract the value of the metric for this primary key and sort on the
         # value of the metric
         metric_scores = {
-            e.pk: get_jsonpath(
-                e.metrics_json_file,
-                metric.path,
-            )
-            for e in evaluations
+            e.pk: e.get_metric_value(metric.path) for e in evaluations
         }
         metric_rank[metric.path] = _scores_to_ranks(
             scores=metric_scores, reverse=metric.reverse
@@ -10,7 +10,7 @@ from django.contrib.auth.mixins import (
 )
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
+from django.db.models import Q, prefetch_related_objects
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.functional import cached_property
@@ -664,6 +664,7 @@ class LeaderboardDetail(
     template_name = "evaluation/leaderboard_detail.html"
     row_template = "evaluation/leaderboard_row.html"
     search_fields = ["pk", "submission__creator__username"]
+    indexed_search = True
 
     def test_func(self):
         if self.phase.public:
@@ -769,6 +770,19 @@ class LeaderboardDetail(
 
         return columns
 
+    def render_rows(self, *, object_list):
+        # Only fetch the outputs for evaluations without stored metrics,
+        # their values are read from the metrics json file instead
+        prefetch_related_objects(
+            [
+                e
+                for e in object_list
+                if not e.has_stored_metrics(paths=self.phase.metric_paths)
+            ],
+            "outputs__interface",
+        )
+        return super().render_rows(object_list=object_list)
+
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         context.update(
@@ -802,9 +816,7 @@ class LeaderboardDetail(
                 "submission__phase__challenge",
                 "submission__algorithm_image__algorithm",
             )
-            .prefetch_related(
-                "outputs__interface",
-            )
+            .prefetch_related("metrics")
         )
         return filter_by_permission(
             queryset=queryset,
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 
 class PaymentStatusChoices(models.TextChoices):
@@ -76,3 +78,10 @@ class Invoice(models.Model):
         choices=PaymentStatusChoices.choices,
         default=PaymentStatusChoices.INITIALIZED,
     )
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def invalidate_challenge_subdomain_cache(*_, instance, **__):
+    # The available compute of the cached challenge depends on the invoices
+    instance.challenge.invalidate_subdomain_cache()
@@ -1,18 +1,23 @@
-from actstream.actions import is_following
-from actstream.models import Follow, followers
+from actstream.models import Follow
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.humanize.templatetags.humanize import naturaltime
-from django.contrib.sites.models import Site
 from django.db import models
+from django.db.models import Q
+from django.db.transaction import on_commit
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
 from guardian.shortcuts import assign_perm
 
 from grandchallenge.core.models import UUIDModel
-from grandchallenge.profiles.models import NotificationEmailOptions
+from grandchallenge.profiles.models import (
+    NotificationEmailOptions,
+    UserProfile,
+)
 from grandchallenge.profiles.templatetags.profiles import user_profile_link
 from grandchallenge.subdomains.utils import reverse
 
@@ -149,32 +154,105 @@ class Notification(UUIDModel):
         description=None,
         context_class=None,
     ):
+        # Local import to avoid circular dependency
+        from grandchallenge.notifications.tasks import create_notifications
+
         receivers = Notification.get_receivers(
             action_object=action_object, actor=actor, kind=kind, target=target
         )
-        site = Site.objects.get_current()
-
-        for receiver in receivers:
-            Notification.objects.create(
-                user=receiver,
-                type=kind,
-                message=message,
-                actor=actor,
-                action_object=action_object,
-                target=target,
-                description=description,
-                context_class=context_class,
+        user_pks = [*receivers.values_list("pk", flat=True)]
+
+        notification_kwargs = {
+            "type": kind,
+            "message": message,
+            "description": description,
+            "context_class": context_class,
+            **_get_generic_foreign_key_kwargs(name="actor", obj=actor),
+            **_get_generic_foreign_key_kwargs(
+                name="action_object", obj=action_object
+            ),
+            **_get_generic_foreign_key_kwargs(name="target", obj=target),
+        }
+
+        batch_size = settings.NOTIFICATIONS_FAN_OUT_BATCH_SIZE
+
+        if len(user_pks) <= batch_size:
+            Notification.create_for_users(
+                user_pks=user_pks, notification_kwargs=notification_kwargs
             )
-            if (
-                receiver.user_profile.notification_email_choice
-                == NotificationEmailOptions.INSTANT
-            ):
-                receiver.user_profile.dispatch_unread_notifications_email(
-                    site=site, unread_notification_count=1
+        else:
+            # Fan out large audiences, such as the followers of a forum,
+            # so that the request is not blocked
+            for idx in range(0, len(user_pks), batch_size):
+                on_commit(
+                    create_notifications.signature(
+                        kwargs={
+                            "user_pks": user_pks[idx : idx + batch_size],
+                            "notification_kwargs": notification_kwargs,
+                        }
+                    ).apply_async
+                )
+
+    @staticmethod
+    def create_for_users(*, user_pks, notification_kwargs):
+        """
+        Creates a notification for each user along with their permissions
+
+        Instant emails are sent to the users who have opted in to them
+        once the transaction has been committed.
+        """
+        # Local import to avoid circular dependency
+        from grandchallenge.notifications.tasks import (
+            send_instant_notification_emails,
+        )
+
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(user_id=user_pk, **notification_kwargs)
+                for user_pk in user_pks
+            ]
+        )
+
+        permissions = Permission.objects.filter(
+            content_type=ContentType.objects.get_for_model(Notification),
+            codename__in=[
+                "view_notification",
+                "delete_notification",
+                "change_notification",
+            ],
+        )
+
+        NotificationUserObjectPermission.objects.bulk_create(
+            [
+                NotificationUserObjectPermission(
+                    permission=permission,
+                    user_id=notification.user_id,
+                    content_object=notification,
                 )
+                for notification in notifications
+                for permission in permissions
+            ]
+        )
+
+        instant_email_user_pks = [
+            *UserProfile.objects.filter(
+                user__pk__in=user_pks,
+                notification_email_choice=NotificationEmailOptions.INSTANT,
+            ).values_list("user__pk", flat=True)
+        ]
+
+        if instant_email_user_pks:
+            on_commit(
+                send_instant_notification_emails.signature(
+                    kwargs={"user_pks": instant_email_user_pks}
+                ).apply_async
+            )
 
     @staticmethod
     def get_receivers(*, kind, actor, action_object, target):  # noqa: C901
+        """Returns a queryset of the users that should receive a notification"""
+        users = get_user_model().objects.all()
+
         if (
             kind == NotificationType.NotificationTypeChoices.FORUM_POST
             or kind
@@ -183,57 +261,48 @@ class Notification(UUIDModel):
             and target._meta.model_name != "algorithm"
             or kind == NotificationType.NotificationTypeChoices.REQUEST_UPDATE
         ):
+            receivers = _get_followers(obj=target)
             if actor:
-                return {
-                    follower
-                    for follower in followers(target)
-                    if follower != actor
-                }
-            else:
-                return followers(target)
+                receivers = receivers.exclude(pk=actor.pk)
+            return receivers
         elif (
             kind == NotificationType.NotificationTypeChoices.ACCESS_REQUEST
             and target._meta.model_name == "algorithm"
         ):
-            return {
-                follower
-                for follower in followers(target, flag="access_request")
-                if follower != actor
-            }
+            receivers = _get_followers(obj=target, flag="access_request")
+            if actor:
+                receivers = receivers.exclude(pk=actor.pk)
+            return receivers
         elif kind == NotificationType.NotificationTypeChoices.NEW_ADMIN:
-            return {action_object}
+            return users.filter(pk=action_object.pk)
         elif (
             kind == NotificationType.NotificationTypeChoices.EVALUATION_STATUS
         ):
-            receivers = {
-                admin
-                for admin in target.challenge.get_admins()
-                if is_following(admin, target)
-            }
-            if actor and is_following(actor, target):
-                receivers.add(actor)
-            return receivers
+            receivers = Q(pk__in=target.challenge.get_admins().values("pk"))
+            if actor:
+                receivers |= Q(pk=actor.pk)
+            return _get_followers(obj=target).filter(receivers)
         elif kind == NotificationType.NotificationTypeChoices.MISSING_METHOD:
-            return {
-                admin
-                for admin in target.challenge.get_admins()
-                if is_following(admin, target)
-            }
+            return _get_followers(obj=target).filter(
+                pk__in=target.challenge.get_admins().values("pk")
+            )
         elif kind == NotificationType.NotificationTypeChoices.JOB_STATUS:
-            if actor and is_following(actor, target, flag="job-active"):
-                return {actor}
+            if actor:
+                return _get_followers(obj=target, flag="job-active").filter(
+                    pk=actor.pk
+                )
             else:
-                return set()
+                return users.none()
         elif (
             kind
             == NotificationType.NotificationTypeChoices.IMAGE_IMPORT_STATUS
         ):
-            return followers(action_object)
+            return _get_followers(obj=action_object)
         elif kind in [
             NotificationType.NotificationTypeChoices.FILE_COPY_STATUS,
             NotificationType.NotificationTypeChoices.CIV_VALIDATION,
         ]:
-            return {actor}
+            return users.filter(pk=actor.pk)
         else:
             raise RuntimeError(f"Unhandled notification type {kind!r}")
 
@@ -473,6 +542,30 @@ class Notification(UUIDModel):
             return self.description
 
 
+def _get_followers(*, obj, flag=""):
+    """The users following an object, as a queryset"""
+    follows = Follow.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+    )
+
+    if flag:
+        follows = follows.filter(flag=flag)
+
+    return get_user_model().objects.filter(pk__in=follows.values("user"))
+
+
+def _get_generic_foreign_key_kwargs(*, name, obj):
+    if obj is None:
+        return {f"{name}_content_type_id": None, f"{name}_object_id": None}
+    else:
+        return {
+            f"{name}_content_type_id": ContentType.objects.get_for_model(
+                obj
+            ).pk,
+            f"{name}_object_id": str(obj.pk),
+        }
+
+
 class NotificationUserObjectPermission(UserObjectPermissionBase):
     content_object = models.ForeignKey(Notification, on_delete=models.CASCADE)
 
@@ -1,7 +1,9 @@
 from django.contrib.sites.models import Site
+from django.db import transaction
 from django.db.models import Count, F, Q
 
 from grandchallenge.core.celery import acks_late_micro_short_task
+from grandchallenge.notifications.models import Notification
 from grandchallenge.profiles.models import (
     NotificationEmailOptions,
     UserProfile,
@@ -42,3 +44,25 @@ def send_unread_notification_emails():
             site=site,
             unread_notification_count=profile.unread_notification_count,
         )
+
+
+@acks_late_micro_short_task
+@transaction.atomic
+def create_notifications(*, user_pks, notification_kwargs):
+    Notification.create_for_users(
+        user_pks=user_pks, notification_kwargs=notification_kwargs
+    )
+
+
+@acks_late_micro_short_task
+def send_instant_notification_emails(*, user_pks):
+    profiles = UserProfile.objects.filter(
+        user__pk__in=user_pks,
+        notification_email_choice=NotificationEmailOptions.INSTANT,
+    ).select_related("user")
+
+    UserProfile.dispatch_unread_notifications_emails(
+        profiles=[*profiles],
+        site=Site.objects.get_current(),
+        unread_notification_count=1,
+    )
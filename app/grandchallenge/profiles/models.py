@@ -183,6 +183,35 @@ class UserProfile(models.Model):
         self.notification_email_last_sent_at = now()
         self.save(update_fields=["notification_email_last_sent_at"])
 
+        send_standard_email_batch(
+            site=site,
+            recipients=[self.user],
+            subscription_type=EmailSubscriptionTypes.NOTIFICATION,
+            **self._get_unread_notifications_email_content(
+                unread_notification_count=unread_notification_count
+            ),
+        )
+
+    @classmethod
+    def dispatch_unread_notifications_emails(
+        cls, *, profiles, site, unread_notification_count
+    ):
+        """Send the same unread notifications email to many users at once"""
+        cls.objects.filter(pk__in=[p.pk for p in profiles]).update(
+            notification_email_last_sent_at=now()
+        )
+
+        send_standard_email_batch(
+            site=site,
+            recipients=[p.user for p in profiles],
+            subscription_type=EmailSubscriptionTypes.NOTIFICATION,
+            **cls._get_unread_notifications_email_content(
+                unread_notification_count=unread_notification_count
+            ),
+        )
+
+    @staticmethod
+    def _get_unread_notifications_email_content(*, unread_notification_count):
         subject = format_html(
             ("You have {unread_notification_count} new notification{suffix}"),
             unread_notification_count=unread_notification_count,
@@ -199,13 +228,7 @@ class UserProfile(models.Model):
             url=reverse("notifications:list"),
         )
 
-        send_standard_email_batch(
-            site=site,
-            subject=subject,
-            markdown_message=msg,
-            recipients=[self.user],
-            subscription_type=EmailSubscriptionTypes.NOTIFICATION,
-        )
+        return {"subject": subject, "markdown_message": msg}
 
     def dispatch_unread_direct_messages_email(
         self, *, site, new_unread_message_count, new_senders
@@ -0,0 +1,31 @@
+from django.core.management import BaseCommand
+
+from grandchallenge.reader_studies.models import ReaderStudy
+from grandchallenge.reader_studies.tasks import update_reader_study_statistics
+
+
+class Command(BaseCommand):
+    help = "Recalculate the answer statistics of reader studies"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "slug",
+            nargs="*",
+            type=str,
+            help="Only rebuild the statistics of these reader studies",
+        )
+
+    def handle(self, *args, **options):
+        reader_studies = ReaderStudy.objects.all()
+
+        if options["slug"]:
+            reader_studies = reader_studies.filter(slug__in=options["slug"])
+
+        for reader_study_pk in reader_studies.values_list(
+            "pk", flat=True
+        ).iterator():
+            update_reader_study_statistics.apply_async(
+                kwargs={"reader_study_pk": str(reader_study_pk)}
+            )
+
+        self.stdout.write("Statistics rebuild tasks scheduled")
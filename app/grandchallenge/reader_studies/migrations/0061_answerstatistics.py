@@ -0,0 +1,117 @@
+# Generated by Django 4.2.17 on 2025-01-22 09:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        (
+            "reader_studies",
+            "0060_alter_optionalhangingprotocolreaderstudy_unique_together_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionStatistics",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("answer_count", models.PositiveIntegerField(default=0)),
+                ("score_sum", models.FloatField(default=0.0)),
+                ("score_count", models.PositiveIntegerField(default=0)),
+                (
+                    "question",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="statistics",
+                        to="reader_studies.question",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="DisplaySetStatistics",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("answer_count", models.PositiveIntegerField(default=0)),
+                ("score_sum", models.FloatField(default=0.0)),
+                ("score_count", models.PositiveIntegerField(default=0)),
+                (
+                    "display_set",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="statistics",
+                        to="reader_studies.displayset",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ReaderStudyUserStatistics",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("answer_count", models.PositiveIntegerField(default=0)),
+                ("score_sum", models.FloatField(default=0.0)),
+                ("score_count", models.PositiveIntegerField(default=0)),
+                (
+                    "completed_display_set_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="The number of display sets where the user has answered all answerable questions",
+                    ),
+                ),
+                (
+                    "reader_study",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_statistics",
+                        to="reader_studies.readerstudy",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("reader_study", "user")},
+            },
+        ),
+    ]
@@ -1,8 +1,13 @@
+import random
+from collections import Counter
+from uuid import uuid4
+
 from actstream.models import Follow
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import (
     MaxLengthValidator,
@@ -11,16 +16,22 @@ from django.core.validators import (
     MinValueValidator,
     RegexValidator,
 )
-from django.db import models
-from django.db.models import Avg, Count, Q, Sum
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, NullIf, Rank
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django.utils.functional import cached_property
+from django.utils.timezone import now
 from django_extensions.db.models import TitleSlugDescriptionModel
 from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
 from guardian.shortcuts import assign_perm, remove_perm
 from referencing.exceptions import Unresolvable
 from simple_history.models import HistoricalRecords
+from simple_history.utils import (
+    bulk_create_with_history,
+    bulk_update_with_history,
+)
 from stdimage import JPEGField
 
 from grandchallenge.anatomy.models import BodyStructure
@@ -556,35 +567,18 @@ class ReaderStudy(
 
     def get_progress_for_user(self, user):
         """Returns the percentage of completed hangings and questions for ``user``."""
-        if self.display_sets.count() == 0:
-            return {"questions": 0.0, "hangings": 0.0, "diff": 0.0}
-
         n_display_sets = self.display_sets.count()
         expected = n_display_sets * self.answerable_question_count
 
-        answers = Answer.objects.filter(
-            question__in=self.answerable_questions,
-            creator_id=user.id,
-            is_ground_truth=False,
-        ).distinct()
-        answer_count = answers.count()
+        statistics = self.user_statistics.filter(user_id=user.id).first()
 
-        if expected == 0 or answer_count == 0:
+        if expected == 0 or statistics is None or statistics.answer_count == 0:
             return {"questions": 0.0, "hangings": 0.0, "diff": 0.0}
 
-        completed_hangings = (
-            self.display_sets.annotate(
-                answers_for_user=Count(
-                    "answers",
-                    filter=Q(
-                        answers__creator=user,
-                        answers__is_ground_truth=False,
-                    ),
-                )
-            ).filter(answers_for_user=self.answerable_question_count)
-        ).count()
-        questions = answer_count / expected * 100
-        hangings = completed_hangings / n_display_sets * 100
+        questions = statistics.answer_count / expected * 100
+        hangings = (
+            statistics.completed_display_set_count / n_display_sets * 100
+        )
         return {
             "questions": questions,
             "hangings": hangings,
@@ -599,24 +593,27 @@ class ReaderStudy(
 
     def score_for_user(self, user):
         """Returns the average and total score for answers given by ``user``."""
+        statistics = self.user_statistics.filter(user_id=user.id).first()
 
-        return Answer.objects.filter(
-            creator=user,
-            question__in=self.questions_with_ground__truth,
-            is_ground_truth=False,
-        ).aggregate(Sum("score"), Avg("score"))
+        if statistics is None:
+            return {"score__sum": None, "score__avg": None}
+
+        return {
+            "score__sum": statistics.score_total,
+            "score__avg": statistics.score_avg,
+        }
 
     @cached_property
     def scores_by_user(self):
         """The average and total scores for this ``ReaderStudy`` grouped by user."""
+        scores = get_score_annotations()
         return (
-            Answer.objects.filter(
-                question__in=self.questions_with_ground__truth,
-                is_ground_truth=False,
+            self.user_statistics.filter(score_count__gt=0)
+            .values(
+                creator__username=F("user__username"),
+                score__sum=scores["sum"],
+                score__avg=scores["avg"],
             )
-            .order_by("creator_id")
-            .values("creator__username")
-            .annotate(Sum("score"), Avg("score"))
             .order_by("-score__sum")
         )
 
@@ -633,27 +630,23 @@ class ReaderStudy(
     @cached_property
     def statistics(self):
         """Statistics per question and case based on the total / average score."""
+        scores = get_score_annotations()
         scores_by_question = (
-            Answer.objects.filter(
-                question__reader_study=self, is_ground_truth=False
+            QuestionStatistics.objects.filter(
+                question__reader_study=self, answer_count__gt=0
+            )
+            .values(
+                "question__question_text",
+                score__sum=scores["sum"],
+                score__avg=scores["avg"],
             )
-            .order_by("question_id")
-            .values("question__question_text")
-            .annotate(Sum("score"), Avg("score"))
             .order_by("-score__avg")
         )
 
         scores_by_case = (
             DisplaySet.objects.filter(reader_study=self)
             .select_related("reader_study__workstation__config")
-            .annotate(
-                sum=Sum(
-                    "answers__score", filter=Q(answers__is_ground_truth=False)
-                ),
-                avg=Avg(
-                    "answers__score", filter=Q(answers__is_ground_truth=False)
-                ),
-            )
+            .annotate(**get_score_annotations(prefix="statistics__"))
             .order_by("avg")
             .all()
         )
@@ -707,7 +700,7 @@ class ReaderStudy(
         questions = list(dict.fromkeys(questions))
 
         return {
-            "max_score_questions": float(len(self.display_sets.all()))
+            "max_score_questions": float(self.display_sets.count())
             * self.scores_by_user.count(),
             "scores_by_question": scores_by_question,
             "max_score_cases": float(self.answerable_question_count)
@@ -717,12 +710,151 @@ class ReaderStudy(
             "questions": questions,
         }
 
+    def rebuild_statistics(self):
+        """Recalculates the running totals of the answers to this study."""
+        answers = Answer.objects.filter(
+            question__reader_study=self, is_ground_truth=False
+        ).order_by()
+        totals = {
+            "answer_count": Count("pk"),
+            "score_sum": Coalesce(Sum("score"), 0.0),
+            "score_count": Count("score"),
+        }
+
+        completed_display_sets = Counter(
+            self._completed_display_sets(answers=answers).values_list(
+                "creator_id", flat=True
+            )
+        )
+
+        self.user_statistics.all().delete()
+        ReaderStudyUserStatistics.objects.bulk_create(
+            ReaderStudyUserStatistics(
+                reader_study=self,
+                user_id=row["creator_id"],
+                completed_display_set_count=completed_display_sets[
+                    row["creator_id"]
+                ],
+                answer_count=row["answer_count"],
+                score_sum=row["score_sum"],
+                score_count=row["score_count"],
+            )
+            for row in answers.values("creator_id").annotate(**totals)
+        )
+
+        DisplaySetStatistics.objects.filter(
+            display_set__reader_study=self
+        ).delete()
+        DisplaySetStatistics.objects.bulk_create(
+            DisplaySetStatistics(**row)
+            for row in answers.filter(display_set__isnull=False)
+            .values("display_set_id")
+            .annotate(**totals)
+        )
+
+        QuestionStatistics.objects.filter(question__reader_study=self).delete()
+        QuestionStatistics.objects.bulk_create(
+            QuestionStatistics(**row)
+            for row in answers.values("question_id").annotate(**totals)
+        )
+
+    def _completed_display_sets(self, *, answers):
+        """The (creator, display set) pairs of ``answers`` with all questions answered"""
+        return (
+            answers.filter(display_set__isnull=False)
+            .order_by()
+            .values("creator_id", "display_set_id")
+            .annotate(n_answers=Count("pk"))
+            .filter(n_answers=self.answerable_question_count)
+        )
+
+    def count_completed_display_sets(self, *, user_id):
+        """The number of display sets where the user has answered all questions"""
+        return self._completed_display_sets(
+            answers=Answer.objects.filter(
+                question__reader_study=self,
+                creator_id=user_id,
+                is_ground_truth=False,
+            )
+        ).count()
+
     @property
     def next_display_set_order(self):
         last = self.display_sets.last()
         highest = getattr(last, "order", 0)
         return (highest + 10) // 10 * 10
 
+    @property
+    def display_set_index_version_cache_key(self):
+        return f"{self._meta.app_label}.{self._meta.model_name}.display_set_index_version.{self.pk}"
+
+    def _display_set_index_cache_key(self, *, suffix):
+        # All of the index maps for this reader study are invalidated by
+        # replacing the version
+        version = cache.get_or_set(
+            self.display_set_index_version_cache_key,
+            lambda: uuid4().hex,
+            timeout=None,
+        )
+        return f"{self._meta.app_label}.{self._meta.model_name}.display_set_index.{self.pk}.{version}.{suffix}"
+
+    def invalidate_display_set_index(self):
+        cache.delete(self.display_set_index_version_cache_key)
+
+    def get_standard_display_set_index(self):
+        """
+        Maps the pk of each display set to its zero-based index in the
+        hanging list, which is the number of display sets with a lower order
+        """
+        cache_key = self._display_set_index_cache_key(suffix="standard")
+        display_set_index = cache.get(cache_key)
+
+        if display_set_index is None:
+            display_set_index = {
+                pk: rank - 1
+                for pk, rank in self.display_sets.annotate(
+                    rank=Window(expression=Rank(), order_by=F("order").asc())
+                ).values_list("pk", "rank")
+            }
+            cache.set(
+                cache_key,
+                display_set_index,
+                timeout=settings.READER_STUDIES_DISPLAY_SET_INDEX_CACHE_TIMEOUT,
+            )
+
+        return display_set_index
+
+    def get_shuffled_display_set_index(self, *, user):
+        """
+        Maps the pk of each display set to its zero-based index in the
+        hanging list of this user, the order is a deterministic permutation
+        that is unique for each reader study and user
+        """
+        cache_key = self._display_set_index_cache_key(suffix=user.pk)
+        display_set_index = cache.get(cache_key)
+
+        if display_set_index is None:
+            pks = list(
+                self.display_sets.order_by(
+                    "order", "created", "pk"
+                ).values_list("pk", flat=True)
+            )
+            random.Random(f"{self.pk}.{user.pk}").shuffle(pks)
+            display_set_index = {pk: idx for idx, pk in enumerate(pks)}
+            cache.set(
+                cache_key,
+                display_set_index,
+                timeout=settings.READER_STUDIES_DISPLAY_SET_INDEX_CACHE_TIMEOUT,
+            )
+
+        return display_set_index
+
+    def get_display_set_index(self, *, user):
+        if self.shuffle_hanging_list:
+            return self.get_shuffled_display_set_index(user=user)
+        else:
+            return self.get_standard_display_set_index()
+
     @property
     def civ_sets_list_url(self):
         return reverse(
@@ -907,13 +1039,7 @@ class DisplaySet(
 
     @property
     def standard_index(self) -> int:
-        return len(
-            [
-                x
-                for x in self.reader_study.display_sets.all()
-                if x.order < self.order
-            ]
-        )
+        return self.reader_study.get_standard_display_set_index()[self.pk]
 
     @property
     def update_url(self):
@@ -1773,6 +1899,14 @@ class Answer(UUIDModel):
         ]
     )
 
+    # The fields that determine which running totals this answer is part of
+    _statistics_fields = (
+        "creator_id",
+        "question_id",
+        "display_set_id",
+        "is_ground_truth",
+    )
+
     class Meta:
         ordering = ("created",)
         unique_together = (
@@ -1795,7 +1929,7 @@ class Answer(UUIDModel):
 
     # TODO this should be a model clean method
     @staticmethod
-    def validate(  # noqa: C901
+    def validate(
         *,
         creator,
         question,
@@ -1805,16 +1939,7 @@ class Answer(UUIDModel):
         instance=None,
     ):
         """Validates all fields provided for ``answer``."""
-        if question.answer_type == Question.AnswerType.HEADING:
-            # Maintained for historical consistency
-            raise ValidationError("Headings are not answerable.")
-
-        if not question.is_answer_valid(answer=answer):
-            raise ValidationError(
-                f"Your answer is not the correct type. "
-                f"{question.get_answer_type_display()} expected, "
-                f"{type(answer)} found."
-            )
+        Answer.validate_answer_value(question=question, answer=answer)
 
         if display_set.reader_study != question.reader_study:
             raise ValidationError(
@@ -1840,7 +1965,22 @@ class Answer(UUIDModel):
         if not creator.has_perm("read_readerstudy", question.reader_study):
             raise ValidationError("This user is not a reader for this study.")
 
-        valid_options = question.options.values_list("id", flat=True)
+    @staticmethod
+    def validate_answer_value(*, question, answer):  # noqa: C901
+        """Validates that ``answer`` is a valid answer to ``question``."""
+        if question.answer_type == Question.AnswerType.HEADING:
+            # Maintained for historical consistency
+            raise ValidationError("Headings are not answerable.")
+
+        if not question.is_answer_valid(answer=answer):
+            raise ValidationError(
+                f"Your answer is not the correct type. "
+                f"{question.get_answer_type_display()} expected, "
+                f"{type(answer)} found."
+            )
+
+        # Uses the prefetched options when validating answers in bulk
+        valid_options = [option.pk for option in question.options.all()]
         if question.answer_type == Question.AnswerType.CHOICE:
             if not question.required:
                 valid_options = (*valid_options, None)
@@ -1896,11 +2036,261 @@ class Answer(UUIDModel):
 
     def save(self, *args, **kwargs):
         adding = self._state.adding
-        super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            if adding:
+                previous = None
+            else:
+                previous = (
+                    Answer.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .only("score", *self._statistics_fields)
+                    .first()
+                )
+
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                self.update_statistics(
+                    answer_delta=1, previous_score=None, score=self.score
+                )
+            elif any(
+                getattr(previous, f) != getattr(self, f)
+                for f in self._statistics_fields
+            ):
+                # The answer moved, so add it to the new totals and remove
+                # it from the old ones. Removing recounts the completed
+                # display sets so must be done last.
+                self.update_statistics(
+                    answer_delta=1, previous_score=None, score=self.score
+                )
+                previous.update_statistics(
+                    answer_delta=-1, previous_score=previous.score, score=None
+                )
+            else:
+                self.update_statistics(
+                    answer_delta=0,
+                    previous_score=previous.score,
+                    score=self.score,
+                )
 
         if adding:
             self.assign_permissions()
 
+    def update_statistics(self, *, answer_delta, previous_score, score):
+        """
+        Applies the change of this answer to the running totals of the
+        reader study user, display set and question.
+
+        ``answer_delta`` is 1 for a new answer, -1 for a deleted answer and 0
+        if the answer was updated.
+
+        The number of completed display sets is recounted when an answer is
+        removed. When a queryset is deleted the answers are all removed
+        before the first post delete signal is sent, so the number of
+        completed display sets cannot be worked out from a delta.
+        """
+        if self.is_ground_truth:
+            return
+
+        score_delta = (score or 0.0) - (previous_score or 0.0)
+        score_count_delta = int(score is not None) - int(
+            previous_score is not None
+        )
+
+        if not answer_delta and not score_delta and not score_count_delta:
+            return
+
+        totals = {
+            "answer_count": F("answer_count") + answer_delta,
+            "score_sum": F("score_sum") + score_delta,
+            "score_count": F("score_count") + score_count_delta,
+        }
+
+        user_keys = {
+            "reader_study_id": self.question.reader_study_id,
+            "user_id": self.creator_id,
+        }
+        completed_display_set_count = F("completed_display_set_count")
+
+        if answer_delta and self.display_set_id is not None:
+            # Answers to the same display set are counted one at a time
+            ReaderStudyUserStatistics.lock(keys=user_keys)
+
+            reader_study = self.question.reader_study
+
+            if answer_delta < 0:
+                completed_display_set_count = (
+                    reader_study.count_completed_display_sets(
+                        user_id=self.creator_id
+                    )
+                )
+            else:
+                question_count = reader_study.answerable_question_count
+                answer_count = Answer.objects.filter(
+                    creator_id=self.creator_id,
+                    display_set_id=self.display_set_id,
+                    is_ground_truth=False,
+                ).count()
+                completed_display_set_count += int(
+                    answer_count == question_count
+                ) - int(answer_count - answer_delta == question_count)
+
+        ReaderStudyUserStatistics.increment(
+            keys=user_keys,
+            completed_display_set_count=completed_display_set_count,
+            **totals,
+        )
+        if self.display_set_id is not None:
+            DisplaySetStatistics.increment(
+                keys={"display_set_id": self.display_set_id},
+                **totals,
+            )
+        QuestionStatistics.increment(
+            keys={"question_id": self.question_id},
+            **totals,
+        )
+
+    @classmethod
+    def bulk_save(cls, *, creator, display_set, answers):
+        """
+        Creates or updates the ``answers`` of ``creator`` for ``display_set``.
+
+        This has the same effect as saving each answer, but the answers are
+        scored against the ground truth in one pass, and the writes,
+        permissions and statistics are done in batches.
+        """
+        new_answers = [a for a in answers if a._state.adding]
+        existing_answers = [a for a in answers if not a._state.adding]
+
+        with transaction.atomic():
+            previous_scores = dict(
+                cls.objects.select_for_update()
+                .filter(pk__in=[a.pk for a in existing_answers])
+                .values_list("pk", "score")
+            )
+            ground_truths = dict(
+                cls.objects.filter(
+                    display_set=display_set,
+                    is_ground_truth=True,
+                    question__in=[a.question_id for a in answers],
+                ).values_list("question_id", "answer")
+            )
+
+            for answer in answers:
+                if answer.question_id in ground_truths:
+                    answer.calculate_score(ground_truths[answer.question_id])
+
+            bulk_create_with_history(new_answers, cls, default_user=creator)
+
+            modified = now()
+            for answer in existing_answers:
+                answer.modified = modified
+            bulk_update_with_history(
+                existing_answers,
+                cls,
+                fields=[
+                    "answer",
+                    "score",
+                    "last_edit_duration",
+                    "total_edit_duration",
+                    "modified",
+                ],
+                default_user=creator,
+            )
+
+            if new_answers:
+                cls.bulk_assign_permissions(
+                    creator=creator,
+                    reader_study=display_set.reader_study,
+                    queryset=cls.objects.filter(
+                        pk__in=[a.pk for a in new_answers]
+                    ),
+                )
+
+            cls._bulk_update_statistics(
+                creator=creator,
+                display_set=display_set,
+                new_answers=new_answers,
+                existing_answers=existing_answers,
+                previous_scores=previous_scores,
+            )
+
+        return answers
+
+    @classmethod
+    def _bulk_update_statistics(
+        cls,
+        *,
+        creator,
+        display_set,
+        new_answers,
+        existing_answers,
+        previous_scores,
+    ):
+        question_deltas = {}
+        new_pks = {a.pk for a in new_answers}
+
+        for answer in [*new_answers, *existing_answers]:
+            previous_score = previous_scores.get(answer.pk)
+            question_deltas[answer.question_id] = {
+                "answer_count": int(answer.pk in new_pks),
+                "score_sum": (answer.score or 0.0) - (previous_score or 0.0),
+                "score_count": int(answer.score is not None)
+                - int(previous_score is not None),
+            }
+
+        if not any(any(d.values()) for d in question_deltas.values()):
+            return
+
+        totals = {
+            field: sum(d[field] for d in question_deltas.values())
+            for field in ("answer_count", "score_sum", "score_count")
+        }
+
+        user_keys = {
+            "reader_study_id": display_set.reader_study_id,
+            "user_id": creator.pk,
+        }
+
+        # Answers to the same display set are counted one at a time
+        ReaderStudyUserStatistics.lock(keys=user_keys)
+
+        question_count = display_set.reader_study.answerable_question_count
+        answer_count = cls.objects.filter(
+            creator=creator, display_set=display_set, is_ground_truth=False
+        ).count()
+        completed_delta = int(answer_count == question_count) - int(
+            answer_count - len(new_answers) == question_count
+        )
+
+        ReaderStudyUserStatistics.increment(
+            keys=user_keys,
+            completed_display_set_count=F("completed_display_set_count")
+            + completed_delta,
+            **{field: F(field) + delta for field, delta in totals.items()},
+        )
+        DisplaySetStatistics.increment(
+            keys={"display_set_id": display_set.pk},
+            **{field: F(field) + delta for field, delta in totals.items()},
+        )
+        QuestionStatistics.bulk_increment(
+            key="question_id", deltas=question_deltas
+        )
+
+    @classmethod
+    def bulk_assign_permissions(cls, *, creator, reader_study, queryset):
+        for codename in ("view", "delete"):
+            assign_perm(
+                f"{codename}_{cls._meta.model_name}",
+                reader_study.editors_group,
+                queryset,
+            )
+        for codename in ("view", "change"):
+            assign_perm(
+                f"{codename}_{cls._meta.model_name}", creator, queryset
+            )
+
     def assign_permissions(self):
         # Allow the editors and creator to view this answer
         assign_perm(
@@ -1925,6 +2315,105 @@ class AnswerGroupObjectPermission(GroupObjectPermissionBase):
     content_object = models.ForeignKey(Answer, on_delete=models.CASCADE)
 
 
+def get_score_annotations(*, prefix=""):
+    """
+    The total and average score from the running totals of an
+    ``AnswerStatistics`` model, both are None if no answers are scored yet.
+    """
+    score_sum = F(f"{prefix}score_sum")
+    score_count = F(f"{prefix}score_count")
+    return {
+        "sum": Case(When(**{f"{prefix}score_count__gt": 0}, then=score_sum)),
+        "avg": score_sum / NullIf(score_count, 0),
+    }
+
+
+class AnswerStatistics(models.Model):
+    """Running totals of the answers that are not ground truth."""
+
+    answer_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    score_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def increment(cls, *, keys, **updates):
+        cls.objects.get_or_create(**keys)
+        cls.objects.filter(**keys).update(**updates)
+
+    @classmethod
+    def lock(cls, *, keys):
+        """Locks the row until the end of the transaction"""
+        cls.objects.get_or_create(**keys)
+        return cls.objects.select_for_update().get(**keys)
+
+    @classmethod
+    def bulk_increment(cls, *, key, deltas):
+        """
+        Increments the totals of many rows in one update, ``deltas`` maps
+        the value of ``key`` of each row to the increments of its fields.
+        """
+        cls.objects.bulk_create(
+            [cls(**{key: value}) for value in deltas], ignore_conflicts=True
+        )
+        fields = {field for d in deltas.values() for field in d}
+        cls.objects.filter(**{f"{key}__in": deltas}).update(
+            **{
+                field: F(field)
+                + Case(
+                    *[
+                        When(**{key: value}, then=Value(d.get(field, 0)))
+                        for value, d in deltas.items()
+                    ],
+                    default=Value(0),
+                    output_field=cls._meta.get_field(field),
+                )
+                for field in fields
+            }
+        )
+
+    @property
+    def score_total(self):
+        return self.score_sum if self.score_count else None
+
+    @property
+    def score_avg(self):
+        return self.score_sum / self.score_count if self.score_count else None
+
+
+class ReaderStudyUserStatistics(AnswerStatistics):
+    reader_study = models.ForeignKey(
+        ReaderStudy, on_delete=models.CASCADE, related_name="user_statistics"
+    )
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="+"
+    )
+    completed_display_set_count = models.PositiveIntegerField(
+        default=0,
+        help_text=(
+            "The number of display sets where the user has answered all "
+            "answerable questions"
+        ),
+    )
+
+    class Meta:
+        unique_together = (("reader_study", "user"),)
+
+
+class DisplaySetStatistics(AnswerStatistics):
+    display_set = models.OneToOneField(
+        DisplaySet, on_delete=models.CASCADE, related_name="statistics"
+    )
+
+
+class QuestionStatistics(AnswerStatistics):
+    question = models.OneToOneField(
+        Question, on_delete=models.CASCADE, related_name="statistics"
+    )
+
+
 class ReaderStudyPermissionRequest(RequestBase):
     """
     When a user wants to read a reader study, editors have the option of
@@ -1,4 +1,5 @@
 from django.core.exceptions import ValidationError
+from django.db.models import prefetch_related_objects
 from django.db.transaction import on_commit
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.fields import (
@@ -13,8 +14,10 @@ from rest_framework.relations import HyperlinkedRelatedField, SlugRelatedField
 from rest_framework.serializers import (
     HyperlinkedModelSerializer,
     ModelSerializer,
+    Serializer,
     SerializerMethodField,
 )
+from rest_framework.settings import api_settings
 
 from grandchallenge.components.schemas import ANSWER_TYPE_SCHEMA
 from grandchallenge.components.serializers import (
@@ -116,12 +119,15 @@ class DisplaySetSerializer(HyperlinkedModelSerializer):
     index = SerializerMethodField()
 
     def get_index(self, obj) -> int | None:
-        if obj.reader_study.shuffle_hanging_list:
-            try:
-                return self.context["view"].randomized_qs.index(obj)
-            except ValueError:
-                # The list is empty if no reader study is specified.
-                return None
+        display_set_index = getattr(
+            self.context.get("view"), "display_set_index", {}
+        )
+
+        if obj.pk in display_set_index:
+            return display_set_index[obj.pk]
+        elif obj.reader_study.shuffle_hanging_list:
+            # The index is only known if a reader study is specified
+            return None
         else:
             return obj.standard_index
 
@@ -299,3 +305,142 @@ class AnswerSerializer(HyperlinkedModelSerializer):
         swagger_schema_fields = {
             "properties": {"answer": {"title": "Answer", **ANSWER_TYPE_SCHEMA}}
         }
+
+
+class AnswerBulkItemSerializer(HyperlinkedModelSerializer):
+    question = HyperlinkedRelatedField(
+        view_name="api:reader-studies-question-detail",
+        queryset=Question.objects.all(),
+    )
+
+    class Meta:
+        model = Answer
+        fields = ("question", "answer", "last_edit_duration")
+        swagger_schema_fields = AnswerSerializer.Meta.swagger_schema_fields
+
+
+class AnswerBulkSerializer(Serializer):
+    display_set = HyperlinkedRelatedField(
+        queryset=DisplaySet.objects.all(),
+        view_name="api:reader-studies-display-set-detail",
+    )
+    answers = AnswerBulkItemSerializer(many=True, allow_empty=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if "request" in self.context:
+            user = self.context["request"].user
+            self.fields["display_set"].queryset = filter_by_permission(
+                queryset=DisplaySet.objects.all(),
+                user=user,
+                codename="view_displayset",
+            )
+
+    def validate(self, attrs):
+        creator = self.context["request"].user
+        display_set = attrs["display_set"]
+        reader_study = display_set.reader_study
+
+        if not creator.has_perm("read_readerstudy", reader_study):
+            raise DRFValidationError(
+                "This user is not a reader for this study."
+            )
+
+        questions = [item["question"] for item in attrs["answers"]]
+        prefetch_related_objects(questions, "options")
+
+        existing_answers = {
+            answer.question_id: answer
+            for answer in Answer.objects.filter(
+                creator=creator,
+                display_set=display_set,
+                question__in=questions,
+                is_ground_truth=False,
+            )
+        }
+
+        answers = []
+        errors = []
+
+        for item in attrs["answers"]:
+            question = item["question"]
+            instance = existing_answers.get(question.pk)
+
+            try:
+                self._validate_answer(
+                    question=question,
+                    answer=item.get("answer"),
+                    instance=instance,
+                    display_set=display_set,
+                    answered_questions={a.question.pk for a in answers},
+                )
+            except ValidationError as e:
+                errors.append({api_settings.NON_FIELD_ERRORS_KEY: e.messages})
+                continue
+
+            errors.append({})
+            answers.append(
+                self._get_answer(
+                    item=item,
+                    instance=instance,
+                    creator=creator,
+                    display_set=display_set,
+                )
+            )
+
+        if any(errors):
+            raise DRFValidationError({"answers": errors})
+
+        return {"display_set": display_set, "answers": answers}
+
+    @staticmethod
+    def _validate_answer(
+        *, question, answer, instance, display_set, answered_questions
+    ):
+        reader_study = display_set.reader_study
+
+        if question.pk in answered_questions:
+            raise ValidationError("This question is answered more than once.")
+
+        if question.reader_study_id != reader_study.pk:
+            raise ValidationError(
+                f"Display set {display_set} does not belong to this reader study."
+            )
+
+        if instance is not None and not reader_study.allow_answer_modification:
+            raise ValidationError(
+                "This reader study does not allow answer modification."
+            )
+
+        Answer.validate_answer_value(question=question, answer=answer)
+
+    @staticmethod
+    def _get_answer(*, item, instance, creator, display_set):
+        last_edit_duration = item.get("last_edit_duration")
+
+        if instance is None:
+            instance = Answer(
+                creator=creator,
+                display_set=display_set,
+                total_edit_duration=last_edit_duration,
+            )
+        elif (
+            instance.total_edit_duration is not None
+            and last_edit_duration is not None
+        ):
+            instance.total_edit_duration += last_edit_duration
+        else:
+            instance.total_edit_duration = None
+
+        instance.question = item["question"]
+        instance.answer = item.get("answer")
+        instance.last_edit_duration = last_edit_duration
+
+        return instance
+
+    def create(self, validated_data):
+        return Answer.bulk_save(
+            creator=self.context["request"].user,
+            display_set=validated_data["display_set"],
+            answers=validated_data["answers"],
+        )
@@ -1,6 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.db.models.signals import (
     m2m_changed,
+    post_delete,
     post_save,
     pre_delete,
     pre_save,
@@ -9,8 +10,11 @@ from django.db.transaction import on_commit
 from django.dispatch import receiver
 
 from grandchallenge.cases.models import Image
-from grandchallenge.reader_studies.models import Answer, DisplaySet
-from grandchallenge.reader_studies.tasks import add_scores_for_display_set
+from grandchallenge.reader_studies.models import Answer, DisplaySet, Question
+from grandchallenge.reader_studies.tasks import (
+    add_scores_for_display_set,
+    update_reader_study_statistics,
+)
 
 
 @receiver(m2m_changed, sender=DisplaySet.values.through)
@@ -27,18 +31,20 @@ def update_permissions_on_display_set_changed(
         if pk_set is None:
             # When using a _clear action, pk_set is None
             # https://docs.djangoproject.com/en/2.2/ref/signals/#m2m-changed
-            images = [
-                civ.image
-                for civ in instance.values.filter(image__isnull=False)
-            ]
+            images = list(
+                Image.objects.filter(
+                    componentinterfacevalue__in=instance.values.all()
+                )
+            )
         else:
             images = Image.objects.filter(
                 componentinterfacevalue__pk__in=pk_set
             )
 
     def update_permissions():
-        for image in images:
-            image.update_viewer_groups_permissions()
+        Image.bulk_update_viewer_groups_permissions(
+            image_pks=[image.pk for image in images]
+        )
 
     on_commit(update_permissions)
 
@@ -46,11 +52,14 @@ def update_permissions_on_display_set_changed(
 @receiver(pre_delete, sender=DisplaySet)
 @receiver(post_save, sender=DisplaySet)
 def update_view_image_permissions(*_, instance: DisplaySet, **__):
-    images = [civ.image for civ in instance.values.filter(image__isnull=False)]
+    images = list(
+        instance.values.filter(image__isnull=False).values_list(
+            "image", flat=True
+        )
+    )
 
     def update_permissions():
-        for image in images:
-            image.update_viewer_groups_permissions()
+        Image.bulk_update_viewer_groups_permissions(image_pks=images)
 
     on_commit(update_permissions)
 
@@ -86,6 +95,16 @@ def set_display_set_order(sender, instance, **_):
     instance.order = instance.reader_study.next_display_set_order
 
 
+@receiver(post_delete, sender=DisplaySet)
+@receiver(post_save, sender=DisplaySet)
+def invalidate_display_set_index(*_, instance: DisplaySet, **__):
+    reader_study = instance.reader_study
+    reader_study.invalidate_display_set_index()
+    # Also invalidate after commit in case the index was rebuilt
+    # concurrently from the state before this transaction
+    on_commit(reader_study.invalidate_display_set_index)
+
+
 @receiver(post_save, sender=Answer)
 def assign_score(sender, instance, created, update_fields=None, **kwargs):
     if update_fields is not None and set(update_fields) == {"score"}:
@@ -106,3 +125,37 @@ def assign_score(sender, instance, created, update_fields=None, **kwargs):
                 }
             )
         )
+
+
+@receiver(pre_delete, sender=Answer)
+def refresh_answer_score(*_, instance: Answer, **__):
+    # Scores are added asynchronously so this instance could be stale
+    instance.refresh_from_db(fields=["score"])
+
+
+@receiver(post_delete, sender=Answer)
+def update_answer_statistics(*_, instance: Answer, **__):
+    instance.update_statistics(
+        answer_delta=-1, previous_score=instance.score, score=None
+    )
+
+
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Question)
+def rebuild_reader_study_statistics(
+    *_, instance: Question, created=True, **__
+):
+    # The number of completed display sets depends on the number of
+    # questions, so the statistics need to be rebuilt if that changes
+    if (
+        created
+        and Answer.objects.filter(
+            question__reader_study_id=instance.reader_study_id,
+            is_ground_truth=False,
+        ).exists()
+    ):
+        on_commit(
+            update_reader_study_statistics.signature(
+                kwargs={"reader_study_pk": str(instance.reader_study_id)}
+            ).apply_async
+        )
@@ -54,6 +54,13 @@ def add_scores_for_display_set(*, instance_pk, ds_pk):
         add_score(instance, ground_truth.answer)
 
 
+@acks_late_2xlarge_task
+@transaction.atomic
+def update_reader_study_statistics(*, reader_study_pk):
+    reader_study = ReaderStudy.objects.get(pk=reader_study_pk)
+    reader_study.rebuild_statistics()
+
+
 @acks_late_2xlarge_task
 def create_display_sets_for_upload_session(
     *, upload_session_pk, reader_study_pk, interface_pk
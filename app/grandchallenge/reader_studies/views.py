@@ -51,6 +51,7 @@ from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.permissions import DjangoObjectPermissions
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.status import HTTP_201_CREATED
 from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet
 from rest_framework_guardian.filters import ObjectPermissionsFilter
 
@@ -74,7 +75,6 @@ from grandchallenge.core.guardian import (
 from grandchallenge.core.renderers import PaginatedCSVRenderer
 from grandchallenge.core.templatetags.random_encode import random_encode
 from grandchallenge.core.utils import strtobool
-from grandchallenge.core.utils.query import set_seed
 from grandchallenge.core.views import PermissionRequestUpdate
 from grandchallenge.datatables.views import Column
 from grandchallenge.groups.forms import EditorsForm
@@ -103,6 +103,7 @@ from grandchallenge.reader_studies.models import (
     ReaderStudyPermissionRequest,
 )
 from grandchallenge.reader_studies.serializers import (
+    AnswerBulkSerializer,
     AnswerSerializer,
     DisplaySetPostSerializer,
     DisplaySetSerializer,
@@ -951,9 +952,7 @@ class DisplaySetViewSet(
     queryset = (
         DisplaySet.objects.all()
         .select_related("reader_study__hanging_protocol")
-        .prefetch_related(
-            "values__image", "values__interface", "reader_study__display_sets"
-        )
+        .prefetch_related("values__image", "values__interface")
     )
     permission_classes = [DjangoObjectPermissions]
     filter_backends = [DjangoFilterBackend, ObjectPermissionsFilter]
@@ -962,7 +961,7 @@ class DisplaySetViewSet(
         *api_settings.DEFAULT_RENDERER_CLASSES,
         PaginatedCSVRenderer,
     )
-    randomized_qs = []
+    display_set_index = {}
 
     @property
     def reader_study(self):
@@ -982,9 +981,10 @@ class DisplaySetViewSet(
         # as we only want to filter out the display sets for a specific
         # reader study.
         reader_study = self.reader_study
-        if reader_study and reader_study.shuffle_hanging_list:
-            queryset = queryset.filter(reader_study=reader_study)
-            queryset = self.create_randomized_qs(queryset=queryset)
+        if reader_study:
+            self.display_set_index = reader_study.get_display_set_index(
+                user=self.request.user
+            )
         unanswered_by_user = strtobool(
             self.request.query_params.get("unanswered_by_user", "False")
         )
@@ -1029,14 +1029,10 @@ class DisplaySetViewSet(
                 )
                 .order_by("order", "created")
             )
-            # Because the filtering has changed the list, we can no longer
-            # reapply .order_by("?"), as the ordering would not be consistent
-            # with the ordering of the full list. Instead, we use the
-            # previously saved randomized_qs and filter the proper items
-            # out of it.
-            if reader_study and reader_study.shuffle_hanging_list:
-                pks = queryset.values_list("pk", flat=True)
-                queryset = [x for x in self.randomized_qs if x.pk in pks]
+
+        if reader_study and reader_study.shuffle_hanging_list:
+            queryset = queryset.filter(reader_study=reader_study)
+            return self._list_in_index_order(queryset=queryset)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -1046,24 +1042,35 @@ class DisplaySetViewSet(
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    def _list_in_index_order(self, *, queryset):
+        # Only the pks are sorted and paginated so that just the display
+        # sets on the requested page are fetched
+        pks = sorted(
+            queryset.values_list("pk", flat=True),
+            key=lambda pk: self.display_set_index.get(pk, float("inf")),
+        )
+
+        page = self.paginate_queryset(pks)
+        if page is not None:
+            pks = page
+
+        display_sets = queryset.in_bulk(pks)
+        serializer = self.get_serializer(
+            [display_sets[pk] for pk in pks], many=True
+        )
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+
+        return Response(serializer.data)
+
     def get_object(self):
         obj = super().get_object()
-        # retrieve the full queryset and save its shuffled version to later
-        # determine the shuffled index for this object
-        if obj.reader_study.shuffle_hanging_list:
-            queryset = self.get_queryset()
-            queryset = super().filter_queryset(queryset)
-            queryset = queryset.filter(reader_study=obj.reader_study)
-            self.create_randomized_qs(queryset=queryset)
+        self.display_set_index = obj.reader_study.get_display_set_index(
+            user=self.request.user
+        )
         return obj
 
-    def create_randomized_qs(self, queryset):
-        set_seed(1 / int(self.request.user.pk))
-        queryset = queryset.order_by("?")
-        # Save the queryset to determine each item's index in the serializer
-        self.randomized_qs = list(queryset)
-        return queryset
-
 
 class QuestionViewSet(ReadOnlyModelViewSet):
     serializer_class = QuestionSerializer
@@ -1121,6 +1128,32 @@ class AnswerViewSet(
 
         serializer.save(total_edit_duration=total_edit_duration)
 
+    @extend_schema(
+        request=AnswerBulkSerializer,
+        responses={201: AnswerSerializer(many=True)},
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        serializer_class=AnswerBulkSerializer,
+    )
+    def bulk(self, request):
+        """
+        An endpoint that creates or updates the answers of the current user
+        for a display set. Either all answers are saved, or none are and the
+        errors are reported per answer.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        answers = serializer.save()
+
+        return Response(
+            AnswerSerializer(
+                answers, many=True, context=self.get_serializer_context()
+            ).data,
+            status=HTTP_201_CREATED,
+        )
+
     @action(detail=False)
     def mine(self, request):
         """
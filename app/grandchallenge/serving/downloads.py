@@ -0,0 +1,88 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django_redis import get_redis_connection
+from guardian.utils import get_anonymous_user
+
+from grandchallenge.serving.models import Download
+
+
+class DownloadBuffer:
+    """
+    Buffers the creation of downloads in a redis list
+
+    Workstations request many files per session, so rather than inserting
+    a row for every request the downloads are appended to a list which is
+    periodically written to the database in batches.
+    """
+
+    key = "grandchallenge.serving.download_buffer"
+
+    @property
+    def _connection(self):
+        return get_redis_connection("default")
+
+    def append(self, **kwargs):
+        """
+        Add a download to the buffer
+
+        The kwargs are the attnames of the download fields. If creator_id is
+        None the anonymous user is used when the buffer is flushed.
+        """
+        self._connection.rpush(
+            self.key, json.dumps(kwargs, cls=DjangoJSONEncoder)
+        )
+
+    def flush(self):
+        """Writes all of the buffered downloads to the database"""
+        connection = self._connection
+        batch_size = settings.SERVING_DOWNLOAD_BUFFER_BATCH_SIZE
+
+        while entries := connection.lrange(self.key, 0, batch_size - 1):
+            with transaction.atomic():
+                Download.objects.bulk_create(
+                    self._get_downloads(entries=entries)
+                )
+
+            # Only remove the entries once they have been stored, new
+            # entries are added to the end of the list
+            connection.ltrim(self.key, len(entries), -1)
+
+    @staticmethod
+    def _get_downloads(*, entries):
+        entries = [json.loads(entry) for entry in entries]
+        anonymous_user_pk = get_anonymous_user().pk
+
+        for entry in entries:
+            if entry.get("creator_id") is None:
+                entry["creator_id"] = anonymous_user_pk
+
+        # The objects could have been deleted since they were downloaded
+        for field in Download._meta.concrete_fields:
+            if not field.is_relation:
+                continue
+
+            pks = {
+                entry[field.attname]
+                for entry in entries
+                if entry.get(field.attname) is not None
+            }
+            existing_pks = {
+                str(pk)
+                for pk in field.related_model.objects.filter(
+                    pk__in=pks
+                ).values_list("pk", flat=True)
+            }
+            entries = [
+                entry
+                for entry in entries
+                if entry.get(field.attname) is None
+                or str(entry[field.attname]) in existing_pks
+            ]
+
+        return [Download(**entry) for entry in entries]
+
+
+download_buffer = DownloadBuffer()
@@ -0,0 +1,15 @@
+from billiard.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
+from redis.exceptions import LockError
+
+from grandchallenge.core.celery import acks_late_micro_short_task
+from grandchallenge.serving.downloads import download_buffer
+
+
+@acks_late_micro_short_task(
+    ignore_result=True,
+    singleton=True,
+    # No need to retry here as the periodic task call this again
+    ignore_errors=(LockError, SoftTimeLimitExceeded, TimeLimitExceeded),
+)
+def flush_download_buffer():
+    download_buffer.flush()
@@ -1,6 +1,8 @@
 import posixpath
+from hashlib import sha256
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import MultipleObjectsReturned, PermissionDenied
 from django.http import Http404, HttpResponseRedirect
 from django.utils._os import safe_join
@@ -14,6 +16,7 @@ from grandchallenge.challenges.models import ChallengeRequest
 from grandchallenge.components.models import ComponentInterfaceValue
 from grandchallenge.core.storage import internal_protected_s3_storage
 from grandchallenge.evaluation.models import Submission
+from grandchallenge.serving.downloads import download_buffer
 from grandchallenge.serving.models import (
     Download,
     get_component_interface_values_for_user,
@@ -24,20 +27,47 @@ from grandchallenge.workstations.models import Feedback
 def protected_storage_redirect(*, name, **kwargs):
     _create_download(**kwargs)
 
+    url = _get_protected_storage_url(name=name)
+
+    if url is None:
+        raise Http404("File not found.")
+
+    return HttpResponseRedirect(url)
+
+
+def _get_protected_storage_url(*, name):
+    """
+    Get a signed url for the file, or None if the file does not exist
+
+    The urls are cached for half of their lifetime so that the existence
+    of the file does not need to be checked for every request.
+    """
+    cache_key = (
+        f"serving.protected_storage_url."
+        f"{settings.PROTECTED_S3_STORAGE_USE_CLOUDFRONT}."
+        f"{sha256(name.encode('utf-8')).hexdigest()}"
+    )
+
+    url = cache.get(cache_key)
+
+    if url is not None:
+        return url
+
     # Get the storage with the internal redirect and auth. This will prepend
     # settings.AWS_S3_ENDPOINT_URL to the url
     if not internal_protected_s3_storage.exists(name=name):
-        raise Http404("File not found.")
+        return None
 
     if settings.PROTECTED_S3_STORAGE_USE_CLOUDFRONT:
-        response = HttpResponseRedirect(
-            internal_protected_s3_storage.cloudfront_signed_url(name=name)
-        )
+        url = internal_protected_s3_storage.cloudfront_signed_url(name=name)
+        expiry_seconds = settings.CLOUDFRONT_URL_EXPIRY_SECONDS
     else:
         url = internal_protected_s3_storage.url(name=name)
-        response = HttpResponseRedirect(url)
+        expiry_seconds = internal_protected_s3_storage.querystring_expire
+
+    cache.set(cache_key, url, timeout=expiry_seconds // 2)
 
-    return response
+    return url
 
 
 def _create_download(
@@ -51,9 +81,6 @@ def _create_download(
     algorithm_model=None,
     algorithm_image=None,
 ):
-    if creator.is_anonymous:
-        creator = get_anonymous_user()
-
     kwargs = {"creator": creator}
 
     if image is not None:
@@ -82,7 +109,20 @@ def _create_download(
             "creator and only one other foreign key must be set"
         )
 
-    Download.objects.create(**kwargs)
+    _store_download(**kwargs)
+
+
+def _store_download(**kwargs):
+    if settings.SERVING_BUFFER_DOWNLOADS:
+        # The anonymous user is looked up when the buffer is flushed
+        download_buffer.append(
+            **{f"{key}_id": value.pk for key, value in kwargs.items()}
+        )
+    else:
+        if kwargs["creator"].is_anonymous:
+            kwargs["creator"] = get_anonymous_user()
+
+        Download.objects.create(**kwargs)
 
 
 def serve_images(request, *, pk, path, pa="", pb=""):
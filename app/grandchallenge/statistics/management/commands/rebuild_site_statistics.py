@@ -0,0 +1,12 @@
+from django.core.management import BaseCommand
+
+from grandchallenge.statistics.tasks import update_site_statistics_cache
+
+
+class Command(BaseCommand):
+    help = "Recalculate the site statistics for all months"
+
+    def handle(self, *args, **options):
+        update_site_statistics_cache.apply_async(kwargs={"rebuild": True})
+
+        self.stdout.write("Site statistics rebuild task scheduled")
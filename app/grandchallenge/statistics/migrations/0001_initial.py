@@ -0,0 +1,43 @@
+# Generated by Django 4.2.17 on 2025-01-28 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyStatistics",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="The name of the statistics", max_length=32
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                (
+                    "data",
+                    models.JSONField(
+                        help_text="The aggregated values for this month, durations in seconds"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("name", "year", "month")},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class MonthlyStatistics(models.Model):
+    """The site statistics of the objects that were created in one month"""
+
+    name = models.CharField(
+        max_length=32, help_text="The name of the statistics"
+    )
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    data = models.JSONField(
+        help_text="The aggregated values for this month, durations in seconds"
+    )
+
+    class Meta:
+        unique_together = ("name", "year", "month")
+
+    def __str__(self):
+        return f"{self.name} {self.year}-{self.month:02}"
@@ -1,8 +1,13 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.core.cache import cache
-from django.db.models import Count, Sum
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 
 from grandchallenge.algorithms.models import Algorithm, Job
 from grandchallenge.archives.models import Archive
@@ -11,24 +16,35 @@ from grandchallenge.challenges.models import Challenge
 from grandchallenge.core.celery import acks_late_micro_short_task
 from grandchallenge.evaluation.models import Submission
 from grandchallenge.reader_studies.models import Answer, ReaderStudy
+from grandchallenge.statistics.models import MonthlyStatistics
 from grandchallenge.workstations.models import Session
 
+DURATION_KEYS = ("duration_sum",)
+
 
 @acks_late_micro_short_task
-def update_site_statistics_cache():
+def update_site_statistics_cache(*, rebuild=False):
+    """
+    Updates the site statistics in the cache
+
+    The per month statistics are kept in MonthlyStatistics, only the
+    current and previous months are recalculated unless a rebuild
+    is requested, or there are no statistics yet.
+    """
+    if rebuild or not MonthlyStatistics.objects.exists():
+        update_monthly_statistics(since=None)
+    else:
+        update_monthly_statistics(
+            since=timezone.localtime().replace(
+                day=1, hour=0, minute=0, second=0, microsecond=0
+            )
+            - relativedelta(months=1)
+        )
+
     public_challenges = Challenge.objects.filter(hidden=False)
 
     stats = {
-        "users": (
-            get_user_model()
-            .objects.filter(is_active=True, last_login__isnull=False)
-            .values(
-                "date_joined__year",
-                "date_joined__month",
-            )
-            .annotate(object_count=Count("date_joined__month"))
-            .order_by("date_joined__year", "date_joined__month")
-        ),
+        **get_monthly_statistics(),
         "countries": (
             get_user_model()
             .objects.exclude(user_profile__country="")
@@ -37,15 +53,60 @@ def update_site_statistics_cache():
             .order_by("-country_count")
             .values_list("user_profile__country", "country_count")
         ),
-        "challenges": (
-            Challenge.objects.values(
-                "hidden", "created__year", "created__month"
+        "most_popular_challenge_group": (
+            Group.objects.filter(
+                participants_of_challenge__in=public_challenges
+            )
+            .annotate(num_users=Count("user"))
+            .order_by("-num_users")
+            .first()
+        ),
+        "most_popular_challenge_submissions": (
+            public_challenges.annotate(
+                num_submissions=Count("phase__submission")
+            )
+            .order_by("-num_submissions")
+            .only("pk")
+            .first()
+        ),
+    }
+
+    cache.set(settings.STATISTICS_SITE_CACHE_KEY, stats, timeout=None)
+
+
+def _get_monthly_querysets(*, since):
+    """The querysets for the statistics of each month from since onwards"""
+
+    def created_since(queryset, field="created"):
+        if since is None:
+            return queryset
+        else:
+            return queryset.filter(**{f"{field}__gte": since})
+
+    return {
+        "users": (
+            created_since(
+                get_user_model().objects.filter(
+                    is_active=True, last_login__isnull=False
+                ),
+                field="date_joined",
+            )
+            .values(
+                "date_joined__year",
+                "date_joined__month",
             )
+            .annotate(object_count=Count("date_joined__month"))
+            .order_by("date_joined__year", "date_joined__month")
+        ),
+        "challenges": (
+            created_since(Challenge.objects.all())
+            .values("hidden", "created__year", "created__month")
             .annotate(object_count=Count("hidden"))
             .order_by("created__year", "created__month", "hidden")
         ),
         "submissions": (
-            Submission.objects.values(
+            created_since(Submission.objects.all())
+            .values(
                 "phase__submission_kind", "created__year", "created__month"
             )
             .annotate(object_count=Count("phase__submission_kind"))
@@ -54,14 +115,13 @@ def update_site_statistics_cache():
             )
         ),
         "algorithms": (
-            Algorithm.objects.values(
-                "public", "created__year", "created__month"
-            )
+            created_since(Algorithm.objects.all())
+            .values("public", "created__year", "created__month")
             .annotate(object_count=Count("public"))
             .order_by("created__year", "created__month", "public")
         ),
         "jobs": (
-            Job.objects.with_duration()
+            created_since(Job.objects.with_duration())
             .values("created__year", "created__month")
             .annotate(
                 object_count=Count("created__month"),
@@ -70,51 +130,102 @@ def update_site_statistics_cache():
             .order_by("created__year", "created__month", "duration_sum")
         ),
         "archives": (
-            Archive.objects.values("public", "created__year", "created__month")
+            created_since(Archive.objects.all())
+            .values("public", "created__year", "created__month")
             .annotate(object_count=Count("public"))
             .order_by("created__year", "created__month", "public")
         ),
         "images": (
-            Image.objects.values("created__year", "created__month")
+            created_since(Image.objects.all())
+            .values("created__year", "created__month")
             .annotate(object_count=Count("created__month"))
             .order_by("created__year", "created__month")
         ),
         "reader_studies": (
-            ReaderStudy.objects.values(
-                "public", "created__year", "created__month"
-            )
+            created_since(ReaderStudy.objects.all())
+            .values("public", "created__year", "created__month")
             .annotate(object_count=Count("public"))
             .order_by("created__year", "created__month", "public")
         ),
         "answers": (
-            Answer.objects.values("created__year", "created__month")
+            created_since(Answer.objects.all())
+            .values("created__year", "created__month")
             .annotate(object_count=Count("created__month"))
             .order_by("created__year", "created__month")
         ),
         "sessions": (
-            Session.objects.values("created__year", "created__month")
+            created_since(Session.objects.all())
+            .values("created__year", "created__month")
             .annotate(
                 duration_sum=Sum("maximum_duration"),
                 object_count=Count("created__month"),
             )
             .order_by("created__year", "created__month")
         ),
-        "most_popular_challenge_group": (
-            Group.objects.filter(
-                participants_of_challenge__in=public_challenges
+    }
+
+
+def update_monthly_statistics(*, since):
+    """Replaces the monthly statistics from since onwards, or all if None"""
+    for name, queryset in _get_monthly_querysets(since=since).items():
+        data = {}
+
+        for datum in queryset:
+            data.setdefault(_get_month(datum=datum), []).append(
+                {
+                    k: (
+                        v.total_seconds()
+                        if k in DURATION_KEYS and v is not None
+                        else v
+                    )
+                    for k, v in datum.items()
+                }
             )
-            .annotate(num_users=Count("user"))
-            .order_by("-num_users")
-            .first()
-        ),
-        "most_popular_challenge_submissions": (
-            public_challenges.annotate(
-                num_submissions=Count("phase__submission")
+
+        existing = MonthlyStatistics.objects.filter(name=name)
+
+        if since is not None:
+            existing = existing.filter(
+                Q(year__gt=since.year)
+                | Q(year=since.year, month__gte=since.month)
             )
-            .order_by("-num_submissions")
-            .only("pk")
-            .first()
-        ),
-    }
 
-    cache.set(settings.STATISTICS_SITE_CACHE_KEY, stats, timeout=None)
+        with transaction.atomic():
+            existing.delete()
+            MonthlyStatistics.objects.bulk_create(
+                [
+                    MonthlyStatistics(
+                        name=name, year=year, month=month, data=month_data
+                    )
+                    for (year, month), month_data in data.items()
+                ]
+            )
+
+
+def _get_month(*, datum):
+    """The year and month that the datum was aggregated over"""
+    return tuple(
+        next(v for k, v in datum.items() if k.endswith(suffix))
+        for suffix in ("__year", "__month")
+    )
+
+
+def get_monthly_statistics():
+    stats = {name: [] for name in _get_monthly_querysets(since=None)}
+
+    for monthly_statistics in MonthlyStatistics.objects.filter(
+        name__in=stats.keys()
+    ).order_by("year", "month"):
+        stats[monthly_statistics.name].extend(
+            {
+                k: (
+                    timedelta(seconds=v)
+                    if k in DURATION_KEYS and v is not None
+                    else v
+                )
+                for k, v in datum.items()
+            }
+            for datum in monthly_statistics.data
+        )
+
+    return stats
@@ -4,6 +4,7 @@ import re
 from django.conf import settings
 from django.shortcuts import get_object_or_404, redirect
 
+from grandchallenge.challenges.cache import challenge_subdomain_cache
 from grandchallenge.challenges.models import Challenge
 from grandchallenge.subdomains.utils import reverse
 
@@ -44,13 +45,21 @@ def challenge_subdomain_middleware(get_response):
         if subdomain in [*settings.WORKSTATIONS_RENDERING_SUBDOMAINS, None]:
             request.challenge = None
         else:
-            request.challenge = get_object_or_404(
-                Challenge.objects.with_available_compute()
-                .select_related("forum")
-                .prefetch_related("phase_set"),
-                short_name__iexact=subdomain,
+            request.challenge = challenge_subdomain_cache.get(
+                short_name=subdomain
             )
 
+            if request.challenge is None:
+                request.challenge = get_object_or_404(
+                    Challenge.objects.with_available_compute()
+                    .select_related("forum")
+                    .prefetch_related("phase_set"),
+                    short_name__iexact=subdomain,
+                )
+                challenge_subdomain_cache.set(
+                    short_name=subdomain, challenge=request.challenge
+                )
+
             if request.challenge.is_suspended:
                 return redirect(reverse("challenge-suspended"))
 
@@ -2,6 +2,7 @@ import json
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
@@ -12,7 +13,9 @@ from django.utils.timezone import now
 
 from grandchallenge.algorithms.models import (
     Algorithm,
+    AlgorithmImage,
     AlgorithmUserCredit,
+    AlgorithmUserCreditUsage,
     Job,
 )
 from grandchallenge.components.models import (
@@ -1379,3 +1382,60 @@ class TestAlgorithmImageCredits:
             algorithm_image.get_remaining_non_complimentary_jobs(user=user)
             == 5
         )
+
+
+@pytest.mark.django_db
+def test_credit_usage_ledger(settings):
+    settings.ALGORITHMS_GENERAL_CREDITS_PER_MONTH_PER_USER = 1000
+
+    user = UserFactory()
+    algorithm_image = AlgorithmImageFactory(
+        is_manifest_valid=True,
+        is_in_registry=True,
+        is_desired_version=True,
+        algorithm__minimum_credits_per_job=200,
+    )
+
+    job = AlgorithmJobFactory(
+        creator=user, algorithm_image=algorithm_image, time_limit=60
+    )
+
+    usage = AlgorithmUserCreditUsage.objects.get()
+    assert usage.user == user
+    assert usage.algorithm == algorithm_image.algorithm
+    assert usage.date == now().date()
+    assert usage.credits_consumed == 200
+    assert AlgorithmImage.get_remaining_general_credits(user=user) == 800
+
+    job.credits_consumed = 300
+    job.save()
+
+    usage.refresh_from_db()
+    assert usage.credits_consumed == 300
+    assert AlgorithmImage.get_remaining_general_credits(user=user) == 700
+
+    # Status updates from other instances do not change the ledger
+    job = Job.objects.get(pk=job.pk)
+    job.status = Job.SUCCESS
+    job.save()
+
+    usage.refresh_from_db()
+    assert usage.credits_consumed == 300
+
+    # Jobs from before the window are no longer counted
+    job.created = now() - timedelta(days=40)
+    job.save()
+
+    usage.refresh_from_db()
+    assert usage.credits_consumed == 0
+    old_usage = AlgorithmUserCreditUsage.objects.get(
+        date=(now() - timedelta(days=40)).date()
+    )
+    assert old_usage.credits_consumed == 300
+    assert AlgorithmImage.get_remaining_general_credits(user=user) == 1000
+
+    # Jobs from the first day of the window are counted from their creation time
+    job.created = now() - relativedelta(months=1) + timedelta(minutes=1)
+    job.save()
+
+    assert AlgorithmImage.get_remaining_general_credits(user=user) == 700
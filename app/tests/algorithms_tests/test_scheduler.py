@@ -0,0 +1,358 @@
+from uuid import uuid4
+
+import pytest
+from celery import signature
+from django_redis import get_redis_connection
+
+from grandchallenge.algorithms import tasks
+from grandchallenge.algorithms.models import Job
+from grandchallenge.algorithms.scheduler import JobScheduler
+from grandchallenge.algorithms.tasks import (
+    create_algorithm_jobs,
+    create_algorithm_jobs_for_archive,
+)
+from grandchallenge.components.models import ComponentInterface
+from tests.algorithms_tests.factories import AlgorithmImageFactory
+from tests.archives_tests.factories import ArchiveFactory, ArchiveItemFactory
+from tests.components_tests.factories import ComponentInterfaceValueFactory
+from tests.factories import ImageFactory
+
+
+@pytest.fixture
+def scheduler_settings(settings):
+    settings.ALGORITHMS_MAX_ACTIVE_JOBS = 10
+    settings.ALGORITHMS_MAX_ACTIVE_JOBS_PER_RESOURCE_CLASS = {"A10G": 2}
+    settings.ALGORITHMS_JOB_SCHEDULER_HIGH_MEMORY_GB = 16
+    settings.ALGORITHMS_JOB_SCHEDULER_TENANT_WEIGHTS = {
+        "user": 4,
+        "challenge": 2,
+        "archive": 1,
+    }
+    return settings
+
+
+@pytest.fixture
+def job_scheduler(scheduler_settings, monkeypatch):
+    """An enabled scheduler whose keys are isolated from other tests"""
+    scheduler_settings.ALGORITHMS_JOB_SCHEDULER_ENABLED = True
+    scheduler = JobScheduler(prefix=f"test.job_scheduler.{uuid4()}")
+    monkeypatch.setattr(tasks, "job_scheduler", scheduler)
+
+    yield scheduler
+
+    connection = get_redis_connection("default")
+    keys = connection.keys(f"{scheduler.prefix}.*")
+    if keys:
+        connection.delete(*keys)
+
+
+@pytest.mark.parametrize(
+    "requires_gpu_type,requires_memory_gb,expected",
+    (
+        ("", 4, "CPU"),
+        ("", 32, "CPU-highmem"),
+        ("A10G", 16, "A10G"),
+        ("A10G", 17, "A10G-highmem"),
+    ),
+)
+def test_resource_class(
+    scheduler_settings, requires_gpu_type, requires_memory_gb, expected
+):
+    assert (
+        JobScheduler.get_resource_class(
+            requires_gpu_type=requires_gpu_type,
+            requires_memory_gb=requires_memory_gb,
+        )
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "tenant,resource_class,num_jobs,active,resources,waiting,expected",
+    (
+        # Nothing else is running
+        ("user:1", "CPU", 4, {}, {}, set(), (4, "Admitted")),
+        # Limited by the global capacity
+        (
+            "user:1",
+            "CPU",
+            4,
+            {"archive:1": 8},
+            {"CPU": 8},
+            set(),
+            (2, "Admitted"),
+        ),
+        (
+            "user:1",
+            "CPU",
+            4,
+            {"archive:1": 10},
+            {"CPU": 10},
+            set(),
+            (0, "No capacity for CPU jobs"),
+        ),
+        # Limited by the resource class capacity
+        (
+            "user:1",
+            "A10G",
+            4,
+            {"archive:1": 1},
+            {"A10G": 1},
+            set(),
+            (1, "Admitted"),
+        ),
+        (
+            "user:1",
+            "A10G",
+            4,
+            {"archive:1": 2},
+            {"A10G": 2},
+            set(),
+            (0, "No capacity for A10G jobs"),
+        ),
+        # Without others waiting a tenant can use all of the capacity
+        (
+            "archive:1",
+            "CPU",
+            9,
+            {"archive:1": 1},
+            {"CPU": 1},
+            set(),
+            (9, "Admitted"),
+        ),
+        # With others waiting a tenant is limited to its weighted share
+        ("archive:1", "CPU", 9, {}, {}, {"user:1"}, (2, "Admitted")),
+        ("user:1", "CPU", 9, {}, {}, {"archive:1"}, (8, "Admitted")),
+        (
+            "archive:1",
+            "CPU",
+            9,
+            {"archive:1": 2},
+            {"CPU": 2},
+            {"user:1"},
+            (0, "Fair share used"),
+        ),
+        # Every tenant gets at least one job
+        (
+            "archive:1",
+            "CPU",
+            1,
+            {"user:1": 4, "user:2": 4},
+            {"CPU": 8},
+            {"user:1", "user:2"},
+            (1, "Admitted"),
+        ),
+    ),
+)
+def test_get_admissible(
+    scheduler_settings,
+    tenant,
+    resource_class,
+    num_jobs,
+    active,
+    resources,
+    waiting,
+    expected,
+):
+    assert (
+        JobScheduler.get_admissible(
+            tenant=tenant,
+            resource_class=resource_class,
+            num_jobs=num_jobs,
+            active=active,
+            resources=resources,
+            waiting=waiting,
+        )
+        == expected
+    )
+
+
+def test_scheduler_disabled(settings):
+    settings.ALGORITHMS_JOB_SCHEDULER_ENABLED = False
+
+    assert (
+        JobScheduler().admit(
+            tenant="user:1",
+            requires_gpu_type="",
+            requires_memory_gb=4,
+            num_jobs=3,
+        )
+        == 3
+    )
+
+
+def test_admit_assign_release(job_scheduler):
+    kwargs = {
+        "tenant": "user:1",
+        "requires_gpu_type": "",
+        "requires_memory_gb": 4,
+    }
+
+    assert job_scheduler.admit(**kwargs, num_jobs=4) == 4
+    assert job_scheduler.get_status()["active"] == {"user:1": 4}
+
+    # Only 3 jobs were created, so one reservation is returned
+    job_pks = [uuid4() for _ in range(3)]
+    job_scheduler.assign(**kwargs, job_pks=job_pks, reserved=4)
+
+    status = job_scheduler.get_status()
+    assert status["active"] == {"user:1": 3}
+    assert status["resources"] == {"CPU": 3}
+
+    job_scheduler.release(job_pk=job_pks[0])
+    # Releasing twice does nothing
+    job_scheduler.release(job_pk=job_pks[0])
+
+    status = job_scheduler.get_status()
+    assert status["active"] == {"user:1": 2}
+    assert status["resources"] == {"CPU": 2}
+
+    # The remaining capacity is limited
+    assert job_scheduler.admit(**kwargs, num_jobs=20) == 8
+    assert [
+        d["admitted"] for d in job_scheduler.get_status()["decisions"]
+    ] == [8, 4]
+
+
+def test_wait_and_start_waiting(job_scheduler, mocker):
+    kwargs = {
+        "tenant": "user:1",
+        "requires_gpu_type": "",
+        "requires_memory_gb": 4,
+    }
+    job_pks = [uuid4() for _ in range(10)]
+
+    assert job_scheduler.admit(**kwargs, num_jobs=10) == 10
+    job_scheduler.assign(**kwargs, job_pks=job_pks, reserved=10)
+
+    # UUIDs are serialized as celery would
+    task = create_algorithm_jobs_for_archive.signature(
+        kwargs={"archive_pks": [uuid4()], "archive_item_pks": [uuid4()]}
+    )
+    job_scheduler.wait(tenant="archive:1", task=task)
+    # Waiting again does not add the task twice
+    job_scheduler.wait(tenant="archive:1", task=task)
+
+    assert job_scheduler.get_status()["waiting"] == {"archive:1": 1}
+
+    started = mocker.patch("grandchallenge.algorithms.scheduler.signature")
+
+    job_scheduler.release(job_pk=job_pks[0])
+
+    assert job_scheduler.get_status()["waiting"] == {}
+    started.assert_called_once()
+    assert signature(started.call_args.args[0]) == task
+    started.return_value.apply_async.assert_called_once()
+
+
+def test_reconcile(job_scheduler):
+    kwargs = {
+        "tenant": "user:1",
+        "requires_gpu_type": "",
+        "requires_memory_gb": 4,
+    }
+    job_pks = [uuid4() for _ in range(3)]
+
+    assert job_scheduler.admit(**kwargs, num_jobs=5) == 5
+    job_scheduler.assign(**kwargs, job_pks=job_pks, reserved=5)
+
+    # One assigned job finished without being released, another job was
+    # not created through the scheduler
+    unscheduled_pk = uuid4()
+    job_scheduler.reconcile(
+        active_jobs=[
+            (job_pks[0], "", 4),
+            (job_pks[1], "", 4),
+            (unscheduled_pk, "A10G", 4),
+        ]
+    )
+
+    status = job_scheduler.get_status()
+    assert status["active"] == {"user:1": 2, "unscheduled": 1}
+    assert status["resources"] == {"CPU": 2, "A10G": 1}
+
+    job_scheduler.release(job_pk=unscheduled_pk)
+
+    status = job_scheduler.get_status()
+    assert status["active"] == {"user:1": 2}
+    assert status["resources"] == {"CPU": 2}
+
+
+@pytest.mark.django_db
+def test_create_algorithm_jobs_assigns_on_commit(
+    job_scheduler, django_capture_on_commit_callbacks
+):
+    ai = AlgorithmImageFactory()
+    interface = ComponentInterface.objects.get(slug="generic-medical-image")
+    ai.algorithm.inputs.set([interface])
+    civ = ComponentInterfaceValueFactory(
+        image=ImageFactory(), interface=interface
+    )
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        jobs = create_algorithm_jobs(
+            algorithm_image=ai,
+            civ_sets=[{civ}],
+            time_limit=ai.algorithm.time_limit,
+            requires_gpu_type=ai.algorithm.job_requires_gpu_type,
+            requires_memory_gb=ai.algorithm.job_requires_memory_gb,
+            tenant="user:1",
+        )
+
+    # The capacity is reserved, but only assigned once committed
+    assert job_scheduler.get_status()["active"] == {"user:1": 1}
+    job_scheduler.release(job_pk=jobs[0].pk)
+    assert job_scheduler.get_status()["active"] == {"user:1": 1}
+
+    callbacks[-1]()
+    job_scheduler.release(job_pk=jobs[0].pk)
+    assert job_scheduler.get_status()["active"] == {}
+
+
+@pytest.mark.django_db
+def test_archive_jobs_wait_for_capacity(
+    job_scheduler, django_capture_on_commit_callbacks
+):
+    ai = AlgorithmImageFactory(
+        is_manifest_valid=True, is_in_registry=True, is_desired_version=True
+    )
+    archive = ArchiveFactory()
+    interface = ComponentInterface.objects.get(slug="generic-medical-image")
+    civ = ComponentInterfaceValueFactory(
+        image=ImageFactory(), interface=interface
+    )
+    archive_item = ArchiveItemFactory(archive=archive)
+
+    with django_capture_on_commit_callbacks():
+        archive_item.values.add(civ)
+        archive.algorithms.set([ai.algorithm])
+
+    # Use up all of the capacity
+    assert (
+        job_scheduler.admit(
+            tenant="user:1",
+            requires_gpu_type="",
+            requires_memory_gb=4,
+            num_jobs=10,
+        )
+        == 10
+    )
+
+    # The pks are UUIDs when sent from the archive signals
+    create_algorithm_jobs_for_archive(
+        archive_pks=[archive.pk], archive_item_pks=[archive_item.pk]
+    )
+
+    assert not Job.objects.exists()
+    assert job_scheduler.get_status()["waiting"] == {
+        f"archive:{archive.pk}": 1
+    }
+
+    task = signature(
+        job_scheduler._pop_waiting(tenant=f"archive:{archive.pk}")
+    )
+    assert task.kwargs == {
+        "archive_pks": [str(archive.pk)],
+        "archive_item_pks": [str(archive_item.pk)],
+        "algorithm_pks": None,
+    }
@@ -6,6 +6,7 @@ from actstream.models import Follow
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.files.base import ContentFile
 
+from grandchallenge.algorithms.exceptions import TooManyJobsScheduled
 from grandchallenge.algorithms.models import Job
 from grandchallenge.algorithms.tasks import (
     create_algorithm_jobs,
@@ -36,6 +37,7 @@ from tests.components_tests.factories import (
     ComponentInterfaceFactory,
     ComponentInterfaceValueFactory,
 )
+from tests.evaluation_tests.test_permissions import get_groups_with_set_perms
 from tests.factories import (
     GroupFactory,
     ImageFactory,
@@ -148,6 +150,85 @@ class TestCreateAlgorithmJobs:
         for g in groups:
             assert jobs[0].viewer_groups.filter(pk=g.pk).exists()
 
+    def test_batch_limit(self, settings):
+        settings.ALGORITHMS_JOB_BATCH_LIMIT = 2
+
+        ai = AlgorithmImageFactory()
+        ai.algorithm.inputs.set([self.default_input_interface])
+        civ_sets = [
+            {
+                ComponentInterfaceValueFactory(
+                    interface=self.default_input_interface
+                )
+            }
+            for _ in range(3)
+        ]
+
+        with pytest.raises(TooManyJobsScheduled):
+            create_algorithm_jobs(
+                algorithm_image=ai,
+                civ_sets=civ_sets,
+                time_limit=ai.algorithm.time_limit,
+                requires_gpu_type=ai.algorithm.job_requires_gpu_type,
+                requires_memory_gb=ai.algorithm.job_requires_memory_gb,
+            )
+
+        assert Job.objects.count() == 2
+
+        jobs = create_algorithm_jobs(
+            algorithm_image=ai,
+            civ_sets=civ_sets,
+            time_limit=ai.algorithm.time_limit,
+            requires_gpu_type=ai.algorithm.job_requires_gpu_type,
+            requires_memory_gb=ai.algorithm.job_requires_memory_gb,
+        )
+
+        assert len(jobs) == 1
+        assert Job.objects.count() == 3
+        assert {frozenset(j.inputs.all()) for j in Job.objects.all()} == {
+            frozenset(civ_set) for civ_set in civ_sets
+        }
+
+    def test_permissions(self):
+        ai = AlgorithmImageFactory()
+        ai.algorithm.inputs.set([self.default_input_interface])
+        images = ImageFactory.create_batch(2)
+        civ_sets = [
+            {
+                ComponentInterfaceValueFactory(
+                    image=image, interface=self.default_input_interface
+                )
+            }
+            for image in images
+        ]
+        viewer_group, logs_viewer_group = GroupFactory(), GroupFactory()
+
+        jobs = create_algorithm_jobs(
+            algorithm_image=ai,
+            civ_sets=civ_sets,
+            extra_viewer_groups=[viewer_group],
+            extra_logs_viewer_groups=[logs_viewer_group],
+            time_limit=ai.algorithm.time_limit,
+            requires_gpu_type=ai.algorithm.job_requires_gpu_type,
+            requires_memory_gb=ai.algorithm.job_requires_memory_gb,
+        )
+
+        assert len(jobs) == 2
+
+        for job, image in zip(jobs, images, strict=True):
+            job.refresh_from_db()
+
+            assert job.credits_consumed > 0
+            assert get_groups_with_set_perms(job) == {
+                job.viewers: {"view_job"},
+                viewer_group: {"view_job"},
+                logs_viewer_group: {"view_logs"},
+            }
+            assert get_groups_with_set_perms(image) == {
+                job.viewers: {"view_image"},
+                viewer_group: {"view_image"},
+            }
+
 
 @pytest.mark.django_db
 def test_no_jobs_workflow(django_capture_on_commit_callbacks):
@@ -180,7 +261,8 @@ def test_jobs_workflow(django_capture_on_commit_callbacks):
             requires_gpu_type=ai.algorithm.job_requires_gpu_type,
             requires_memory_gb=ai.algorithm.job_requires_memory_gb,
         )
-    assert len(callbacks) == 2
+    # All of the jobs are scheduled in one group
+    assert len(callbacks) == 1
 
 
 @pytest.mark.flaky(reruns=3)
@@ -613,6 +613,33 @@ class TestJobDetailView:
 
             remove_perm(permission, u, permission_object)
 
+    def test_runtime_metrics_without_instance_metrics(self, client):
+        j = AlgorithmJobFactory(
+            time_limit=60,
+            runtime_metrics={
+                "outputs": [
+                    {"interface": "results-json-file", "duration": 0.1}
+                ]
+            },
+        )
+        u = UserFactory()
+        assign_perm("view_job", u, j)
+        assign_perm("view_logs", u, j)
+
+        response = get_view_for_user(
+            client=client,
+            viewname="algorithms:job-detail",
+            reverse_kwargs={
+                "slug": j.algorithm_image.algorithm.slug,
+                "pk": j.pk,
+            },
+            user=u,
+        )
+
+        assert response.status_code == 200
+        assert "<h2>Logs</h2>" in response.rendered_content
+        assert "Runtime Metrics" not in response.rendered_content
+
 
 @pytest.mark.django_db
 def test_display_set_from_job(client):
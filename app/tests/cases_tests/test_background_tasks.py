@@ -3,6 +3,7 @@ import shutil
 from pathlib import Path
 from unittest import mock
 
+import billiard
 import pytest
 from actstream.actions import is_following
 from billiard.exceptions import SoftTimeLimitExceeded
@@ -15,6 +16,7 @@ from panimg.image_builders.metaio_utils import (
 
 from grandchallenge.cases.models import Image, RawImageUploadSession
 from grandchallenge.cases.tasks import (
+    _convert_directories,
     build_images,
     check_compressed_and_extract,
 )
@@ -259,9 +261,13 @@ def test_check_compressed_and_extract_same_name(
 
 
 @pytest.mark.django_db
-def test_build_zip_file(settings, django_capture_on_commit_callbacks):
+@pytest.mark.parametrize("conversion_max_workers", (1, 2))
+def test_build_zip_file(
+    settings, django_capture_on_commit_callbacks, conversion_max_workers
+):
     settings.task_eager_propagates = (True,)
     settings.task_always_eager = (True,)
+    settings.CASES_IMPORT_CONVERSION_MAX_WORKERS = conversion_max_workers
 
     # valid.zip contains a tarred version of the dicom folder,
     # image10x10x10.[mha,mhd,zraw] and valid_tiff.tiff
@@ -278,6 +284,12 @@ def test_build_zip_file(settings, django_capture_on_commit_callbacks):
     assert {*session.import_result["file_errors"].keys()} == {
         "valid.zip/dicom.tar"
     }
+    assert {*session.import_result["timings"]} == {
+        "download",
+        "extract",
+        "convert",
+        "store",
+    }
 
     images = session.image_set.all()
     assert images.count() == 3
@@ -291,6 +303,51 @@ def test_build_zip_file(settings, django_capture_on_commit_callbacks):
     )
 
 
+def _convert_directories_in_process(*, queue, **kwargs):
+    result = _convert_directories(**kwargs)
+    queue.put(sorted(im.name for im in result.new_images))
+
+
+def test_convert_directories_in_prefork_worker(settings, tmp_path):
+    settings.CASES_IMPORT_CONVERSION_MAX_WORKERS = 2
+
+    input_directory = tmp_path / "input"
+    output_directory = tmp_path / "output"
+    output_directory.mkdir()
+
+    for directory in ("a", "b"):
+        (input_directory / directory).mkdir(parents=True)
+        shutil.copy(
+            RESOURCE_PATH / "image10x10x10.mha", input_directory / directory
+        )
+
+    # The prefork pool workers of celery are daemonic billiard processes
+    context = billiard.get_context("fork")
+    queue = context.Queue()
+    worker = context.Process(
+        target=_convert_directories_in_process,
+        kwargs={
+            "queue": queue,
+            "input_directory": input_directory,
+            "output_directory": output_directory,
+            "builders": None,
+            "recurse_subdirectories": True,
+        },
+        daemon=True,
+    )
+    worker.start()
+
+    try:
+        assert queue.get(timeout=60) == [
+            "image10x10x10.mha",
+            "image10x10x10.mha",
+        ]
+    finally:
+        worker.join(timeout=60)
+
+    assert worker.exitcode == 0
+
+
 @pytest.mark.django_db
 @mock.patch(
     "grandchallenge.cases.tasks._handle_raw_files",
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+import SimpleITK
+from panimg.models import SimpleITKImage
+
+from grandchallenge.cases.metaio import get_segments, iter_voxel_chunks
+from tests.cases_tests import RESOURCE_PATH
+
+
+@pytest.mark.parametrize(
+    "filename",
+    (
+        "image10x10x10.mha",
+        "image10x11x12x13.mhd",
+        "image5x6x7.mhd",
+        "image16bit.mha",
+        "1x2int16.mha",
+        "mask.mha",
+        "image128x256RGB.mhd",
+    ),
+)
+@pytest.mark.parametrize("use_compression", (True, False))
+@pytest.mark.parametrize("chunk_size", (7, 1024 * 1024))
+def test_iter_voxel_chunks(tmp_path, filename, use_compression, chunk_size):
+    sitk_image = SimpleITK.ReadImage(str(RESOURCE_PATH / filename))
+    header_path = tmp_path / "image.mha"
+    SimpleITK.WriteImage(
+        sitk_image, str(header_path), useCompression=use_compression
+    )
+
+    voxels = np.concatenate(
+        list(iter_voxel_chunks(header_path=header_path, chunk_size=chunk_size))
+    )
+
+    assert np.array_equal(
+        voxels, SimpleITK.GetArrayViewFromImage(sitk_image).ravel()
+    )
+
+
+@pytest.mark.parametrize("use_compression", (True, False))
+def test_get_segments(tmp_path, use_compression):
+    header_path = tmp_path / "image.mha"
+    voxels = np.zeros((20, 10, 10), dtype=np.uint8)
+    voxels[10:, 5:, 5:] = 3
+    voxels[-1, -1, -1] = 7
+    SimpleITK.WriteImage(
+        SimpleITK.GetImageFromArray(voxels),
+        str(header_path),
+        useCompression=use_compression,
+    )
+
+    assert get_segments(header_path=header_path) == {0, 3, 7}
+
+    voxels = np.arange(20 * 10 * 10, dtype=np.uint16).reshape((20, 10, 10))
+    SimpleITK.WriteImage(
+        SimpleITK.GetImageFromArray(voxels),
+        str(header_path),
+        useCompression=use_compression,
+    )
+
+    # Too many segments
+    assert get_segments(header_path=header_path) is None
+
+    SimpleITK.WriteImage(
+        SimpleITK.GetImageFromArray(voxels.astype(np.float32)),
+        str(header_path),
+        useCompression=use_compression,
+    )
+
+    # Not integers
+    assert get_segments(header_path=header_path) is None
+
+    SimpleITK.WriteImage(
+        SimpleITK.GetImageFromArray(
+            np.zeros((20, 10, 10, 3), dtype=np.uint8), isVector=True
+        ),
+        str(header_path),
+        useCompression=use_compression,
+    )
+
+    # Not a single channel
+    assert get_segments(header_path=header_path) is None
+
+
+def _binary_4d_mask():
+    voxels = np.zeros((3, 4, 5, 6), dtype=np.uint8)
+    voxels[1, 2:, 2:, 2:] = 1
+    return voxels
+
+
+def _non_binary_4d_mask():
+    voxels = _binary_4d_mask()
+    voxels[2, 0, 0, 0] = 2
+    return voxels
+
+
+def _uint16_image():
+    voxels = np.zeros((4, 5, 6), dtype=np.uint16)
+    voxels[2:, 2:, 2:] = 300
+    return voxels
+
+
+def _int8_image():
+    voxels = np.zeros((4, 5, 6), dtype=np.int8)
+    voxels[2:, 2:, 2:] = -3
+    return voxels
+
+
+@pytest.mark.parametrize(
+    "voxels,expected",
+    (
+        (np.arange(4 * 5 * 6, dtype=np.uint8).reshape((4, 5, 6)), None),
+        (_int8_image(), {-3, 0}),
+        (_binary_4d_mask(), {1, 2, 3}),
+        (_non_binary_4d_mask(), None),
+        (_uint16_image(), None),
+        (_uint16_image().astype(np.int32), None),
+    ),
+)
+@pytest.mark.parametrize("use_compression", (True, False))
+def test_get_segments_matches_panimg(
+    tmp_path, voxels, expected, use_compression
+):
+    header_path = tmp_path / "image.mha"
+    sitk_image = SimpleITK.GetImageFromArray(voxels)
+    SimpleITK.WriteImage(
+        sitk_image, str(header_path), useCompression=use_compression
+    )
+
+    panimg_segments = SimpleITKImage(
+        image=sitk_image,
+        name="image.mha",
+        consumed_files=set(),
+        spacing_valid=True,
+    ).segments
+
+    assert panimg_segments == expected
+    assert get_segments(header_path=header_path) == panimg_segments
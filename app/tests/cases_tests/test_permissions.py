@@ -1,12 +1,14 @@
 import pytest
 from django.conf import settings
 from django.contrib.auth.models import Group
-from guardian.shortcuts import get_perms
+from guardian.shortcuts import assign_perm, get_perms, remove_perm
 
+from grandchallenge.cases.models import Image
 from tests.algorithms_tests.factories import AlgorithmJobFactory
 from tests.archives_tests.factories import ArchiveFactory, ArchiveItemFactory
 from tests.components_tests.factories import ComponentInterfaceValueFactory
-from tests.factories import ImageFactory
+from tests.evaluation_tests.test_permissions import get_groups_with_set_perms
+from tests.factories import GroupFactory, ImageFactory
 from tests.reader_studies_tests.factories import (
     DisplaySetFactory,
     ReaderStudyFactory,
@@ -173,3 +175,49 @@ def test_view_permission_when_reused(
 
     for g in job.viewer_groups.all():
         assert ("view_image" in get_perms(g, im)) is in_job
+
+
+@pytest.mark.django_db
+def test_bulk_update_viewer_groups_permissions(
+    django_capture_on_commit_callbacks, django_assert_max_num_queries
+):
+    archive = ArchiveFactory()
+    rs = ReaderStudyFactory()
+    other_group = GroupFactory()
+
+    archive_images = ImageFactory.create_batch(3)
+    rs_images = ImageFactory.create_batch(3)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ArchiveItemFactory(archive=archive).values.add(
+            *[
+                ComponentInterfaceValueFactory(image=im)
+                for im in archive_images
+            ]
+        )
+        DisplaySetFactory(reader_study=rs).values.add(
+            *[ComponentInterfaceValueFactory(image=im) for im in rs_images]
+        )
+
+    # Corrupt the permissions
+    assign_perm("view_image", other_group, archive_images[0])
+    remove_perm("view_image", archive.users_group, archive_images[1])
+    remove_perm("view_image", rs.readers_group, rs_images[0])
+
+    with django_assert_max_num_queries(12):
+        Image.bulk_update_viewer_groups_permissions(
+            image_pks=[im.pk for im in [*archive_images, *rs_images]]
+        )
+
+    for im in archive_images:
+        assert get_groups_with_set_perms(im) == {
+            archive.editors_group: {"view_image"},
+            archive.uploaders_group: {"view_image"},
+            archive.users_group: {"view_image"},
+        }
+
+    for im in rs_images:
+        assert get_groups_with_set_perms(im) == {
+            rs.editors_group: {"view_image"},
+            rs.readers_group: {"view_image"},
+        }
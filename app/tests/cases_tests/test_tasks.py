@@ -3,6 +3,7 @@ from pathlib import Path
 from uuid import uuid4
 
 import pytest
+from panimg import post_process
 from panimg.models import ImageType, PanImgFile, PostProcessorResult
 from panimg.post_processors import DEFAULT_POST_PROCESSORS
 
@@ -174,3 +175,88 @@ def test_post_processing(
         sum(file.size_in_storage for file in ImageFile.objects.all())
         == expected_bytes
     )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "batch_max_images, post_processing_max_workers, expected_batches",
+    [(1, 1, 2), (2, 1, 1), (2, 2, 1)],
+)
+def test_post_processing_batches(
+    batch_max_images,
+    post_processing_max_workers,
+    expected_batches,
+    tmpdir_factory,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    settings.task_eager_propagates = (True,)
+    settings.task_always_eager = (True,)
+    settings.CASES_POST_PROCESSING_BATCH_MAX_IMAGES = batch_max_images
+    settings.CASES_POST_PROCESSING_MAX_WORKERS = post_processing_max_workers
+
+    input_directory = tmpdir_factory.mktemp("temp")
+    for filename in ("image1.tif", "image2.tif"):
+        shutil.copy(
+            RESOURCE_PATH / "valid_tiff.tif", Path(input_directory / filename)
+        )
+
+    session = UploadSessionFactory()
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        imported_images = import_images(
+            input_directory=input_directory, origin=session
+        )
+
+    assert len(imported_images.new_images) == 2
+    assert len(callbacks) == expected_batches
+    assert session.post_processing_progress == {"completed": 0, "total": 2}
+
+    for callback in callbacks:
+        callback()
+
+    assert session.post_processing_progress == {"completed": 2, "total": 2}
+    assert ImageFile.objects.filter(image_type=ImageType.DZI).count() == 2
+    assert ImageFile.objects.filter(post_processed=True).count() == 2
+
+
+@pytest.mark.django_db
+def test_post_processing_batch_failed_image(
+    tmpdir_factory, settings, django_capture_on_commit_callbacks, mocker
+):
+    settings.task_eager_propagates = (True,)
+    settings.task_always_eager = (True,)
+    settings.CASES_POST_PROCESSING_BATCH_MAX_IMAGES = 2
+    settings.CASES_POST_PROCESSING_MAX_WORKERS = 1
+
+    input_directory = tmpdir_factory.mktemp("temp")
+    for filename in ("image1.tif", "image2.tif"):
+        shutil.copy(
+            RESOURCE_PATH / "valid_tiff.tif", Path(input_directory / filename)
+        )
+
+    session = UploadSessionFactory()
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        import_images(input_directory=input_directory, origin=session)
+
+    assert len(callbacks) == 1
+
+    calls = []
+
+    def fail_first_image(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise RuntimeError("Failed")
+        return post_process(**kwargs)
+
+    mocker.patch(
+        "grandchallenge.cases.tasks.post_process",
+        side_effect=fail_first_image,
+    )
+
+    callbacks[0]()
+
+    # The other image in the batch is still post processed
+    assert session.post_processing_progress == {"completed": 1, "total": 2}
+    assert ImageFile.objects.filter(image_type=ImageType.DZI).count() == 1
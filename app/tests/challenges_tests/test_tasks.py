@@ -1,12 +1,18 @@
 import pytest
 from django.core import mail
+from guardian.shortcuts import assign_perm
 
-from grandchallenge.challenges.models import Challenge, ChallengeRequest
+from grandchallenge.challenges.models import (
+    Challenge,
+    ChallengeRequest,
+    ComputeCostEntry,
+)
 from grandchallenge.challenges.tasks import (
     update_challenge_results_cache,
     update_compute_costs_and_storage_size,
 )
 from grandchallenge.invoices.models import PaymentStatusChoices
+from tests.algorithms_tests.factories import AlgorithmJobFactory
 from tests.evaluation_tests.factories import EvaluationFactory, PhaseFactory
 from tests.factories import (
     ChallengeFactory,
@@ -266,3 +272,42 @@ def test_challenge_budget_alert_no_budget():
     update_compute_costs_and_storage_size()
     assert len(mail.outbox) != 0
     assert "Budget Consumed Alert" in mail.outbox[0].subject
+
+
+@pytest.mark.django_db
+def test_compute_costs_from_ledger():
+    phase = PhaseFactory()
+    challenge = phase.challenge
+
+    evaluation = EvaluationFactory(submission__phase=phase, time_limit=60)
+    evaluation.update_status(
+        status=evaluation.EXECUTING, compute_cost_euro_millicents=100
+    )
+    evaluation.update_status(
+        status=evaluation.SUCCESS, compute_cost_euro_millicents=300
+    )
+    evaluation.save()
+
+    job = AlgorithmJobFactory(time_limit=60)
+    assign_perm("view_job", challenge.admins_group, job)
+    job.update_status(status=job.SUCCESS, compute_cost_euro_millicents=50)
+
+    other_job = AlgorithmJobFactory(time_limit=60)
+    other_job.update_status(
+        status=other_job.SUCCESS, compute_cost_euro_millicents=1000
+    )
+
+    assert [
+        e.compute_cost_euro_millicents
+        for e in ComputeCostEntry.objects.filter(challenge=challenge).order_by(
+            "pk"
+        )
+    ] == [100, 200, 50]
+
+    update_compute_costs_and_storage_size()
+
+    challenge.refresh_from_db()
+    phase.refresh_from_db()
+
+    assert challenge.compute_cost_euro_millicents == 350
+    assert phase.compute_cost_euro_millicents == 300
@@ -1,14 +1,23 @@
+import json
 import os
+from uuid import uuid4
 from zipfile import ZipInfo
 
 import pytest
+from django.core.files.base import ContentFile
 
 from grandchallenge.components.backends.docker_client import _get_cpuset_cpus
+from grandchallenge.components.backends.exceptions import ComponentException
 from grandchallenge.components.backends.utils import (
     _filter_members,
     user_error,
 )
+from grandchallenge.components.models import InterfaceKindChoices
 from grandchallenge.components.schemas import GPUTypeChoices
+from tests.components_tests.factories import (
+    ComponentInterfaceFactory,
+    ComponentInterfaceValueFactory,
+)
 from tests.components_tests.resources.backends import InsecureDockerExecutor
 
 
@@ -129,3 +138,189 @@ def test_internal_logs_filtered():
         executor.stdout
         == "2022-05-31T09:48:03.205773000Z Greetings from stdout"
     )
+
+
+def test_s3_client_connection_pool(settings):
+    settings.COMPONENTS_PROVISIONING_MAX_WORKERS = 16
+    settings.COMPONENTS_OUTPUT_DOWNLOAD_MAX_WORKERS = 8
+    settings.COMPONENTS_TRANSFER_MAX_CONCURRENCY = 4
+
+    executor = InsecureDockerExecutor(
+        job_id=f"algorithms-job-{uuid4()}",
+        exec_image_repo_tag="test",
+        memory_limit=4,
+        time_limit=100,
+        requires_gpu_type=GPUTypeChoices.NO_GPU,
+    )
+
+    # Every worker can run a multipart transfer at the same time
+    assert executor._s3_client.meta.config.max_pool_connections == 64
+    assert executor._provisioning_transfer_config.max_concurrency == 4
+    assert executor._output_download_transfer_config.max_concurrency == 4
+
+
+@pytest.mark.django_db
+def test_provision_inputs(settings):
+    settings.COMPONENTS_PROVISIONING_MAX_WORKERS = 4
+    settings.COMPONENTS_PROVISIONING_MULTIPART_THRESHOLD = (
+        5 * settings.MEGABYTE
+    )
+    settings.COMPONENTS_PROVISIONING_MULTIPART_CHUNKSIZE = (
+        5 * settings.MEGABYTE
+    )
+
+    executor = InsecureDockerExecutor(
+        job_id=f"algorithms-job-{uuid4()}",
+        exec_image_repo_tag="test",
+        memory_limit=4,
+        time_limit=100,
+        requires_gpu_type=GPUTypeChoices.NO_GPU,
+    )
+
+    value_civs = [
+        ComponentInterfaceValueFactory(
+            interface=ComponentInterfaceFactory(
+                kind=InterfaceKindChoices.ANY,
+                relative_path=f"value-{idx}.json",
+                store_in_database=True,
+            ),
+            value={"idx": idx},
+        )
+        for idx in range(10)
+    ]
+    small_file_civ, large_file_civ = (
+        ComponentInterfaceValueFactory(
+            interface=ComponentInterfaceFactory(
+                kind=InterfaceKindChoices.ANY,
+                relative_path=f"{name}.json",
+                store_in_database=False,
+            )
+        )
+        for name in ("small", "large")
+    )
+    small_file_civ.file.save("small.json", ContentFile(b"[1, 2, 3]"))
+    # Large enough to be copied in two parts
+    large_file_civ.file.save(
+        "large.json", ContentFile(b"0" * (6 * settings.MEGABYTE))
+    )
+
+    executor.provision(
+        input_civs=[*value_civs, small_file_civ, large_file_civ],
+        input_prefixes={str(value_civs[0].pk): "prefix"},
+    )
+
+    expected_size = (
+        sum(len(json.dumps(civ.value).encode("utf-8")) for civ in value_civs)
+        + 9
+        + 6 * settings.MEGABYTE
+    )
+    assert executor.provisioned_size_bytes == expected_size
+    assert executor._input_size_bytes == expected_size
+
+    # The execute task gets the size saved on the job from provisioning
+    executor = InsecureDockerExecutor(
+        job_id=executor._job_id,
+        exec_image_repo_tag="test",
+        memory_limit=4,
+        time_limit=100,
+        requires_gpu_type=GPUTypeChoices.NO_GPU,
+        input_size_bytes=1337,
+    )
+
+    assert executor._input_size_bytes == 1337
+    assert (
+        executor._get_input_prefix_size_bytes(prefix=executor._io_prefix)
+        == expected_size
+    )
+
+    response = executor._s3_client.get_object(
+        Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+        Key=f"{executor._io_prefix}/prefix/value-0.json",
+    )
+    assert json.loads(response["Body"].read()) == {"idx": 0}
+
+    response = executor._s3_client.head_object(
+        Bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+        Key=f"{executor._io_prefix}/large.json",
+    )
+    assert response["ContentLength"] == 6 * settings.MEGABYTE
+
+    executor._delete_objects(
+        bucket=settings.COMPONENTS_INPUT_BUCKET_NAME,
+        prefix=executor._io_prefix,
+    )
+
+
+@pytest.mark.django_db
+def test_get_outputs(settings, tmp_path):
+    settings.COMPONENTS_OUTPUT_DOWNLOAD_MAX_WORKERS = 4
+    settings.COMPONENTS_OUTPUT_DOWNLOAD_MULTIPART_THRESHOLD = (
+        5 * settings.MEGABYTE
+    )
+    settings.COMPONENTS_OUTPUT_DOWNLOAD_MULTIPART_CHUNKSIZE = (
+        5 * settings.MEGABYTE
+    )
+
+    executor = InsecureDockerExecutor(
+        job_id=f"algorithms-job-{uuid4()}",
+        exec_image_repo_tag="test",
+        memory_limit=4,
+        time_limit=100,
+        requires_gpu_type=GPUTypeChoices.NO_GPU,
+    )
+
+    json_interface = ComponentInterfaceFactory(
+        kind=InterfaceKindChoices.ANY,
+        relative_path="results.json",
+        store_in_database=True,
+    )
+    executor._s3_client.put_object(
+        Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+        Key=f"{executor._io_prefix}/results.json",
+        Body=b'{"score": 0.5, "inf": Infinity}',
+    )
+
+    outputs = executor.get_outputs(output_interfaces=[json_interface])
+
+    assert [civ.value for civ in outputs] == [{"score": 0.5, "inf": None}]
+    assert [m["interface"] for m in executor.output_metrics] == [
+        json_interface.slug
+    ]
+    assert executor.output_metrics[0]["duration"] >= 0
+
+    prefix = f"{executor._io_prefix}/images/image"
+    for idx in range(3):
+        executor._s3_client.put_object(
+            Bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+            Key=f"{prefix}/nested/{idx}.raw",
+            Body=b"0" * (idx * 3 * settings.MEGABYTE),
+        )
+
+    output_files = executor._list_output_files(
+        prefix=prefix, relative_path="images/image"
+    )
+    assert len(output_files) == 3
+
+    executor._download_output_files(
+        output_files=output_files, tmpdir=tmp_path, prefix=prefix
+    )
+
+    # The largest file is downloaded with ranged requests
+    for idx in range(3):
+        assert (tmp_path / "nested" / f"{idx}.raw").stat().st_size == (
+            idx * 3 * settings.MEGABYTE
+        )
+
+    settings.COMPONENTS_MAXIMUM_OUTPUT_FILES = 2
+
+    with pytest.raises(ComponentException) as error:
+        executor._list_output_files(
+            prefix=prefix, relative_path="images/image"
+        )
+
+    assert "Too many files produced in 'images/image'" in str(error.value)
+
+    executor._delete_objects(
+        bucket=settings.COMPONENTS_OUTPUT_BUCKET_NAME,
+        prefix=executor._io_prefix,
+    )
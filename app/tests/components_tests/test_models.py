@@ -9,6 +9,7 @@ import pytest
 from billiard.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
 from django.core.exceptions import MultipleObjectsReturned, ValidationError
 from django.core.files.base import ContentFile
+from django.core.management import call_command
 from django.utils import timezone
 from panimg.models import MAXIMUM_SEGMENTS_LENGTH
 
@@ -427,6 +428,36 @@ def test_valid_schema_ok():
     i.full_clean()
 
 
+@pytest.mark.django_db
+def test_schema_validator_cached():
+    i = ComponentInterfaceFactory(
+        kind=InterfaceKindChoices.ANY, schema={"type": "object"}
+    )
+    validator = i.schema_validator
+
+    assert i.schema_validator is validator
+    assert (
+        ComponentInterface.objects.get(pk=i.pk).schema_validator is validator
+    )
+    assert i.default_schema_validator is (
+        ComponentInterfaceFactory(
+            kind=InterfaceKindChoices.ANY
+        ).default_schema_validator
+    )
+
+    i.validate_against_schema(value={})
+    with pytest.raises(ValidationError):
+        i.validate_against_schema(value=[])
+
+    i.schema = {"type": "array"}
+    i.save()
+
+    assert i.schema_validator is not validator
+    i.validate_against_schema(value=[])
+    with pytest.raises(ValidationError):
+        i.validate_against_schema(value={})
+
+
 @pytest.mark.django_db
 def test_invalid_schema_raises_error():
     i = ComponentInterfaceFactory(schema={"type": "whatevs"})
@@ -1642,6 +1673,53 @@ def test_component_interface_value_manager():
     assert not created
 
 
+@pytest.mark.django_db
+def test_component_interface_value_content_hash():
+    ci = ComponentInterfaceFactory(kind=InterfaceKindChoices.ANY)
+    ci_image = ComponentInterfaceFactory(kind=InterfaceKindChoices.IMAGE)
+
+    civ = ComponentInterfaceValueFactory(
+        interface=ci, value={"foo": 1, "bar": [1, 2]}
+    )
+    image_civ = ComponentInterfaceValueFactory(
+        interface=ci_image, image=ImageFactory()
+    )
+
+    assert civ.content_hash.startswith("json:")
+    assert image_civ.content_hash == f"image:{image_civ.image.pk}"
+
+    existing, created = ComponentInterfaceValue.objects.get_first_or_create(
+        interface=ci, value={"bar": [1, 2], "foo": 1}
+    )
+
+    assert existing == civ
+    assert not created
+
+    new, created = ComponentInterfaceValue.objects.get_first_or_create(
+        interface=ci, value={"bar": [2, 1], "foo": 1}
+    )
+
+    assert new != civ
+    assert created
+    assert new.content_hash != civ.content_hash
+
+    existing, created = ComponentInterfaceValue.objects.get_first_or_create(
+        interface=ci_image, image=image_civ.image
+    )
+
+    assert existing == image_civ
+    assert not created
+
+    ComponentInterfaceValue.objects.update(content_hash="")
+
+    call_command("backfill_civ_content_hashes", batch_size=2)
+
+    for obj in (civ, new, image_civ):
+        content_hash = obj.content_hash
+        obj.refresh_from_db()
+        assert obj.content_hash == content_hash
+
+
 @pytest.mark.parametrize(
     "mock_error, expected_error, msg",
     (
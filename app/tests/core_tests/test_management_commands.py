@@ -0,0 +1,77 @@
+import csv
+import gzip
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from grandchallenge.components.models import ComponentInterface
+from tests.components_tests.factories import ComponentInterfaceValueFactory
+from tests.evaluation_tests.factories import EvaluationFactory, PhaseFactory
+
+
+@pytest.fixture
+def challenge_results():
+    phase = PhaseFactory(challenge__short_name="results")
+    evaluations = [
+        EvaluationFactory(submission__phase=phase, time_limit=60)
+        for _ in range(3)
+    ]
+    interface = ComponentInterface.objects.get(slug="metrics-json-file")
+
+    for n, evaluation in enumerate(evaluations[:2]):
+        evaluation.outputs.add(
+            ComponentInterfaceValueFactory(
+                interface=interface, value={"acc": n}
+            )
+        )
+
+    # Results of other challenges are not exported
+    EvaluationFactory(time_limit=60)
+
+    return evaluations
+
+
+@pytest.mark.django_db
+def test_export_results_jsonl(challenge_results, tmp_path):
+    output = tmp_path / "results.jsonl.gz"
+
+    call_command(
+        "export_results",
+        "results",
+        "--output",
+        str(output),
+        "--compression",
+        "gzip",
+        "--chunk-size",
+        "2",
+    )
+
+    with gzip.open(output, "rt") as f:
+        rows = [json.loads(line) for line in f]
+
+    assert [r["pk"] for r in rows] == [str(e.pk) for e in challenge_results]
+    assert [r["metrics"] for r in rows] == [{"acc": 0}, {"acc": 1}, None]
+
+
+@pytest.mark.django_db
+def test_export_results_csv(challenge_results, tmp_path):
+    output = tmp_path / "results.csv"
+
+    call_command(
+        "export_results", "results", "--format", "csv", "--output", output
+    )
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert [r["pk"] for r in rows] == [str(e.pk) for e in challenge_results]
+    assert [r["metrics"] for r in rows] == ['{"acc": 0}', '{"acc": 1}', ""]
+
+
+@pytest.mark.django_db
+def test_export_results_errors():
+    with pytest.raises(CommandError) as e:
+        call_command("export_results", "non-existent")
+
+    assert str(e.value) == "Could not find challenge non-existent."
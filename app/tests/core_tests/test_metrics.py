@@ -0,0 +1,137 @@
+from uuid import uuid4
+
+import pytest
+from django_redis import get_redis_connection
+
+from grandchallenge.algorithms import models as algorithms_models
+from grandchallenge.algorithms.models import Job
+from grandchallenge.components.schemas import GPUTypeChoices
+from grandchallenge.core import signals
+from grandchallenge.core.metrics import StatusCounters
+from tests.algorithms_tests.factories import (
+    AlgorithmImageFactory,
+    AlgorithmJobFactory,
+)
+
+
+@pytest.fixture
+def status_counters(settings, monkeypatch):
+    """Enabled status counters whose keys are isolated from other tests"""
+    settings.CORE_STATUS_COUNTERS_ENABLED = True
+    counters = StatusCounters(prefix=f"test.status_counters.{uuid4()}")
+    monkeypatch.setattr(signals, "status_counters", counters)
+    monkeypatch.setattr(algorithms_models, "status_counters", counters)
+
+    yield counters
+
+    connection = get_redis_connection("default")
+    keys = connection.keys(f"{counters.prefix}.*")
+    if keys:
+        connection.delete(*keys)
+
+
+def get_counted_statuses(*, counters, model):
+    counts = get_redis_connection("default").hgetall(
+        counters._key(model=model)
+    )
+    return {int(k): int(v) for k, v in counts.items() if int(v)}
+
+
+@pytest.mark.django_db
+def test_status_counted_on_save_and_delete(
+    status_counters, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        job = AlgorithmJobFactory(time_limit=60)
+
+    assert get_counted_statuses(counters=status_counters, model=Job) == {
+        Job.PENDING: 1
+    }
+
+    with django_capture_on_commit_callbacks(execute=True):
+        job.status = Job.EXECUTING
+        job.save(update_fields=["status"])
+
+    assert get_counted_statuses(counters=status_counters, model=Job) == {
+        Job.EXECUTING: 1
+    }
+
+    # Saves that do not change the status are not counted
+    with django_capture_on_commit_callbacks(execute=True):
+        job.save()
+        job.comment = "Updated"
+        job.save(update_fields=["comment"])
+
+    assert get_counted_statuses(counters=status_counters, model=Job) == {
+        Job.EXECUTING: 1
+    }
+
+    # The previous status is unknown if it was deferred
+    deferred_job = Job.objects.only("pk").get(pk=job.pk)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        deferred_job.status = Job.SUCCESS
+        deferred_job.save(update_fields=["status"])
+
+    assert get_counted_statuses(counters=status_counters, model=Job) == {
+        Job.EXECUTING: 1
+    }
+
+    status_counters.reconcile(model=Job)
+
+    assert get_counted_statuses(counters=status_counters, model=Job) == {
+        Job.SUCCESS: 1
+    }
+
+    # The status is known once the deferred instance is saved
+    with django_capture_on_commit_callbacks(execute=True):
+        deferred_job.delete()
+
+    assert get_counted_statuses(counters=status_counters, model=Job) == {}
+
+
+@pytest.mark.django_db
+def test_status_counted_on_bulk_create(
+    status_counters, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        Job.objects.bulk_create_for_input_civ_sets(
+            input_civ_sets=[[], []],
+            algorithm_image=AlgorithmImageFactory(),
+            time_limit=60,
+            requires_gpu_type=GPUTypeChoices.NO_GPU,
+            requires_memory_gb=4,
+        )
+
+    assert get_counted_statuses(counters=status_counters, model=Job) == {
+        Job.PENDING: 2
+    }
+
+
+@pytest.mark.django_db
+def test_status_counters_reconcile(status_counters):
+    # The counts are rebuilt from the database when they are missing
+    jobs = AlgorithmJobFactory.create_batch(3, time_limit=60)
+
+    assert status_counters.get_counts(model=Job) == {Job.PENDING: 3}
+    # The zero counts are stored too
+    assert {
+        int(status)
+        for status in get_redis_connection("default").hkeys(
+            status_counters._key(model=Job)
+        )
+    } == {status for status, _ in Job.status.field.choices}
+
+    # Queryset updates bypass the counters until they are reconciled
+    Job.objects.filter(pk=jobs[0].pk).update(status=Job.CANCELLED)
+
+    assert status_counters.get_counts(model=Job)[Job.PENDING] == 3
+
+    assert status_counters.reconcile(model=Job) == {
+        Job.PENDING: 2,
+        Job.CANCELLED: 1,
+    }
+    assert get_counted_statuses(counters=status_counters, model=Job) == {
+        Job.PENDING: 2,
+        Job.CANCELLED: 1,
+    }
@@ -1,7 +1,7 @@
 import pytest
 
 from grandchallenge.algorithms.models import AlgorithmImage
-from grandchallenge.core.tasks import _get_metrics
+from grandchallenge.core.tasks import _get_metrics, _put_metrics
 from grandchallenge.evaluation.models import Method
 from tests.algorithms_tests.factories import (
     AlgorithmImageFactory,
@@ -237,3 +237,35 @@ def test_get_metrics():
             ],
         },
     ]
+
+
+class StubCloudWatchClient:
+    def __init__(self):
+        self.calls = []
+
+    def put_metric_data(self, *, Namespace, MetricData):  # noqa: N803
+        self.calls.append((Namespace, MetricData))
+
+
+def test_put_metrics_batches_namespaces():
+    client = StubCloudWatchClient()
+    metric_data = [
+        {"MetricName": f"Metric{n}", "Value": n, "Unit": "Count"}
+        for n in range(1500)
+    ]
+
+    _put_metrics(
+        client=client,
+        metrics=[
+            {"Namespace": "a", "MetricData": metric_data[:600]},
+            {"Namespace": "b", "MetricData": metric_data[:2]},
+            {"Namespace": "a", "MetricData": metric_data[600:]},
+            {"Namespace": "c", "MetricData": []},
+        ],
+    )
+
+    assert client.calls == [
+        ("a", metric_data[:1000]),
+        ("a", metric_data[1000:]),
+        ("b", metric_data[:2]),
+    ]
@@ -1,6 +1,10 @@
 import pytest
+from django.db import connection
 
+from grandchallenge.algorithms.models import Algorithm
 from grandchallenge.core.utils import strtobool
+from grandchallenge.core.utils.query import get_estimated_count
+from tests.algorithms_tests.factories import AlgorithmFactory
 
 
 @pytest.mark.parametrize(
@@ -37,3 +41,15 @@ def test_strtobool(val, result):
 def test_strtobool_exception():
     with pytest.raises(ValueError):
         strtobool("foobar")
+
+
+@pytest.mark.django_db
+def test_get_estimated_count():
+    AlgorithmFactory.create_batch(3)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Algorithm._meta.db_table}")
+
+    assert get_estimated_count(Algorithm.objects.all()) == 3
+    assert get_estimated_count(Algorithm.objects.order_by("-title")) == 3
+    assert get_estimated_count(Algorithm.objects.none()) == 0
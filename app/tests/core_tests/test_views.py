@@ -128,6 +128,150 @@ def test_paginated_table_list_view_ordering():
     assert "BbbbbB" == json_resp["data"][1][1].strip()
 
 
+@pytest.mark.django_db
+def test_paginated_table_list_view_keyset_pagination():
+    view = PaginatedTableListView()
+    view.keyset_pagination = True
+
+    request = HttpRequest()
+    request.META["HTTP_X_REQUESTED_WITH"] = "XMLHttpRequest"
+    request.POST["length"] = 2
+    request.POST["draw"] = 1
+    request.POST["order[0][dir]"] = "asc"
+
+    view.model = Algorithm
+    view.row_template = "datatable_row_template.html"
+    view.columns = [Column(title="Title", sort_field="title")]
+
+    for title in ["A", "B", "B", "C", "D"]:
+        AlgorithmFactory(title=title)
+
+    view.request = request
+
+    titles = []
+
+    for start in range(0, 6, 2):
+        request.POST["start"] = start
+        json_resp = json.loads(view.post(request).content)
+
+        assert json_resp["recordsTotal"] == 5
+        assert json_resp["recordsFiltered"] == 5
+
+        titles.extend(row[1].strip() for row in json_resp["data"])
+        request.POST["cursor"] = json_resp["cursor"]
+
+    assert titles == ["A", "B", "B", "C", "D"]
+
+    # The cursor is ignored for other pages
+    request.POST["start"] = 2
+    json_resp = json.loads(view.post(request).content)
+    assert [row[1].strip() for row in json_resp["data"]] == ["B", "C"]
+
+    # Tampered cursors are ignored
+    request.POST["start"] = 4
+    request.POST["cursor"] = "tampered"
+    json_resp = json.loads(view.post(request).content)
+    assert [row[1].strip() for row in json_resp["data"]] == ["D"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("indexed_search", (True, False))
+def test_paginated_table_list_view_search(indexed_search):
+    view = PaginatedTableListView()
+    view.indexed_search = indexed_search
+
+    request = HttpRequest()
+    request.META["HTTP_X_REQUESTED_WITH"] = "XMLHttpRequest"
+    request.POST["length"] = 50
+    request.POST["draw"] = 1
+    request.POST["search[value]"] = "needle"
+
+    view.model = Algorithm
+    view.row_template = "datatable_row_template.html"
+    view.columns = [Column(title="Title", sort_field="title")]
+    view.search_fields = ["title", "editors_group__user__username"]
+
+    a1, a2, _ = AlgorithmFactory.create_batch(3)
+    a1.title = "Haystack with needle"
+    a1.save()
+    a2.add_editor(user=UserFactory(username="needle1"))
+    a2.add_editor(user=UserFactory(username="needle2"))
+
+    view.request = request
+    json_resp = json.loads(view.post(request).content)
+
+    assert json_resp["recordsTotal"] == 3
+    assert json_resp["recordsFiltered"] == 2
+    assert sorted(row[1].strip() for row in json_resp["data"]) == sorted(
+        [a1.title, a2.title]
+    )
+
+
+@pytest.mark.django_db
+def test_paginated_table_list_view_approximate_counts():
+    view = PaginatedTableListView()
+    view.approximate_count_threshold = -1
+
+    request = HttpRequest()
+    request.META["HTTP_X_REQUESTED_WITH"] = "XMLHttpRequest"
+    request.POST["length"] = 50
+    request.POST["draw"] = 1
+    request.POST["start"] = 50
+
+    view.model = Algorithm
+    view.row_template = "datatable_row_template.html"
+    view.columns = [Column(title="Title", sort_field="title")]
+    view.search_fields = ["title"]
+
+    AlgorithmFactory(title="Needle")
+    AlgorithmFactory()
+
+    view.request = request
+    json_resp = json.loads(view.post(request).content)
+
+    # The start is not moved to the last page of an estimate
+    assert json_resp["data"] == []
+
+    request.POST["start"] = 0
+    json_resp = json.loads(view.post(request).content)
+
+    # The estimate is corrected on the last page
+    assert json_resp["recordsTotal"] == 2
+    assert json_resp["recordsFiltered"] == 2
+    assert len(json_resp["data"]) == 2
+
+    request.POST["search[value]"] = "needle"
+    request.POST["start"] = 50
+    json_resp = json.loads(view.post(request).content)
+
+    # Searches are counted exactly
+    assert json_resp["recordsFiltered"] == 1
+    assert [row[1].strip() for row in json_resp["data"]] == ["Needle"]
+
+
+@pytest.mark.parametrize(
+    "estimate,start,num_objects,expected",
+    (
+        (100, 0, 10, 100),
+        (5, 0, 10, 11),
+        (100, 20, 3, 23),
+        (100, 200, 0, 100),
+    ),
+)
+def test_paginated_table_list_view_correct_estimate(
+    estimate, start, num_objects, expected
+):
+    assert (
+        PaginatedTableListView.correct_estimate(
+            estimate=estimate,
+            start=start,
+            page_size=10,
+            num_objects=num_objects,
+        )
+        == expected
+    )
+
+
 @pytest.mark.django_db
 def test_healthcheck(client, django_assert_num_queries):
     with django_assert_num_queries(7):
@@ -4,6 +4,7 @@ from itertools import chain
 
 import pytest
 from django.core import mail
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 from django.utils import timezone
@@ -16,6 +17,7 @@ from grandchallenge.evaluation.models import (
     SUBMISSION_WINDOW_PARENT_VALIDATION_TEXT,
     CombinedLeaderboard,
     Evaluation,
+    EvaluationMetric,
     Phase,
 )
 from grandchallenge.evaluation.tasks import (
@@ -23,6 +25,7 @@ from grandchallenge.evaluation.tasks import (
     create_algorithm_jobs_for_evaluation,
     create_evaluation,
     update_combined_leaderboard,
+    update_evaluation_metrics,
 )
 from grandchallenge.evaluation.utils import SubmissionKindChoices
 from grandchallenge.invoices.models import PaymentStatusChoices
@@ -699,6 +702,120 @@ def test_combined_leaderboards_with_non_public_components():
     assert len(leaderboard.combined_ranks) == 0
 
 
+@pytest.mark.django_db
+def test_combined_leaderboard_phase_contributions():
+    phases = PhaseFactory.create_batch(2)
+    users = UserFactory.create_batch(2)
+    leaderboard = CombinedLeaderboardFactory()
+    leaderboard.phases.set(phases)
+
+    evaluations = {
+        (user_idx, phase_idx): EvaluationFactory(
+            submission__creator=user,
+            submission__phase=phase,
+            published=True,
+            status=Evaluation.SUCCESS,
+            rank=user_idx + 1,
+            time_limit=phase.evaluation_time_limit,
+        )
+        for user_idx, user in enumerate(users)
+        for phase_idx, phase in enumerate(phases)
+    }
+    # Worse evaluations are not used
+    EvaluationFactory(
+        submission__creator=users[0],
+        submission__phase=phases[0],
+        published=True,
+        status=Evaluation.SUCCESS,
+        rank=3,
+        time_limit=phases[0].evaluation_time_limit,
+    )
+
+    update_combined_leaderboard(pk=leaderboard.pk)
+
+    versions = cache.get(leaderboard.combined_ranks_cache_key)["phases"]
+    assert versions.keys() == {phases[0].pk, phases[1].pk}
+    assert [cr["user"] for cr in leaderboard.combined_ranks] == [
+        users[0].username,
+        users[1].username,
+    ]
+    assert leaderboard.combined_ranks[0]["evaluations"] == {
+        phases[0].pk: {"pk": evaluations[(0, 0)].pk, "rank": 1},
+        phases[1].pk: {"pk": evaluations[(0, 1)].pk, "rank": 1},
+    }
+
+    # Re-rank only the first phase
+    Evaluation.objects.filter(pk=evaluations[(0, 0)].pk).update(rank=5)
+    Evaluation.objects.filter(pk=evaluations[(1, 0)].pk).update(rank=1)
+    CombinedLeaderboard.update_phase_contributions_cache(
+        phase_pks=[phases[0].pk]
+    )
+
+    update_combined_leaderboard(pk=leaderboard.pk)
+    del leaderboard._combined_ranks_object
+
+    new_versions = cache.get(leaderboard.combined_ranks_cache_key)["phases"]
+    assert new_versions[phases[0].pk] != versions[phases[0].pk]
+    assert new_versions[phases[1].pk] == versions[phases[1].pk]
+    # User 0 now has their evaluation ranked 3 as their best in phase 0
+    assert [cr["combined_rank"] for cr in leaderboard.combined_ranks] == [
+        1.5,
+        2,
+    ]
+    assert [cr["user"] for cr in leaderboard.combined_ranks] == [
+        users[1].username,
+        users[0].username,
+    ]
+
+
+@pytest.mark.django_db
+def test_combined_leaderboard_phase_contributions_refreshed_outside_leaderboard(
+    django_capture_on_commit_callbacks,
+):
+    phase = PhaseFactory(score_jsonpath="result", score_default_sort="asc")
+    users = UserFactory.create_batch(2)
+    interface = ComponentInterface.objects.get(slug="metrics-json-file")
+
+    evaluations = []
+    for result, user in enumerate(users):
+        evaluation = EvaluationFactory(
+            submission__creator=user,
+            submission__phase=phase,
+            published=True,
+            status=Evaluation.SUCCESS,
+            time_limit=phase.evaluation_time_limit,
+        )
+        output_civ, _ = evaluation.outputs.get_or_create(interface=interface)
+        output_civ.value = {"result": result}
+        output_civ.save()
+        evaluations.append(evaluation)
+
+    calculate_ranks(phase_pk=phase.pk)
+
+    contribution = cache.get(
+        CombinedLeaderboard.get_phase_contribution_cache_key(phase_pk=phase.pk)
+    )
+    assert contribution["users_best_evaluation"].keys() == {
+        users[0].username,
+        users[1].username,
+    }
+
+    # Re-rank the phase while it is not in any combined leaderboard
+    Evaluation.objects.filter(pk=evaluations[0].pk).update(published=False)
+    calculate_ranks(phase_pk=phase.pk)
+
+    leaderboard = CombinedLeaderboardFactory(challenge=phase.challenge)
+
+    with django_capture_on_commit_callbacks():
+        leaderboard.phases.set([phase])
+
+    update_combined_leaderboard(pk=leaderboard.pk)
+
+    assert [cr["user"] for cr in leaderboard.combined_ranks] == [
+        users[1].username
+    ]
+
+
 @pytest.mark.django_db
 def test_combined_leaderboard_updated_on_save(
     django_capture_on_commit_callbacks,
@@ -1452,3 +1569,99 @@ def test_algorithm_requires_memory_unchangable():
         submission.save()
 
     assert "algorithm_requires_memory_gb cannot be changed" in str(error)
+
+
+@pytest.mark.django_db
+def test_evaluation_metrics_stored_on_success():
+    phase = PhaseFactory(
+        score_jsonpath="a",
+        score_error_jsonpath="a_error",
+        extra_results_columns=[
+            {"path": "b.c", "title": "C", "order": Phase.ASCENDING},
+            {"path": "d", "title": "D", "order": Phase.ASCENDING},
+            {"path": "e", "title": "E", "order": Phase.ASCENDING},
+        ],
+    )
+    evaluation = EvaluationFactory(
+        submission__phase=phase, time_limit=phase.evaluation_time_limit
+    )
+    evaluation.outputs.add(
+        ComponentInterfaceValueFactory(
+            interface=ComponentInterface.objects.get(slug="metrics-json-file"),
+            value={
+                "a": 1,
+                "a_error": 0.5,
+                "b": {"c": "not a number"},
+                "e": 2**64,
+            },
+        )
+    )
+
+    evaluation.update_status(status=Evaluation.SUCCESS)
+
+    assert {
+        m.path: m.value
+        for m in EvaluationMetric.objects.filter(evaluation=evaluation)
+    } == {"a": 1.0, "a_error": 0.5, "b.c": None, "d": None}
+
+    evaluation = Evaluation.objects.get(pk=evaluation.pk)
+
+    assert evaluation.get_metric_value("a") == 1.0
+    assert evaluation.get_metric_value("b.c") == ""
+    # Large integers are not stored so are read from the metrics json file
+    assert evaluation.get_metric_value("e") == 2**64
+    assert evaluation.invalid_metrics == {"b.c", "d"}
+
+
+@pytest.mark.django_db
+def test_update_evaluation_metrics():
+    phase = PhaseFactory(score_jsonpath="a")
+    evaluation = EvaluationFactory(
+        submission__phase=phase,
+        status=Evaluation.SUCCESS,
+        time_limit=phase.evaluation_time_limit,
+    )
+    evaluation.outputs.add(
+        ComponentInterfaceValueFactory(
+            interface=ComponentInterface.objects.get(slug="metrics-json-file"),
+            value={"a": 0.5, "b": 2},
+        )
+    )
+
+    update_evaluation_metrics(phase_pk=phase.pk)
+
+    assert evaluation.metrics.get().value == 0.5
+
+    phase.extra_results_columns = [
+        {"path": "b", "title": "B", "order": Phase.ASCENDING}
+    ]
+    phase.save()
+    update_evaluation_metrics(phase_pk=phase.pk)
+
+    assert {m.path: m.value for m in evaluation.metrics.all()} == {
+        "a": 0.5,
+        "b": 2.0,
+    }
+
+    # Metrics for paths that are no longer used by the phase are deleted
+    phase.score_jsonpath = "b"
+    phase.extra_results_columns = []
+    phase.save()
+    update_evaluation_metrics(phase_pk=phase.pk)
+
+    assert {m.path: m.value for m in evaluation.metrics.all()} == {"b": 2.0}
+
+    evaluation.outputs.remove(
+        evaluation.outputs.get(interface__slug="metrics-json-file")
+    )
+    evaluation.outputs.add(
+        ComponentInterfaceValueFactory(
+            interface=ComponentInterface.objects.get(slug="metrics-json-file"),
+            value={"b": 2**64},
+        )
+    )
+    evaluation.update_metrics()
+
+    # Values that are no longer stored are read from the metrics json file
+    assert not evaluation.metrics.exists()
+    assert evaluation.get_metric_value("b") == 2**64
@@ -1,4 +1,8 @@
+from functools import partial
+from types import SimpleNamespace
+
 import pytest
+from django.core.cache import cache
 
 from grandchallenge.components.models import (
     ComponentInterface,
@@ -6,6 +10,16 @@ from grandchallenge.components.models import (
 )
 from grandchallenge.evaluation.models import Evaluation, Phase
 from grandchallenge.evaluation.tasks import calculate_ranks
+from grandchallenge.evaluation.templatetags.evaluation_extras import (
+    get_jsonpath,
+)
+from grandchallenge.evaluation.utils import (
+    Metric,
+    RankingEngine,
+    UnrankableValue,
+    _rank_results_python,
+    rank_results,
+)
 from tests.evaluation_tests.factories import EvaluationFactory, PhaseFactory
 from tests.factories import UserFactory
 
@@ -437,6 +451,121 @@ def test_null_results():
     assert_ranks(queryset, expected_ranks)
 
 
+@pytest.mark.parametrize(
+    "score_method", (Phase.ABSOLUTE, Phase.MEAN, Phase.MEDIAN)
+)
+@pytest.mark.parametrize("reverse", (True, False))
+def test_ranking_engine_matches_python_ranks(score_method, reverse):
+    phase = Phase(scoring_method_choice=score_method)
+    metrics = (
+        Metric(path="a", reverse=reverse),
+        Metric(path="b.c", reverse=not reverse),
+        Metric(path="a", reverse=not reverse),
+    )
+
+    results = [
+        {"a": 0.5, "b": {"c": 1}},
+        {"a": 1, "b": {"c": 1.0}},
+        {"a": 0.5, "b": {"c": -0.0}},
+        {"a": float("inf"), "b": {"c": 0}},
+        {"a": True, "b": {"c": 2}},
+        {"a": 0.5},
+        {"a": "0.5", "b": {"c": 2}},
+    ]
+
+    evaluations = [
+        SimpleNamespace(
+            pk=idx,
+            get_metric_value=partial(get_jsonpath, r),
+            invalid_metrics={
+                m.path
+                for m in metrics
+                if not isinstance(get_jsonpath(r, m.path), (int, float))
+            },
+        )
+        for idx, r in enumerate(results)
+    ]
+
+    expected = _rank_results_python(
+        evaluations=evaluations,
+        metrics=metrics,
+        score_method=phase.scoring_method,
+    )
+
+    assert (
+        rank_results(
+            evaluations=evaluations,
+            metrics=metrics,
+            score_method=phase.scoring_method,
+        )
+        == expected
+    )
+
+    engine = RankingEngine.from_evaluations(
+        evaluations=evaluations[:-3], metrics=metrics
+    )
+    for evaluation in evaluations[-3:]:
+        engine.insert(evaluation=evaluation)
+
+    assert engine.pks == [0, 1, 2, 3, 4]
+    assert engine.get_positions(score_method=phase.scoring_method) == expected
+
+
+def test_ranking_engine_unrankable_values():
+    metrics = (Metric(path="a", reverse=False),)
+    evaluations = [
+        SimpleNamespace(
+            pk=0, get_metric_value=partial(get_jsonpath, {"a": float("nan")})
+        ),
+        SimpleNamespace(
+            pk=1, get_metric_value=partial(get_jsonpath, {"a": 2**64})
+        ),
+    ]
+
+    for evaluation in evaluations:
+        with pytest.raises(UnrankableValue):
+            RankingEngine.from_evaluations(
+                evaluations=[evaluation], metrics=metrics
+            )
+
+
+@pytest.mark.django_db
+def test_calculate_ranks_incrementally():
+    phase = PhaseFactory(score_jsonpath="a", result_display_choice=Phase.ALL)
+    interface = ComponentInterface.objects.get(slug="metrics-json-file")
+
+    queryset = []
+
+    for result in ({"a": 0.2}, {"a": 0.6}, {"a": 0.4}):
+        evaluation = EvaluationFactory(
+            submission__phase=phase,
+            status=Evaluation.SUCCESS,
+            time_limit=phase.evaluation_time_limit,
+        )
+        evaluation.outputs.add(
+            ComponentInterfaceValue.objects.create(
+                interface=interface, value=result
+            )
+        )
+        queryset.append(evaluation)
+
+        calculate_ranks(phase_pk=phase.pk)
+
+    assert_ranks(queryset, [3, 1, 2])
+
+    cached = cache.get(phase.ranking_engine_cache_key)
+    assert cached["considered_pks"] == {e.pk for e in queryset}
+    assert len(cached["engine"]) == 3
+
+    # Removing an evaluation requires a full rebuild
+    queryset[1].published = False
+    queryset[1].save()
+    calculate_ranks(phase_pk=phase.pk)
+
+    assert_ranks(queryset, [2, 0, 1])
+    assert len(cache.get(phase.ranking_engine_cache_key)["engine"]) == 2
+
+
 def assert_ranks(queryset, expected_ranks, expected_rank_scores=None):
     for r in queryset:
         r.refresh_from_db()
@@ -6,6 +6,7 @@ from django.core.exceptions import ValidationError
 from grandchallenge.core.validators import (
     ExtensionValidator,
     JSONValidator,
+    JSONValidatorCache,
     MimeTypeValidator,
 )
 
@@ -75,3 +76,25 @@ def test_json_validator():
         schema={"type": "object", "properties": {"name": {"type": "string"}}}
     )
     assert json_validator is not JSONValidator(schema=schema)
+
+
+def test_json_validator_cache():
+    cache = JSONValidatorCache(maxsize=2)
+    schemas = [{"type": t} for t in ("string", "number", "object")]
+
+    string_validator = cache.get(key="string", schema=schemas[0])
+    assert cache.get(key="string", schema=schemas[0]) is string_validator
+    with pytest.raises(ValidationError):
+        string_validator(1)
+
+    cache.get(key="number", schema=schemas[1])
+    # The string validator is used, so the number validator is evicted
+    cache.get(key="string", schema=schemas[0])
+    cache.get(key="object", schema=schemas[2])
+
+    assert len(cache) == 2
+    assert cache.get(key="string", schema=schemas[0]) is string_validator
+    assert cache.get(key="number", schema=schemas[1]) is not None
+
+    cache.evict(key="string")
+    assert cache.get(key="string", schema=schemas[0]) is not string_validator
@@ -5,7 +5,9 @@ import factory
 import pytest
 from django.conf import settings
 from django.core.cache import cache
+from django.db import connection
 from django.db.models import signals
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from factory.django import ImageField
 from guardian.shortcuts import assign_perm, remove_perm
@@ -657,6 +659,57 @@ def test_hidden_phase_visible_for_admins_but_not_participants(client):
         assert hidden_phase.title in str(response.content)
 
 
+@pytest.mark.django_db
+def test_leaderboard_reads_metrics_json_files_in_bulk(client):
+    phase = PhaseFactory(
+        challenge=ChallengeFactory(hidden=False), score_jsonpath="acc"
+    )
+    interface = ComponentInterface.objects.get(slug="metrics-json-file")
+
+    def create_evaluations(ranks):
+        for rank in ranks:
+            evaluation = EvaluationFactory(
+                method__phase=phase,
+                submission__phase=phase,
+                rank=rank,
+                status=Evaluation.SUCCESS,
+                time_limit=phase.evaluation_time_limit,
+            )
+            # The metrics of these evaluations have not been stored
+            output_civ, _ = evaluation.outputs.get_or_create(
+                interface=interface
+            )
+            output_civ.value = {"acc": rank / 10}
+            output_civ.save()
+
+    def get_leaderboard():
+        with CaptureQueriesContext(connection) as context:
+            response = get_view_for_user(
+                viewname="evaluation:leaderboard",
+                client=client,
+                reverse_kwargs={
+                    "challenge_short_name": phase.challenge.short_name,
+                    "slug": phase.slug,
+                },
+                data={"length": 10, "draw": 1},
+                **{"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"},
+            )
+
+        assert response.status_code == 200
+        return response.json()["data"], len(context)
+
+    create_evaluations(ranks=[1])
+    data, num_queries = get_leaderboard()
+
+    assert len(data) == 1
+
+    create_evaluations(ranks=[2, 3])
+    data, num_queries_more_rows = get_leaderboard()
+
+    assert len(data) == 3
+    assert num_queries_more_rows == num_queries
+
+
 @pytest.mark.django_db
 def test_create_algorithm_for_phase_permission(client, uploaded_image):
     phase = PhaseFactory()
@@ -1,11 +1,12 @@
 import pytest
+from actstream.actions import follow
 from django.core import mail
 from django.utils.timezone import now
 
 from grandchallenge.notifications.models import Notification
 from grandchallenge.notifications.tasks import send_unread_notification_emails
 from grandchallenge.profiles.models import NotificationEmailOptions
-from tests.factories import UserFactory
+from tests.factories import UploadSessionFactory, UserFactory
 from tests.notifications_tests.factories import NotificationFactory
 
 
@@ -88,7 +89,9 @@ def test_notification_email_counts():
 
 
 @pytest.mark.django_db
-def test_instant_email_notification_opt_in():
+def test_instant_email_notification_opt_in(
+    django_capture_on_commit_callbacks,
+):
     inactive_user, user_no_email, user_instant_email, user_daily_email = (
         UserFactory.create_batch(4)
     )
@@ -111,19 +114,69 @@ def test_instant_email_notification_opt_in():
     )
     user_daily_email.user_profile.save()
 
-    Notification.send(
-        kind=Notification.Type.FILE_COPY_STATUS, actor=inactive_user
-    )
-    Notification.send(
-        kind=Notification.Type.FILE_COPY_STATUS, actor=user_no_email
-    )
-    Notification.send(
-        kind=Notification.Type.FILE_COPY_STATUS, actor=user_instant_email
-    )
-    Notification.send(
-        kind=Notification.Type.FILE_COPY_STATUS, actor=user_daily_email
-    )
+    with django_capture_on_commit_callbacks(execute=True):
+        Notification.send(
+            kind=Notification.Type.FILE_COPY_STATUS, actor=inactive_user
+        )
+        Notification.send(
+            kind=Notification.Type.FILE_COPY_STATUS, actor=user_no_email
+        )
+        Notification.send(
+            kind=Notification.Type.FILE_COPY_STATUS, actor=user_instant_email
+        )
+        Notification.send(
+            kind=Notification.Type.FILE_COPY_STATUS, actor=user_daily_email
+        )
 
     # only the user with instant notification emails enabled gets an email
     assert len(mail.outbox) == 1
     assert mail.outbox[0].to == [user_instant_email.email]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("batch_size,expected_callbacks", [(5, 1), (2, 2)])
+def test_notification_fan_out(
+    batch_size,
+    expected_callbacks,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    settings.task_eager_propagates = (True,)
+    settings.task_always_eager = (True,)
+    settings.NOTIFICATIONS_FAN_OUT_BATCH_SIZE = batch_size
+
+    upload_session = UploadSessionFactory(creator=UserFactory())
+    followers = UserFactory.create_batch(2)
+
+    for user in followers:
+        follow(user=user, obj=upload_session, send_action=False)
+        user.user_profile.notification_email_choice = (
+            NotificationEmailOptions.INSTANT
+        )
+        user.user_profile.save()
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        Notification.send(
+            kind=Notification.Type.IMAGE_IMPORT_STATUS,
+            action_object=upload_session,
+        )
+
+    # Either the instant emails, or the notification batches, are scheduled
+    assert len(callbacks) == expected_callbacks
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for callback in callbacks:
+            callback()
+
+    notifications = Notification.objects.all()
+    assert {n.user for n in notifications} == {
+        upload_session.creator,
+        *followers,
+    }
+
+    for notification in notifications:
+        assert notification.action_object == upload_session
+        assert notification.user.has_perm("view_notification", notification)
+        assert notification.user.has_perm("change_notification", notification)
+
+    assert {m.to[0] for m in mail.outbox} == {u.email for u in followers}
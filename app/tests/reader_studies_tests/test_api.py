@@ -6,7 +6,6 @@ from django.urls import reverse
 
 from grandchallenge.cases.models import RawImageUploadSession
 from grandchallenge.components.models import InterfaceKind
-from grandchallenge.core.utils.query import set_seed
 from grandchallenge.reader_studies.models import (
     Answer,
     AnswerType,
@@ -238,6 +237,130 @@ def test_answer_update(client):
     assert answer.history.count() == 2
 
 
+@pytest.mark.django_db
+def test_answer_bulk(client):
+    rs = ReaderStudyFactory(allow_answer_modification=True)
+    ds = DisplaySetFactory(reader_study=rs)
+
+    reader, editor = UserFactory(), UserFactory()
+    rs.add_reader(reader)
+    rs.add_editor(editor)
+
+    q1, q2, q3 = (
+        QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+        for _ in range(3)
+    )
+    AnswerFactory(
+        question=q1,
+        creator=editor,
+        answer=True,
+        is_ground_truth=True,
+        display_set=ds,
+    )
+
+    def post_answers(answers):
+        return get_view_for_user(
+            viewname="api:reader-studies-answer-bulk",
+            user=reader,
+            client=client,
+            method=client.post,
+            data={"display_set": ds.api_url, "answers": answers},
+            content_type="application/json",
+        )
+
+    response = post_answers(
+        [
+            {"question": q1.api_url, "answer": True},
+            {"question": q2.api_url, "answer": False},
+        ]
+    )
+    assert response.status_code == 201
+    assert len(response.data) == 2
+
+    a1 = Answer.objects.get(question=q1, is_ground_truth=False)
+    assert a1.creator == reader
+    assert a1.display_set == ds
+    assert a1.score == 1.0
+    assert reader.has_perm("change_answer", a1)
+    assert editor.has_perm("view_answer", a1)
+    assert a1.history.count() == 1
+
+    statistics = rs.user_statistics.get(user=reader)
+    assert statistics.answer_count == 2
+    assert statistics.score_sum == 1.0
+    assert statistics.completed_display_set_count == 0
+
+    # Nothing is saved if any of the answers is invalid
+    response = post_answers(
+        [
+            {"question": q1.api_url, "answer": False},
+            {"question": q3.api_url, "answer": "foo"},
+        ]
+    )
+    assert response.status_code == 400
+    assert response.data["answers"][0] == {}
+    assert "not the correct type" in str(
+        response.data["answers"][1]["non_field_errors"]
+    )
+    a1.refresh_from_db()
+    assert a1.answer is True
+
+    response = post_answers(
+        [
+            {"question": q1.api_url, "answer": False},
+            {"question": q3.api_url, "answer": True},
+        ]
+    )
+    assert response.status_code == 201
+
+    a1.refresh_from_db()
+    assert a1.answer is False
+    assert a1.score == 0.0
+    assert Answer.objects.filter(creator=reader).count() == 3
+
+    statistics.refresh_from_db()
+    assert statistics.answer_count == 3
+    assert statistics.score_sum == 0.0
+    assert statistics.score_count == 1
+    assert statistics.completed_display_set_count == 1
+
+
+@pytest.mark.django_db
+def test_answer_bulk_errors(client):
+    rs = ReaderStudyFactory()
+    ds = DisplaySetFactory(reader_study=rs)
+
+    reader = UserFactory()
+    rs.add_reader(reader)
+
+    q1 = QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+    q2 = QuestionFactory(answer_type=Question.AnswerType.BOOL)
+    AnswerFactory(question=q1, creator=reader, answer=True, display_set=ds)
+
+    response = get_view_for_user(
+        viewname="api:reader-studies-answer-bulk",
+        user=reader,
+        client=client,
+        method=client.post,
+        data={
+            "display_set": ds.api_url,
+            "answers": [
+                {"question": q1.api_url, "answer": False},
+                {"question": q2.api_url, "answer": False},
+            ],
+        },
+        content_type="application/json",
+    )
+
+    assert response.status_code == 400
+    assert response.data["answers"][0]["non_field_errors"] == [
+        "This reader study does not allow answer modification."
+    ]
+    assert response.data["answers"][1]["non_field_errors"] == [
+        f"Display set {ds} does not belong to this reader study."
+    ]
+
+
 @pytest.mark.django_db
 def test_answer_creator_is_reader(client):
     rs_set = TwoReaderStudies()
@@ -2039,9 +2162,10 @@ def test_display_set_index(client):
     )
 
     # determine shuffled index of first Displayset
-    set_seed(1 / int(user.pk))
-    queryset = list(DisplaySet.objects.all().order_by("?"))
-    new_index = queryset.index(DisplaySet.objects.first())
+    new_index = reader_study.get_shuffled_display_set_index(user=user)[
+        DisplaySet.objects.first().pk
+    ]
+    assert new_index == shuffled_order.index(DisplaySet.objects.first().order)
 
     assert response.json()["index"] == new_index
 
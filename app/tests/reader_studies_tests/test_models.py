@@ -364,6 +364,177 @@ def test_score_for_user(
     assert score["score__avg"] == 0.5
 
 
+@pytest.mark.django_db
+def test_answer_statistics(
+    reader_study_with_gt, settings, django_capture_on_commit_callbacks
+):
+    settings.task_eager_propagates = (True,)
+    settings.task_always_eager = (True,)
+
+    rs = reader_study_with_gt
+    r1 = rs.readers_group.user_set.first()
+    q1, q2, q3 = rs.questions.order_by("question_text")
+    ds1, ds2 = rs.display_sets.all()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for question in [q1, q2]:
+            AnswerFactory(
+                question=question, creator=r1, answer=True, display_set=ds1
+            )
+        a13 = AnswerFactory(question=q3, creator=r1, answer=False)
+
+    statistics = rs.user_statistics.get(user=r1)
+    assert statistics.answer_count == 3
+    assert statistics.score_count == 2
+    assert statistics.score_sum == 2.0
+    assert statistics.completed_display_set_count == 0
+    assert ds1.statistics.answer_count == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        a13.display_set = ds1
+        a13.save()
+
+    statistics.refresh_from_db()
+    assert statistics.answer_count == 3
+    assert statistics.score_count == 3
+    assert statistics.score_sum == 2.0
+    assert statistics.completed_display_set_count == 1
+    ds1.statistics.refresh_from_db()
+    assert ds1.statistics.answer_count == 3
+    assert ds1.statistics.score_sum == 2.0
+
+    a13.delete()
+
+    statistics.refresh_from_db()
+    assert statistics.answer_count == 2
+    assert statistics.score_count == 2
+    assert statistics.completed_display_set_count == 0
+    q3.statistics.refresh_from_db()
+    assert q3.statistics.answer_count == 0
+    assert q3.statistics.score_count == 0
+
+    # Ground truth is not included
+    assert not rs.user_statistics.filter(
+        user=rs.editors_group.user_set.first()
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_answer_statistics_batch_delete(
+    reader_study_with_gt, settings, django_capture_on_commit_callbacks
+):
+    settings.task_eager_propagates = (True,)
+    settings.task_always_eager = (True,)
+
+    rs = reader_study_with_gt
+    r1 = rs.readers_group.user_set.first()
+    ds1, ds2 = rs.display_sets.all()
+
+    def answer_all_questions():
+        with django_capture_on_commit_callbacks(execute=True):
+            for ds in [ds1, ds2]:
+                for question in rs.questions.all():
+                    AnswerFactory(
+                        question=question,
+                        creator=r1,
+                        answer=True,
+                        display_set=ds,
+                    )
+
+    answer_all_questions()
+
+    statistics = rs.user_statistics.get(user=r1)
+    assert statistics.answer_count == 6
+    assert statistics.completed_display_set_count == 2
+
+    # All of the answers are removed before the post delete signals are sent
+    Answer.objects.filter(
+        creator=r1, display_set=ds1, is_ground_truth=False
+    ).delete()
+
+    statistics.refresh_from_db()
+    assert statistics.answer_count == 3
+    assert statistics.completed_display_set_count == 1
+
+    Answer.objects.filter(creator=r1, is_ground_truth=False).delete()
+
+    statistics.refresh_from_db()
+    assert statistics.answer_count == 0
+    assert statistics.completed_display_set_count == 0
+
+    answer_all_questions()
+
+    statistics.refresh_from_db()
+    assert statistics.answer_count == 6
+    assert statistics.completed_display_set_count == 2
+
+
+@pytest.mark.django_db
+def test_rebuild_statistics(
+    reader_study_with_gt, settings, django_capture_on_commit_callbacks
+):
+    settings.task_eager_propagates = (True,)
+    settings.task_always_eager = (True,)
+
+    rs = reader_study_with_gt
+    r1, r2 = rs.readers_group.user_set.all()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for i, question in enumerate(rs.questions.all()):
+            for j, ds in enumerate(rs.display_sets.all()):
+                for reader in [r1, r2]:
+                    if reader == r2 and i == j == 0:
+                        continue
+                    AnswerFactory(
+                        question=question,
+                        creator=reader,
+                        answer=(i + j) % 2 == 0,
+                        display_set=ds,
+                    )
+
+    def get_statistics():
+        return {
+            "users": {
+                s.user_id: (
+                    s.answer_count,
+                    s.score_sum,
+                    s.score_count,
+                    s.completed_display_set_count,
+                )
+                for s in rs.user_statistics.all()
+            },
+            "display_sets": {
+                ds.pk: (
+                    ds.statistics.answer_count,
+                    ds.statistics.score_sum,
+                    ds.statistics.score_count,
+                )
+                for ds in rs.display_sets.all()
+            },
+            "questions": {
+                q.pk: (
+                    q.statistics.answer_count,
+                    q.statistics.score_sum,
+                    q.statistics.score_count,
+                )
+                for q in rs.questions.all()
+            },
+        }
+
+    incremental = get_statistics()
+    assert incremental["users"][r1.pk] == (6, 3.0, 6, 2)
+    assert incremental["users"][r2.pk] == (5, 2.0, 5, 1)
+
+    rs.rebuild_statistics()
+
+    assert get_statistics() == incremental
+
+    with django_capture_on_commit_callbacks(execute=True):
+        QuestionFactory(reader_study=rs, answer_type=Question.AnswerType.BOOL)
+
+    assert rs.user_statistics.get(user=r1).completed_display_set_count == 0
+
+
 @pytest.mark.django_db
 def test_help_markdown_is_scrubbed(client):
     rs = ReaderStudyFactory(
@@ -1154,3 +1325,54 @@ def test_clean_question_interactive_algorithms(
 
     with error:
         q._clean_interactive_algorithm()
+
+
+@pytest.mark.django_db
+def test_standard_display_set_index_invalidation():
+    rs = ReaderStudyFactory()
+    ds1, ds2 = DisplaySetFactory.create_batch(2, reader_study=rs)
+
+    assert rs.get_standard_display_set_index() == {ds1.pk: 0, ds2.pk: 1}
+
+    ds3 = DisplaySetFactory(reader_study=rs, order=1)
+
+    assert rs.get_standard_display_set_index() == {
+        ds3.pk: 0,
+        ds1.pk: 1,
+        ds2.pk: 2,
+    }
+
+    ds2.order = ds1.order
+    ds2.save()
+
+    assert rs.get_standard_display_set_index() == {
+        ds3.pk: 0,
+        ds1.pk: 1,
+        ds2.pk: 1,
+    }
+    assert ds2.standard_index == 1
+
+    ds3.delete()
+
+    assert rs.get_standard_display_set_index() == {ds1.pk: 0, ds2.pk: 0}
+
+
+@pytest.mark.django_db
+def test_shuffled_display_set_index():
+    rs = ReaderStudyFactory(shuffle_hanging_list=True)
+    u1, u2 = UserFactory.create_batch(2)
+    display_sets = DisplaySetFactory.create_batch(20, reader_study=rs)
+
+    index = rs.get_display_set_index(user=u1)
+
+    assert sorted(index.values()) == [*range(20)]
+    assert index.keys() == {ds.pk for ds in display_sets}
+    assert index != rs.get_display_set_index(user=u2)
+
+    # The permutation does not depend on the cache
+    rs.invalidate_display_set_index()
+    assert index == rs.get_display_set_index(user=u1)
+
+    new_ds = DisplaySetFactory(reader_study=rs)
+
+    assert new_ds.pk in rs.get_display_set_index(user=u1)
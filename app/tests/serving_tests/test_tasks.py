@@ -0,0 +1,39 @@
+import pytest
+from guardian.shortcuts import assign_perm
+from guardian.utils import get_anonymous_user
+
+from grandchallenge.serving.downloads import download_buffer
+from grandchallenge.serving.models import Download
+from grandchallenge.serving.tasks import flush_download_buffer
+from tests.factories import ImageFactory, ImageFileFactory, UserFactory
+from tests.utils import get_view_for_user
+
+
+@pytest.mark.django_db
+def test_flush_download_buffer(client, settings):
+    settings.SERVING_BUFFER_DOWNLOADS = True
+
+    image_file = ImageFileFactory()
+    user = UserFactory()
+    assign_perm("view_image", user, image_file.image)
+
+    response = get_view_for_user(
+        url=image_file.file.url, client=client, user=user
+    )
+
+    assert response.status_code == 302
+    assert not Download.objects.exists()
+
+    download_buffer.append(creator_id=None, image_id=image_file.image.pk)
+
+    deleted_image = ImageFactory()
+    download_buffer.append(creator_id=user.pk, image_id=deleted_image.pk)
+    deleted_image.delete()
+
+    flush_download_buffer()
+
+    assert {(d.creator, d.image) for d in Download.objects.all()} == {
+        (user, image_file.image),
+        (get_anonymous_user(), image_file.image),
+    }
+    assert download_buffer._connection.llen(download_buffer.key) == 0
@@ -31,6 +31,12 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 ROOT_URLCONF = "tests.urls.root"
 
+# The shared cache is used by all test processes, but their databases differ
+CHALLENGES_SUBDOMAIN_CACHE_TIMEOUT = 0
+SERVING_BUFFER_DOWNLOADS = False
+ALGORITHMS_JOB_SCHEDULER_ENABLED = False
+CORE_STATUS_COUNTERS_ENABLED = False
+
 CELERY_BROKER = "memory"
 CELERY_BROKER_URL = "memory://"
 
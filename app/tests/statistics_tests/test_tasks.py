@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from django.core.cache import cache
+
+from grandchallenge.cases.models import Image
+from grandchallenge.statistics.models import MonthlyStatistics
+from grandchallenge.statistics.tasks import update_site_statistics_cache
+from tests.factories import ImageFactory
+
+
+@pytest.mark.django_db
+def test_monthly_statistics_are_incremental(settings):
+    settings.STATISTICS_SITE_CACHE_KEY = f"tests/statistics/{uuid.uuid4()}"
+
+    old_image, new_image = ImageFactory.create_batch(2)
+    Image.objects.filter(pk=old_image.pk).update(
+        created=datetime(2020, 1, 15, tzinfo=timezone.utc)
+    )
+
+    # The first run calculates all months
+    update_site_statistics_cache()
+
+    assert MonthlyStatistics.objects.filter(name="images").count() == 2
+    assert [
+        datum["object_count"]
+        for datum in cache.get(settings.STATISTICS_SITE_CACHE_KEY)["images"]
+    ] == [1, 1]
+
+    # Old months are not recalculated
+    old_image, new_image = ImageFactory.create_batch(2)
+    Image.objects.filter(pk=old_image.pk).update(
+        created=datetime(2020, 1, 16, tzinfo=timezone.utc)
+    )
+
+    update_site_statistics_cache()
+
+    stats = cache.get(settings.STATISTICS_SITE_CACHE_KEY)
+    assert [datum["object_count"] for datum in stats["images"]] == [1, 2]
+    assert stats["images"][0]["created__year"] == 2020
+
+    update_site_statistics_cache(rebuild=True)
+
+    stats = cache.get(settings.STATISTICS_SITE_CACHE_KEY)
+    assert [datum["object_count"] for datum in stats["images"]] == [2, 2]
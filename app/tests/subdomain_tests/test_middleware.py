@@ -1,12 +1,15 @@
 import pytest
 from django.contrib.sites.middleware import CurrentSiteMiddleware
 from django.core.handlers.wsgi import WSGIRequest
+from django.http import Http404
 
+from grandchallenge.challenges.cache import challenge_subdomain_cache
 from grandchallenge.subdomains.middleware import (
     challenge_subdomain_middleware,
     subdomain_middleware,
     subdomain_urlconf_middleware,
 )
+from tests.evaluation_tests.factories import PhaseFactory
 from tests.factories import ChallengeFactory
 
 # The domain that is set for the main site, set by RequestFactory
@@ -146,3 +149,54 @@ def test_url_conf_set(
         assert request.challenge == c
     else:
         assert request.challenge is None
+
+
+@pytest.mark.django_db
+def test_challenge_subdomain_cache(
+    settings, rf, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    settings.CHALLENGES_SUBDOMAIN_CACHE_TIMEOUT = 60
+    challenge_subdomain_cache.clear()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        c = ChallengeFactory(short_name="cachedchallenge")
+        PhaseFactory(challenge=c, title="First Phase")
+
+    def get_challenge():
+        request = rf.get("/")
+        request.subdomain = "CachedChallenge"
+        request = CurrentSiteMiddleware(lambda x: x)(request)
+        request = challenge_subdomain_middleware(lambda x: x)(request)
+        return request.challenge
+
+    first = get_challenge()
+
+    with django_assert_num_queries(0):
+        second = get_challenge()
+
+        assert second == c
+        assert second is not first
+        assert [p.title for p in second.phase_set.all()] == ["First Phase"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        PhaseFactory(challenge=c, title="Second Phase")
+
+    assert {p.title for p in get_challenge().phase_set.all()} == {
+        "First Phase",
+        "Second Phase",
+    }
+
+    with django_capture_on_commit_callbacks(execute=True):
+        c.title = "Updated"
+        c.save()
+
+    assert get_challenge().title == "Updated"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        c.short_name = "renamedchallenge"
+        c.save()
+
+    with pytest.raises(Http404):
+        get_challenge()
+
+    challenge_subdomain_cache.invalidate(short_name=c.short_name)
@@ -0,0 +1,58 @@
+from timeit import timeit
+
+from jsonschema import validate
+
+from grandchallenge.components.models import (
+    INTERFACE_TYPE_JSON_EXAMPLES,
+    ComponentInterface,
+    InterfaceKindChoices,
+)
+from grandchallenge.components.schemas import INTERFACE_VALUE_SCHEMA
+from grandchallenge.core.validators import get_json_schema_registry
+
+N_VALIDATIONS = 1_000
+
+KINDS = (
+    InterfaceKindChoices.FLOAT,
+    InterfaceKindChoices.STRING,
+    InterfaceKindChoices.TWO_D_BOUNDING_BOX,
+    InterfaceKindChoices.MULTIPLE_POLYGONS,
+)
+CUSTOM_SCHEMA = {"not": {"type": "null"}}
+
+
+def run():
+    print("Benchmarking component interface value validation")
+
+    for kind in KINDS:
+        value = INTERFACE_TYPE_JSON_EXAMPLES[kind].value
+        interface = ComponentInterface(kind=kind, schema=CUSTOM_SCHEMA)
+
+        uncached_time = timeit(
+            lambda: _validate_uncached(interface=interface, value=value),
+            number=N_VALIDATIONS,
+        )
+        cached_time = timeit(
+            lambda: interface.validate_against_schema(value=value),
+            number=N_VALIDATIONS,
+        )
+
+        print(f"{kind.label}:")
+        print(
+            f"  Uncached: {N_VALIDATIONS / uncached_time:,.0f} validations/s"
+        )
+        print(f"  Cached:   {N_VALIDATIONS / cached_time:,.0f} validations/s")
+
+
+def _validate_uncached(*, interface, value):
+    """The validation as done before the validators were cached"""
+    registry = get_json_schema_registry()
+    validate(
+        value,
+        {
+            **INTERFACE_VALUE_SCHEMA,
+            "anyOf": [{"$ref": f"#/definitions/{interface.kind}"}],
+        },
+        registry=registry,
+    )
+    validate(value, interface.schema, registry=registry)
@@ -0,0 +1,98 @@
+import random
+from functools import partial
+from statistics import mean
+from timeit import timeit
+from types import SimpleNamespace
+
+from grandchallenge.evaluation.templatetags.evaluation_extras import (
+    get_jsonpath,
+)
+from grandchallenge.evaluation.utils import (
+    Metric,
+    RankingEngine,
+    _rank_results_python,
+    rank_results,
+)
+
+N_EVALUATIONS = 20_000
+N_METRICS = 12
+REPEATS = 3
+
+
+def run():
+    print("Benchmarking leaderboard ranking")
+
+    metrics = tuple(
+        Metric(path=f"case.metric_{idx}", reverse=bool(idx % 2))
+        for idx in range(N_METRICS)
+    )
+    evaluations = _get_evaluations(metrics=metrics)
+
+    python_positions = _rank_results_python(
+        evaluations=evaluations, metrics=metrics, score_method=mean
+    )
+    numpy_positions = rank_results(
+        evaluations=evaluations, metrics=metrics, score_method=mean
+    )
+
+    if python_positions != numpy_positions:
+        raise RuntimeError("Ranking engine does not match Python ranks")
+
+    python_time = timeit(
+        lambda: _rank_results_python(
+            evaluations=evaluations, metrics=metrics, score_method=mean
+        ),
+        number=REPEATS,
+    )
+    numpy_time = timeit(
+        lambda: rank_results(
+            evaluations=evaluations, metrics=metrics, score_method=mean
+        ),
+        number=REPEATS,
+    )
+
+    # Hold back one evaluation per repeat to insert into the engine
+    engine = RankingEngine.from_evaluations(
+        evaluations=evaluations[:-REPEATS], metrics=metrics
+    )
+    new_evaluations = iter(evaluations[-REPEATS:])
+
+    def insert_one():
+        engine.insert(evaluation=next(new_evaluations))
+        engine.get_positions(score_method=mean)
+
+    incremental_time = timeit(insert_one, number=REPEATS)
+
+    print(f"{N_EVALUATIONS} evaluations, {N_METRICS} metrics")
+    print(f"Python ranking:      {python_time / REPEATS:.3f}s")
+    print(f"Vectorized ranking:  {numpy_time / REPEATS:.3f}s")
+    print(f"Incremental ranking: {incremental_time / REPEATS:.3f}s")
+
+
+def _get_evaluations(*, metrics):
+    evaluations = []
+
+    for idx in range(N_EVALUATIONS):
+        # Round the values so that there are plenty of ties
+        metrics_json_file = {
+            "case": {
+                metric.path.split(".")[1]: round(random.random(), 3)
+                for metric in metrics
+            }
+        }
+        evaluations.append(
+            SimpleNamespace(
+                pk=idx,
+                get_metric_value=partial(get_jsonpath, metrics_json_file),
+                invalid_metrics={
+                    metric.path
+                    for metric in metrics
+                    if not isinstance(
+                        get_jsonpath(metrics_json_file, metric.path),
+                        (int, float),
+                    )
+                },
+            )
+        )
+
+    return evaluations